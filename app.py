@@ -1,14 +1,118 @@
-from chalice import Chalice
-from chalicelib.venues import ComedyCellarBot, TheStandBot
-from chalicelib.email_service import EmailService
-from chalicelib.bot_service import ComedyBotService
-from chalicelib.config import Config
+from chalicelib.startup import startup_timer
+
+with startup_timer.phase("import"):
+    import json
+    from chalice import Chalice, Rate, Response
+    from chalicelib.venues import ComedyCellarBot, TheStandBot
+    from chalicelib.archive import ShowArchive
+    from chalicelib.email_service import EmailService
+    from chalicelib.bot_service import ComedyBotService
+    from chalicelib.config import Config
+    from chalicelib.fanout import FanOutCoordinator
+    from chalicelib.http_client import get_http_client
+    from chalicelib.lazy import get_boto3_client
+    from chalicelib.metrics import metrics
+    from chalicelib.snapshot import LineupSnapshot
+    from chalicelib.state_store import StateStore
+    from chalicelib.subscribers import SubscriberRegistry
+    from chalicelib.utils import deadline_from_context
 
 app = Chalice(app_name="comedy-show-bots", debug=True)
 
-email_service = EmailService(region_name=Config.AWS_REGION)
-venues = [ComedyCellarBot(), TheStandBot()]
-bot_service = ComedyBotService(venues=venues, email_service=email_service)
+_bot_service = None
+_state_store = None
+_fanout = None
+_lineup_snapshot = None
+
+
+def get_bot_service() -> ComedyBotService:
+    """Build the bot service on first use and reuse it across warm invocations."""
+    global _bot_service, _state_store, _fanout
+    if _bot_service is None:
+        with startup_timer.phase("init"):
+            email_service = EmailService(region_name=Config.AWS_REGION)
+            venues = [ComedyCellarBot(), TheStandBot()]
+            _state_store = StateStore.from_config()
+            _bot_service = ComedyBotService(
+                venues=venues,
+                email_service=email_service,
+                state_store=_state_store,
+                subscribers=SubscriberRegistry.from_config(),
+                archive=ShowArchive.from_config(),
+            )
+            _fanout = FanOutCoordinator.from_config(_bot_service, _state_store)
+    return _bot_service
+
+
+def get_fanout_coordinator():
+    """The fan-out coordinator, or None unless fan-out mode is enabled."""
+    get_bot_service()
+    return _fanout
+
+
+def get_lineup_snapshot():
+    """The snapshot reader for the API, without building the venues or the bot service."""
+    global _lineup_snapshot
+    if _lineup_snapshot is None:
+        with startup_timer.phase("init"):
+            _lineup_snapshot = LineupSnapshot.from_config(StateStore.from_config())
+    return _lineup_snapshot
+
+
+def snapshot_response(kind: str) -> Response:
+    """Serve a precomputed snapshot document with ETag revalidation."""
+    snapshot = get_lineup_snapshot()
+    document = snapshot.document(kind) if snapshot is not None else None
+    if document is None:
+        return Response(
+            body={"error": "No lineup snapshot has been written yet"},
+            status_code=503,
+            headers={"Retry-After": "3600"},
+        )
+
+    body, etag = document
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={Config.API_CACHE_MAX_AGE_SECONDS}",
+    }
+    if_none_match = app.current_request.headers.get("if-none-match")
+    if LineupSnapshot.etag_matches(if_none_match, etag):
+        return Response(body="", status_code=304, headers=headers)
+    headers["Content-Type"] = LineupSnapshot.CONTENT_TYPES[kind]
+    return Response(body=body, status_code=200, headers=headers)
+
+
+def resume_pending_work(event, bot_service: ComedyBotService):
+    """
+    Start the next run now if this one was cut short by its deadline.
+
+    The function invokes itself asynchronously with the same scheduled event,
+    so the new run resumes from the checkpoint. Needs lambda:InvokeFunction
+    on the function's own ARN; without self-invoke the next scheduled run
+    resumes instead.
+    """
+    if not bot_service.pending_work or not Config.CHECKPOINT_SELF_INVOKE:
+        return
+    get_boto3_client("lambda", region_name=Config.AWS_REGION).invoke(
+        FunctionName=event.context.function_name,
+        InvocationType="Event",
+        Payload=json.dumps(event.to_dict()).encode("utf-8"),
+    )
+    print("Invoked a follow-up run for the pending work")
+
+
+if Config.shared_state_store():
+    # Registered only with a shared state store, since the API's containers
+    # cannot read the SQLite file the scheduled runs write
+    @app.route("/shows")
+    def upcoming_shows():
+        """Upcoming shows with favorite comedians, as JSON."""
+        return snapshot_response("json")
+
+    @app.route("/shows.ics")
+    def upcoming_shows_calendar():
+        """Upcoming shows with favorite comedians, as an iCalendar feed."""
+        return snapshot_response("ics")
 
 
 @app.schedule("cron(0 13 * * ? *)")  # 13:00 UTC = 9 AM EDT / 8 AM EST
@@ -16,9 +120,86 @@ def check_comedy_shows(event):
     print(f"Event: {event.to_dict()}")
 
     try:
-        results = bot_service.check_all_venues()
-        bot_service.send_comedy_alerts(results)
+        bot_service = get_bot_service()
+        # With polling on, dates the poller checked recently are not due yet,
+        # so the daily run shares the polls' fetch budget instead of adding to it
+        due_only = Config.adaptive_polling()
+        if get_fanout_coordinator() is not None:
+            get_fanout_coordinator().dispatch(due_only=due_only)
+            return
+
+        deadline = deadline_from_context(
+            event.context, Config.DEADLINE_SAFETY_MARGIN_SECONDS
+        )
+        # Warm containers keep the client, so report this run's requests only
+        get_http_client().stats.reset()
+        with metrics.span("Run"):
+            results = bot_service.check_all_venues(deadline=deadline, due_only=due_only)
+            print(f"HTTP stats: {get_http_client().stats.summary()}")
+            bot_service.send_comedy_alerts(results)
+        resume_pending_work(event, bot_service)
+        startup_timer.report_once()
         print("Comedy show check completed successfully")
     except Exception as e:
         print(f"Error in comedy show check: {e}")
         raise
+    finally:
+        metrics.flush()
+
+
+if Config.adaptive_polling():
+    # Registered only with delta alerts and a shared state store, which every
+    # poll reads to find the due dates
+    @app.schedule(Rate(Config.POLL_TICK_MINUTES, unit=Rate.MINUTES))
+    def poll_due_shows(event):
+        """Recheck only the venue dates the adaptive poll scheduler says are due."""
+        bot_service = get_bot_service()
+        try:
+            if get_fanout_coordinator() is not None:
+                get_fanout_coordinator().dispatch(due_only=True)
+                return
+
+            deadline = deadline_from_context(
+                event.context, Config.DEADLINE_SAFETY_MARGIN_SECONDS
+            )
+            get_http_client().stats.reset()
+            with metrics.span("Poll"):
+                results = bot_service.check_all_venues(deadline=deadline, due_only=True)
+                print(f"HTTP stats: {get_http_client().stats.summary()}")
+                bot_service.send_comedy_alerts(results)
+            resume_pending_work(event, bot_service)
+            startup_timer.report_once()
+            print("Comedy show poll completed successfully")
+        except Exception as e:
+            print(f"Error in comedy show poll: {e}")
+            raise
+        finally:
+            metrics.flush()
+
+
+if Config.ARCHIVE_BACKEND != "none":
+    # Registered only with an archive, which it opens without the bot service
+    @app.schedule("cron(0 6 1 * ? *)")  # 06:00 UTC on the 1st of each month
+    def compact_archive(event):
+        """Merge last month's archive segments, once no run appends to them."""
+        archive = ShowArchive.from_config()
+        if archive is None:
+            print(f"Unknown archive backend {Config.ARCHIVE_BACKEND!r}, skipping")
+            return
+        print(f"Compacted {archive.compact()} archive months")
+
+
+if Config.FANOUT_MODE:
+    # Registered only in fan-out mode, since the queue must exist to deploy
+    @app.on_sqs_message(queue=Config.FANOUT_QUEUE_NAME, batch_size=1)
+    def handle_fanout_message(event):
+        """Run one fan-out work item or aggregation step."""
+        coordinator = get_fanout_coordinator()
+        deadline = deadline_from_context(
+            event.context, Config.DEADLINE_SAFETY_MARGIN_SECONDS
+        )
+        try:
+            for record in event:
+                coordinator.handle_message(json.loads(record.body), deadline=deadline)
+        finally:
+            metrics.flush()
@@ -0,0 +1,73 @@
+"""
+Measure cold-start cost of the Lambda entry point.
+
+Imports app.py in fresh interpreters and reports the import and init phases
+recorded by chalicelib.startup. Exits non-zero if a heavy module is loaded at
+import time or the median import time exceeds --max-import-ms, so it can be
+used as a regression check.
+
+    python benchmarks/bench_cold_start.py [--runs 5] [--max-import-ms 150]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that should only be imported on first use
+DEFERRED_MODULES = ["boto3", "botocore", "requests", "bs4"]
+
+PROBE = """
+import json, sys
+import app
+loaded = [m for m in {deferred!r} if m in sys.modules]
+app.get_bot_service()
+print(json.dumps({{"phases": app.startup_timer.report(), "loaded_at_import": loaded}}))
+"""
+
+
+def run_once():
+    env = dict(os.environ, AWS_DEFAULT_REGION=os.environ.get("AWS_DEFAULT_REGION", "us-east-1"))
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE.format(deferred=DEFERRED_MODULES)],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--max-import-ms", type=float, default=None)
+    args = parser.parse_args()
+
+    runs = [run_once() for _ in range(args.runs)]
+    phases = sorted({name for run in runs for name in run["phases"]})
+    for name in phases:
+        values = [run["phases"][name] for run in runs if name in run["phases"]]
+        print(f"{name:<10} median {statistics.median(values):8.1f} ms  max {max(values):8.1f} ms")
+
+    failures = []
+    loaded = sorted({m for run in runs for m in run["loaded_at_import"]})
+    if loaded:
+        failures.append(f"modules loaded at import time: {', '.join(loaded)}")
+
+    import_ms = statistics.median(run["phases"]["import"] for run in runs)
+    if args.max_import_ms is not None and import_ms > args.max_import_ms:
+        failures.append(f"median import {import_ms:.1f} ms > {args.max_import_ms} ms")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Benchmark BeautifulSoup parser backends on venue pages.
+
+Reports parse time and peak memory per page for every installed backend,
+for both a full parse and the SoupStrainer-restricted parse the bots use.
+
+    python benchmarks/bench_html_parsers.py [--repeat 20] [--cards 60]
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import cellar_lineup_html, stand_shows_html  # noqa: E402
+from chalicelib.html_parser import (  # noqa: E402
+    available_parser_backends,
+    make_strainer,
+    parse_html,
+)
+from chalicelib.venues.comedy_cellar import ComedyCellarBot  # noqa: E402
+
+
+def measure(html, parser, parse_only, repeat):
+    """Return (best parse time in ms, peak traced memory in KiB)."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        parse_html(html, parse_only=parse_only, parser=parser)
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    parse_html(html, parse_only=parse_only, parser=parser)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best * 1000, peak / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--cards", type=int, default=60, help="Stand show cards")
+    parser.add_argument("--shows", type=int, default=8, help="Cellar shows per day")
+    args = parser.parse_args()
+
+    pages = {
+        "cellar": (
+            cellar_lineup_html(args.shows),
+            make_strainer(class_=ComedyCellarBot.LINEUP_CLASSES),
+        ),
+        "stand": (stand_shows_html(args.cards), make_strainer("main")),
+    }
+
+    print(f"{'page':<8}{'backend':<14}{'mode':<10}{'KiB':>8}{'ms':>10}{'peak KiB':>12}")
+    for page, (html, strainer) in pages.items():
+        for backend in available_parser_backends():
+            for mode, parse_only in (("full", None), ("strained", strainer)):
+                elapsed, peak = measure(html, backend, parse_only, args.repeat)
+                print(
+                    f"{page:<8}{backend:<14}{mode:<10}{len(html) / 1024:>8.1f}"
+                    f"{elapsed:>10.2f}{peak:>12.1f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
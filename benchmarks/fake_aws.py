@@ -0,0 +1,433 @@
+import html
+import io
+import json
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from botocore.exceptions import ClientError
+
+
+class InMemoryS3Client:
+    """In-memory stand-in for the boto3 S3 client methods used by chalicelib."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._objects: Dict[str, Dict[str, Dict]] = {}
+
+    def put_object(self, Bucket: str, Key: str, Body, **kwargs) -> Dict:
+        if isinstance(Body, str):
+            Body = Body.encode("utf-8")
+        with self._lock:
+            self._objects.setdefault(Bucket, {})[Key] = {
+                "Body": bytes(Body),
+                "LastModified": datetime.now(timezone.utc),
+                "Metadata": kwargs.get("Metadata", {}),
+            }
+        return {"ResponseMetadata": {"HTTPStatusCode": 200}}
+
+    def get_object(self, Bucket: str, Key: str, **kwargs) -> Dict:
+        with self._lock:
+            obj = self._objects.get(Bucket, {}).get(Key)
+        if obj is None:
+            raise ClientError(
+                {"Error": {"Code": "NoSuchKey", "Message": "Not Found"}}, "GetObject"
+            )
+        return {
+            "Body": io.BytesIO(obj["Body"]),
+            "LastModified": obj["LastModified"],
+            "ContentLength": len(obj["Body"]),
+            "Metadata": obj["Metadata"],
+        }
+
+    def delete_object(self, Bucket: str, Key: str, **kwargs) -> Dict:
+        with self._lock:
+            self._objects.get(Bucket, {}).pop(Key, None)
+        return {"ResponseMetadata": {"HTTPStatusCode": 204}}
+
+    def list_objects_v2(
+        self,
+        Bucket: str,
+        Prefix: str = "",
+        ContinuationToken: Optional[str] = None,
+        Delimiter: str = "",
+        **kwargs,
+    ) -> Dict:
+        with self._lock:
+            contents = []
+            common_prefixes: List[str] = []
+            for key, obj in sorted(self._objects.get(Bucket, {}).items()):
+                if not key.startswith(Prefix):
+                    continue
+                rest = key[len(Prefix) :]
+                if Delimiter and Delimiter in rest:
+                    common = Prefix + rest.split(Delimiter, 1)[0] + Delimiter
+                    if not common_prefixes or common_prefixes[-1] != common:
+                        common_prefixes.append(common)
+                    continue
+                contents.append(
+                    {
+                        "Key": key,
+                        "LastModified": obj["LastModified"],
+                        "Size": len(obj["Body"]),
+                    }
+                )
+        response = {"Contents": contents, "KeyCount": len(contents), "IsTruncated": False}
+        if Delimiter:
+            response["CommonPrefixes"] = [{"Prefix": prefix} for prefix in common_prefixes]
+        return response
+
+
+class InMemoryDynamoDBClient:
+    """In-memory stand-in for the boto3 DynamoDB client methods used by chalicelib."""
+
+    def __init__(self, key_name: str = "pk"):
+        self._lock = threading.Lock()
+        self._tables: Dict[str, Dict[str, Dict]] = {}
+        self.key_name = key_name
+
+    def put_item(self, TableName: str, Item: Dict, **kwargs) -> Dict:
+        key = Item[self.key_name]["S"]
+        with self._lock:
+            self._tables.setdefault(TableName, {})[key] = dict(Item)
+        return {}
+
+    def get_item(self, TableName: str, Key: Dict, **kwargs) -> Dict:
+        with self._lock:
+            item = self._tables.get(TableName, {}).get(Key[self.key_name]["S"])
+        return {"Item": dict(item)} if item is not None else {}
+
+    def delete_item(
+        self, TableName: str, Key: Dict, ReturnValues: str = "NONE", **kwargs
+    ) -> Dict:
+        with self._lock:
+            item = self._tables.get(TableName, {}).pop(Key[self.key_name]["S"], None)
+        if ReturnValues == "ALL_OLD" and item is not None:
+            return {"Attributes": dict(item)}
+        return {}
+
+
+class InMemorySQSClient:
+    """
+    In-memory stand-in for the boto3 SQS client methods used by chalicelib.
+
+    Messages are delivered in send order. DelaySeconds is recorded on the
+    message but not waited for, and received messages stay hidden until
+    deleted (there is no visibility timeout).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._queues: Dict[str, List[Dict]] = {}
+        self._in_flight: Dict[str, Dict] = {}
+        self._message_ids = 0
+
+    def get_queue_url(self, QueueName: str, **kwargs) -> Dict:
+        url = f"local://sqs/{QueueName}"
+        with self._lock:
+            self._queues.setdefault(url, [])
+        return {"QueueUrl": url}
+
+    def send_message(
+        self, QueueUrl: str, MessageBody: str, DelaySeconds: int = 0, **kwargs
+    ) -> Dict:
+        with self._lock:
+            self._message_ids += 1
+            message_id = f"local-{self._message_ids}"
+            self._queues.setdefault(QueueUrl, []).append(
+                {
+                    "MessageId": message_id,
+                    "ReceiptHandle": message_id,
+                    "Body": MessageBody,
+                    "DelaySeconds": DelaySeconds,
+                }
+            )
+        return {"MessageId": message_id}
+
+    def receive_message(
+        self, QueueUrl: str, MaxNumberOfMessages: int = 1, **kwargs
+    ) -> Dict:
+        with self._lock:
+            queue = self._queues.setdefault(QueueUrl, [])
+            messages = queue[:MaxNumberOfMessages]
+            del queue[:MaxNumberOfMessages]
+            for message in messages:
+                self._in_flight[message["ReceiptHandle"]] = message
+        return {"Messages": [dict(message) for message in messages]} if messages else {}
+
+    def delete_message(self, QueueUrl: str, ReceiptHandle: str, **kwargs) -> Dict:
+        with self._lock:
+            self._in_flight.pop(ReceiptHandle, None)
+        return {}
+
+
+class _SESExceptions:
+    class TemplateDoesNotExistException(ClientError):
+        def __init__(self, name: str):
+            super().__init__(
+                {"Error": {"Code": "TemplateDoesNotExist", "Message": name}}, "GetTemplate"
+            )
+
+
+class InMemorySESClient:
+    """
+    In-memory stand-in for the boto3 SES client methods used by chalicelib.
+
+    Every delivered email is appended to ``sent`` as a dict with "to",
+    "from", "subject", "text", "html" and "sent_at" (from ``clock``).
+    """
+
+    exceptions = _SESExceptions
+
+    def __init__(self, max_send_rate: float = 14.0, clock=None):
+        self._lock = threading.Lock()
+        self._templates: Dict[str, Dict] = {}
+        self._clock = clock or time.monotonic
+        self._message_ids = 0
+        self.max_send_rate = max_send_rate
+        self.sent: list = []
+
+    def get_send_quota(self) -> Dict:
+        return {
+            "Max24HourSend": 50000.0,
+            "MaxSendRate": self.max_send_rate,
+            "SentLast24Hours": 0.0,
+        }
+
+    def get_template(self, TemplateName: str) -> Dict:
+        with self._lock:
+            template = self._templates.get(TemplateName)
+        if template is None:
+            raise self.exceptions.TemplateDoesNotExistException(TemplateName)
+        return {"Template": dict(template)}
+
+    def create_template(self, Template: Dict) -> Dict:
+        with self._lock:
+            self._templates[Template["TemplateName"]] = dict(Template)
+        return {}
+
+    def send_email(self, Source: str, Destination: Dict, Message: Dict, **kwargs) -> Dict:
+        body = Message["Body"]
+        return {
+            "MessageId": self._deliver(
+                Source,
+                Destination["ToAddresses"],
+                Message["Subject"]["Data"],
+                body.get("Text", {}).get("Data", ""),
+                body.get("Html", {}).get("Data", ""),
+            )
+        }
+
+    def send_bulk_templated_email(
+        self,
+        Source: str,
+        Template: str,
+        DefaultTemplateData: str,
+        Destinations: list,
+        **kwargs,
+    ) -> Dict:
+        template = self.get_template(TemplateName=Template)["Template"]
+        defaults = json.loads(DefaultTemplateData)
+        statuses = []
+        for destination in Destinations:
+            replacements = json.loads(destination.get("ReplacementTemplateData", "{}"))
+            data = dict(defaults, **replacements)
+            message_id = self._deliver(
+                Source,
+                destination["Destination"]["ToAddresses"],
+                _render_template(template.get("SubjectPart", ""), data),
+                _render_template(template.get("TextPart", ""), data),
+                _render_template(template.get("HtmlPart", ""), data),
+            )
+            statuses.append({"Status": "Success", "MessageId": message_id})
+        return {"Status": statuses}
+
+    def _deliver(
+        self, source: str, to_addresses: list, subject: str, text: str, html: str
+    ) -> str:
+        with self._lock:
+            self._message_ids += 1
+            message_id = f"local-{self._message_ids}"
+            for address in to_addresses:
+                self.sent.append(
+                    {
+                        "message_id": message_id,
+                        "to": address,
+                        "from": source,
+                        "subject": subject,
+                        "text": text,
+                        "html": html,
+                        "sent_at": self._clock(),
+                    }
+                )
+        return message_id
+
+
+def _render_template(template: str, data: Dict) -> str:
+    """Substitute {{{name}}} placeholders as given and {{name}} ones HTML-escaped, as SES does."""
+
+    def substitute(match):
+        value = str(data.get(match.group(2), ""))
+        return value if match.group(1) else html.escape(value)
+
+    return re.sub(r"\{\{(\{)?\s*(\w+)\s*\}?\}\}", substitute, template)
+
+
+class StubBedrockClient:
+    """
+    Canned-response stand-in for the bedrock-runtime client.
+
+    Responses come from ``handler(request_body) -> text`` when given,
+    otherwise from ``responses`` in turn (the last one repeats).
+    ``responses_by_model`` gives a model its own responses in the same way,
+    for testing a model cascade. Every request body is recorded in ``calls``.
+
+    Usage mimics prompt caching: the system blocks up to the last
+    ``cache_control`` breakpoint are written to the cache on a model's first
+    request and read from it while later requests repeat them exactly.
+    Like Bedrock, prefixes shorter than ``min_cache_tokens`` are not cached
+    and count as input tokens.
+
+    ``invoke_model_with_response_stream`` replays ``stream_events`` (recorded
+    Anthropic stream payloads) when given. Otherwise it splits the response
+    text into ``chunk_size``-character deltas. Either way the text is cut off
+    after ``max_output_chars`` with a "max_tokens" stop reason, to simulate a
+    truncated response.
+    """
+
+    def __init__(
+        self,
+        responses=None,
+        handler=None,
+        latency: float = 0.0,
+        stream_events: Optional[List[Dict]] = None,
+        chunk_size: int = 16,
+        max_output_chars: Optional[int] = None,
+        responses_by_model: Optional[Dict[str, List[str]]] = None,
+        min_cache_tokens: int = 1024,
+    ):
+        self.responses = list(responses or ["[]"])
+        self.responses_by_model = {
+            model_id: list(model_responses)
+            for model_id, model_responses in (responses_by_model or {}).items()
+        }
+        self.handler = handler
+        self.latency = latency
+        self.stream_events = stream_events
+        self.chunk_size = chunk_size
+        self.max_output_chars = max_output_chars
+        self.min_cache_tokens = min_cache_tokens
+        self.calls: list = []
+        self._cached_prefixes: set = set()
+        self._lock = threading.Lock()
+
+    def invoke_model(self, modelId: str, body: str, **kwargs) -> Dict:
+        request, text = self._respond(modelId, body)
+        stop_reason = "end_turn"
+        if self.max_output_chars is not None and len(text) > self.max_output_chars:
+            text, stop_reason = text[: self.max_output_chars], "max_tokens"
+
+        response = {
+            "content": [{"type": "text", "text": text}],
+            "stop_reason": stop_reason,
+            "usage": self._usage(modelId, request, text),
+        }
+        return {"body": io.BytesIO(json.dumps(response).encode("utf-8"))}
+
+    def invoke_model_with_response_stream(self, modelId: str, body: str, **kwargs) -> Dict:
+        if self.stream_events is not None:
+            with self._lock:
+                self.calls.append({"modelId": modelId, "body": json.loads(body)})
+            if self.latency:
+                time.sleep(self.latency)
+            events = self._truncate_events(self.stream_events)
+        else:
+            request, text = self._respond(modelId, body)
+            deltas = [
+                text[i : i + self.chunk_size] for i in range(0, len(text), self.chunk_size)
+            ]
+            usage = self._usage(modelId, request, text)
+            output_tokens = usage.pop("output_tokens")
+            events = [
+                {"type": "message_start", "message": {"usage": dict(usage, output_tokens=1)}},
+                {"type": "content_block_start", "index": 0},
+            ]
+            events.extend(
+                {"type": "content_block_delta", "index": 0, "delta": {"text": delta}}
+                for delta in deltas
+            )
+            events.append({"type": "content_block_stop", "index": 0})
+            events.append(
+                {
+                    "type": "message_delta",
+                    "delta": {"stop_reason": "end_turn"},
+                    "usage": {"output_tokens": output_tokens},
+                }
+            )
+            events.append({"type": "message_stop"})
+            events = self._truncate_events(events)
+        return {
+            "body": (
+                {"chunk": {"bytes": json.dumps(event).encode("utf-8")}} for event in events
+            )
+        }
+
+    def _respond(self, modelId: str, body: str):
+        request = json.loads(body)
+        with self._lock:
+            self.calls.append({"modelId": modelId, "body": request})
+            if modelId in self.responses_by_model:
+                responses = self.responses_by_model[modelId]
+                count = sum(1 for call in self.calls if call["modelId"] == modelId)
+            else:
+                responses, count = self.responses, len(self.calls)
+            index = min(count, len(responses)) - 1
+        text = self.handler(request) if self.handler else responses[index]
+        if self.latency:
+            time.sleep(self.latency)
+        return request, text
+
+    def _usage(self, modelId: str, request: Dict, text: str) -> Dict:
+        system = request.get("system", [])
+        if isinstance(system, str):
+            system = [{"type": "text", "text": system}]
+        breakpoints = [i for i, block in enumerate(system) if "cache_control" in block]
+        cached = system[: breakpoints[-1] + 1] if breakpoints else []
+        prefix = json.dumps(cached, sort_keys=True)
+        if len(prefix) // 4 < self.min_cache_tokens:
+            cached, prefix = [], json.dumps([])
+        cached_tokens = len(prefix) // 4 if cached else 0
+        with self._lock:
+            hit = (modelId, prefix) in self._cached_prefixes
+            if cached:
+                self._cached_prefixes.add((modelId, prefix))
+
+        uncached_chars = len(json.dumps(system[len(cached) :])) + len(
+            json.dumps(request.get("messages", []))
+        )
+        return {
+            "input_tokens": uncached_chars // 4,
+            "cache_read_input_tokens": cached_tokens if hit else 0,
+            "cache_creation_input_tokens": 0 if hit else cached_tokens,
+            "output_tokens": len(text) // 4,
+        }
+
+    def _truncate_events(self, events: List[Dict]) -> List[Dict]:
+        """Cut the text deltas off after max_output_chars and report max_tokens."""
+        if self.max_output_chars is None:
+            return list(events)
+        remaining = self.max_output_chars
+        truncated = []
+        for event in events:
+            if event.get("type") == "content_block_delta":
+                if remaining <= 0:
+                    continue
+                text = event["delta"].get("text", "")[:remaining]
+                remaining -= len(text)
+                event = dict(event, delta=dict(event["delta"], text=text))
+            elif event.get("type") == "message_delta" and remaining <= 0:
+                event = dict(event, delta=dict(event["delta"], stop_reason="max_tokens"))
+            truncated.append(event)
+        return truncated
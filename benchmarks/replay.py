@@ -0,0 +1,51 @@
+import json
+import time
+from typing import Dict, Optional
+
+
+class ReplayResponse:
+    """Just enough of requests.Response for the venue bots."""
+
+    def __init__(self, url: str, body: str, status_code: int = 200):
+        self.url = url
+        self.text = body
+        self.content = body.encode("utf-8")
+        self.status_code = status_code
+        self.headers: Dict[str, str] = {}
+
+    def json(self):
+        return json.loads(self.text)
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"{self.status_code} for {self.url}")
+
+    def close(self):
+        pass
+
+
+class ReplaySession:
+    """
+    Stand-in for requests.Session that serves recorded bodies by URL.
+
+    ``routes`` maps a URL prefix to the body returned for any request whose
+    URL starts with it. ``latency`` adds a fixed delay per request to model
+    network round-trips.
+    """
+
+    def __init__(self, routes: Dict[str, str], latency: float = 0.0):
+        self.routes = routes
+        self.latency = latency
+        self.headers: Dict[str, str] = {}
+        self.requests = 0
+
+    def request(self, method: str, url: str, **kwargs) -> ReplayResponse:
+        self.requests += 1
+        if self.latency:
+            time.sleep(self.latency)
+        body: Optional[str] = next(
+            (body for prefix, body in self.routes.items() if url.startswith(prefix)), None
+        )
+        if body is None:
+            return ReplayResponse(url, "", status_code=404)
+        return ReplayResponse(url, body)
@@ -0,0 +1,249 @@
+"""
+Run the full ComedyBotService pipeline offline and report per-stage costs.
+
+Venue HTTP is replayed from the synthetic fixtures in benchmarks/fixtures
+(see "generated_by" in its manifest.json), Bedrock is a canned-response stub and SES is an in-memory sink, so no network or AWS
+access is needed. Fixtures can be scaled up synthetically, and results can
+be saved as a baseline and compared against later runs.
+
+    python benchmarks/run_pipeline.py [--venues 1] [--days 21] [--favorites 17]
+        [--subscribers 0] [--repeat 5] [--save-baseline FILE]
+        [--baseline FILE --max-regression 0.25]
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES = os.path.join(ROOT, "benchmarks", "fixtures")
+sys.path.insert(0, ROOT)
+
+from benchmarks.fake_aws import InMemorySESClient, StubBedrockClient  # noqa: E402
+from benchmarks.replay import ReplaySession  # noqa: E402
+from chalicelib import bot_service as bot_service_module  # noqa: E402
+from chalicelib.bot_service import ComedyBotService  # noqa: E402
+from chalicelib.config import Config  # noqa: E402
+from chalicelib.email_service import EmailService  # noqa: E402
+from chalicelib.http_client import HttpClient  # noqa: E402
+from chalicelib.llm_extractor import LLMExtractor  # noqa: E402
+from chalicelib.metrics import MemorySink, metrics  # noqa: E402
+from chalicelib.subscribers import Subscriber, SubscriberRegistry  # noqa: E402
+from chalicelib.venues import ComedyCellarBot, TheStandBot  # noqa: E402
+
+
+def load_fixtures():
+    with open(os.path.join(FIXTURES, "manifest.json")) as f:
+        manifest = json.load(f)
+    fixtures = {"start_date": manifest["start_date"]}
+    for name in ("cellar", "stand", "bedrock_stand", "bedrock_stand_stream"):
+        with open(os.path.join(FIXTURES, manifest[name])) as f:
+            fixtures[name] = f.read()
+    return fixtures
+
+
+def fixture_dates(start_date, days):
+    start = datetime.strptime(start_date, "%Y-%m-%d")
+    return [(start + timedelta(days=i)).strftime("%Y-%m-%d") for i in range(days)]
+
+
+def build_venues(args, fixtures):
+    """Build args.venues copies of each venue, all served from the fixtures."""
+    venues = []
+    for i in range(args.venues):
+        session = ReplaySession(
+            {
+                "https://www.comedycellar.com/": fixtures["cellar"],
+                "https://thestandnyc.com/": fixtures["stand"],
+            },
+            latency=args.http_latency,
+        )
+        http = HttpClient(session=session)
+        suffix = f" #{i + 1}" if args.venues > 1 else ""
+
+        cellar = ComedyCellarBot(http_client=http)
+        stand = TheStandBot(http_client=http)
+        stand.llm_extractor = LLMExtractor(
+            bedrock_client=StubBedrockClient(
+                [fixtures["bedrock_stand"]],
+                latency=args.bedrock_latency,
+                stream_events=json.loads(fixtures["bedrock_stand_stream"]),
+            )
+        )
+        for venue in (cellar, stand):
+            venue.name += suffix
+            venues.append(venue)
+    return venues
+
+
+def build_favorites(count):
+    favorites = list(Config.FAVORITE_COMEDIANS)
+    favorites += [f"Synthetic Comic {i}" for i in range(max(count - len(favorites), 0))]
+    return favorites[:count] if count < len(favorites) else favorites
+
+
+def build_registry(count, favorites):
+    if not count:
+        return None
+    rng = random.Random(0)
+    return SubscriberRegistry(
+        Subscriber(f"sub-{i}", f"sub-{i}@example.com", rng.sample(favorites, min(10, len(favorites))))
+        for i in range(count)
+    )
+
+
+def build_service(args, fixtures):
+    ses = InMemorySESClient(max_send_rate=1e9)
+    favorites = build_favorites(args.favorites)
+    Config.FAVORITE_COMEDIANS = favorites
+    service = ComedyBotService(
+        venues=build_venues(args, fixtures),
+        email_service=EmailService(ses_client=ses),
+        subscribers=build_registry(args.subscribers, favorites),
+    )
+    return service, ses
+
+
+def run_stages(args, fixtures):
+    """Run the pipeline once; return {stage: (seconds, items)}."""
+    dates = fixture_dates(fixtures["start_date"], args.days)
+    service, ses = build_service(args, fixtures)
+    timings = {}
+
+    start = time.perf_counter()
+    shows = {venue.name: venue.fetch_lineup_range(dates) for venue in service.venues}
+    show_count = sum(len(s) for by_date in shows.values() for s in by_date.values())
+    timings["fetch_parse"] = (time.perf_counter() - start, show_count)
+
+    start = time.perf_counter()
+    results = {}
+    for venue in service.venues:
+        venue_results = {}
+        for date, day_shows in shows[venue.name].items():
+            matches = venue.find_favorite_comedians(day_shows, service.comedian_matcher)
+            if matches:
+                venue_results[date] = matches
+        if venue_results:
+            results[venue.name] = venue_results
+    timings["match"] = (time.perf_counter() - start, show_count)
+
+    start = time.perf_counter()
+    if service.subscribers is not None:
+        digests = service.subscribers.build_digests(results)
+        for digest in digests.values():
+            service.email_service.format_digest_sections_html(digest)
+            service.email_service.format_digest_sections_text(digest)
+        rendered = len(digests)
+    else:
+        for venue_name, venue_results in results.items():
+            service.email_service.format_comedy_alert_html(venue_results, venue_name)
+            service.email_service.format_comedy_alert_text(venue_results, venue_name)
+        rendered = len(results)
+    timings["render"] = (time.perf_counter() - start, rendered)
+
+    start = time.perf_counter()
+    service.send_comedy_alerts(results)
+    timings["send"] = (time.perf_counter() - start, len(ses.sent))
+
+    # End to end with fresh venues, so The Stand reloads its calendar
+    service, _ = build_service(args, fixtures)
+    start = time.perf_counter()
+    service.check_all_venues()
+    timings["check_all_venues"] = (time.perf_counter() - start, show_count)
+    metrics.flush()
+    return timings
+
+
+def measure_allocations(args, fixtures):
+    """Peak traced memory and allocated blocks for one pipeline run, in KiB."""
+    tracemalloc.start()
+    run_stages(args, fixtures)
+    _, peak = tracemalloc.get_traced_memory()
+    blocks = sum(stat.count for stat in tracemalloc.take_snapshot().statistics("filename"))
+    tracemalloc.stop()
+    return {"peak_kib": round(peak / 1024, 1), "live_blocks": blocks}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--venues", type=int, default=1, help="copies of each venue")
+    parser.add_argument("--days", type=int, default=21)
+    parser.add_argument("--favorites", type=int, default=len(Config.FAVORITE_COMEDIANS))
+    parser.add_argument("--subscribers", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--http-latency", type=float, default=0.0, help="seconds per request")
+    parser.add_argument("--bedrock-latency", type=float, default=0.0, help="seconds per call")
+    parser.add_argument("--save-baseline", metavar="FILE")
+    parser.add_argument("--baseline", metavar="FILE")
+    parser.add_argument("--max-regression", type=float, default=0.25)
+    args = parser.parse_args()
+
+    Config.EXTRACTION_CACHE_BACKEND = "none"
+    metrics.sink = MemorySink()
+    fixtures = load_fixtures()
+    dates = fixture_dates(fixtures["start_date"], args.days)
+    bot_service_module.get_next_days = lambda days: dates
+
+    # Silence the pipeline's progress prints while measuring
+    stdout, sys.stdout = sys.stdout, open(os.devnull, "w")
+    try:
+        runs = [run_stages(args, fixtures) for _ in range(args.repeat)]
+        allocations = measure_allocations(args, fixtures)
+    finally:
+        sys.stdout.close()
+        sys.stdout = stdout
+
+    report = {"params": {k: v for k, v in vars(args).items() if "baseline" not in k}}
+    report["allocations"] = allocations
+    report["stages"] = {}
+    print(f"{'stage':<18}{'median ms':>12}{'min ms':>10}{'items':>8}{'items/s':>12}")
+    for stage in runs[0]:
+        seconds = [run[stage][0] for run in runs]
+        items = runs[0][stage][1]
+        median = statistics.median(seconds)
+        report["stages"][stage] = {"median_ms": round(median * 1000, 3), "items": items}
+        rate = items / median if median else 0
+        print(
+            f"{stage:<18}{median * 1000:>12.2f}{min(seconds) * 1000:>10.2f}"
+            f"{items:>8}{rate:>12.0f}"
+        )
+    print(f"allocations: {allocations}")
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Saved baseline to {args.save_baseline}")
+
+    if args.baseline:
+        sys.exit(compare(report, args.baseline, args.max_regression))
+
+
+def compare(report, baseline_path, max_regression):
+    """Print the change per stage against a baseline; return 1 on regression."""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+
+    regressed = False
+    print(f"\n{'stage':<18}{'baseline ms':>12}{'now ms':>10}{'change':>10}")
+    for stage, now in report["stages"].items():
+        before = baseline["stages"].get(stage)
+        if not before or not before["median_ms"]:
+            continue
+        change = now["median_ms"] / before["median_ms"] - 1
+        flag = "  REGRESSION" if change > max_regression else ""
+        regressed = regressed or bool(flag)
+        print(
+            f"{stage:<18}{before['median_ms']:>12.2f}{now['median_ms']:>10.2f}"
+            f"{change:>+10.0%}{flag}"
+        )
+    return 1 if regressed else 0
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+import random
+from datetime import date, timedelta
+from typing import List, Optional
+
+
+COMEDIANS = [
+    "Mark Normand", "Sam Morril", "Shane Gillis", "Ari Shaffir", "Kam Patterson",
+    "Andrew Schulz", "Tom Segura", "Chris Distefano", "Jon Laster", "Dave Attell",
+    "Jessica Kirson", "Keith Robinson", "Gina Brillon", "Joe List", "Liz Miele",
+    "Luis J. Gomez", "Yannis Pappas", "Robert Kelly", "Nimesh Patel", "Judah Friedlander",
+]
+
+NAV = """
+<header class="site-header"><nav class="nav"><ul>{items}</ul></nav></header>
+<script type="text/javascript">window.dataLayer = window.dataLayer || [];{filler}</script>
+<style>.card {{ display: flex; }} {filler}</style>
+"""
+
+SVG = (
+    '<svg class="icon" viewBox="0 0 24 24" width="24" height="24">'
+    '<path d="M12 2C6.48 2 2 6.48 2 12s4.48 10 10 10 10-4.48 10-10S17.52 2 12 2z"/></svg>'
+)
+
+
+def _lineup(
+    rng: random.Random, size: int, comedians: Optional[List[str]] = None
+) -> List[str]:
+    return rng.sample(comedians or COMEDIANS, size)
+
+
+def cellar_lineup_html(shows: int = 8, seed: int = 0) -> str:
+    """Comedy Cellar lineup API HTML with the given number of shows."""
+    rng = random.Random(seed)
+    parts = []
+    for i in range(shows):
+        hour = 6 + i % 6
+        parts.append(
+            f'<div class="set" data-show="{i}">'
+            f'<div class="set-header"><h2>{hour}:00 pm show - MacDougal St.</h2>'
+            f'<a class="tickets" href="/reservations/?showid={i}">Make a reservation</a></div>'
+            '<div class="set-lineup">'
+        )
+        for name in _lineup(rng, 6):
+            parts.append(
+                '<div class="set-content"><div class="photo">'
+                f'<img src="/img/{name.replace(" ", "-")}.jpg" srcset="/img/a.jpg 2x"></div>'
+                f'<span class="name">{name}</span>'
+                '<p class="bio">Seen on Netflix, Comedy Central and late night TV.</p></div>'
+            )
+        parts.append("</div></div>")
+    return "".join(parts)
+
+
+def stand_shows_html(
+    cards: int = 60,
+    seed: int = 0,
+    start: date = date(2025, 10, 17),
+    unparsed_every: int = 5,
+) -> str:
+    """
+    The Stand shows page HTML with navigation noise and the given number of cards.
+
+    Every ``unparsed_every``-th card lists its comedians as free text instead
+    of a list, so the structural parser hands it to the LLM.
+    """
+    rng = random.Random(seed)
+    items = "".join(
+        f'<li class="nav-item"><a href="/page-{i}">Page {i}</a></li>' for i in range(30)
+    )
+    filler = "var x = 1;" * 200
+    parts = [
+        "<html><head><title>Shows</title></head><body>",
+        NAV.format(items=items, filler=filler),
+    ]
+    parts.append('<main class="content"><div class="shows-grid">')
+    for i in range(cards):
+        show_date = start + timedelta(days=i // 3)
+        slug = f"show-{i}"
+        names = _lineup(rng, 5)
+        if unparsed_every and i % unparsed_every == unparsed_every - 1:
+            lineup = f'<p class="show-card__blurb">With {", ".join(names)} &amp; more!</p>'
+        else:
+            lineup = (
+                f'<ul class="comedians">{"".join(f"<li>{n}</li>" for n in names)}'
+                "<li>&amp; More!</li></ul>"
+            )
+        parts.append(
+            f'<div class="show-card card--featured" data-event-id="{i}" data-tracking="{slug}">'
+            f'<a class="show-card__image" href="/shows/{slug}"><img src="/img/{slug}.jpg" '
+            f'srcset="/img/{slug}@2x.jpg 2x" alt="">{SVG}</a>'
+            f'<div class="show-card__date">{show_date.strftime("%a, %b %d, %Y")}</div>'
+            f'<h3 class="show-card__title"><a href="/shows/{slug}">Late Night Laughs</a></h3>'
+            f'<div class="show-card__time">{7 + i % 4}:30 PM</div>{lineup}'
+            f'<a class="button" href="/shows/{slug}?buy=1">Buy Tickets</a>{SVG}</div>'
+        )
+    parts.append("</div></main><footer><p>The Stand NYC</p></footer></body></html>")
+    return "".join(parts)
@@ -0,0 +1,445 @@
+import json
+import os
+import struct
+import time
+import uuid
+import zlib
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from .comedian_matcher import normalize_name
+from .config import Config
+from .lazy import get_boto3_client
+from .venues import LineupTable, Show
+
+
+class ArchiveBackend(ABC):
+    """Blob storage for archive segments, addressed by "/"-separated keys."""
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[bytes]:
+        """Return the blob stored under key, or None."""
+        pass
+
+    @abstractmethod
+    def put(self, key: str, data: bytes):
+        """Store a blob under key."""
+        pass
+
+    @abstractmethod
+    def delete(self, key: str):
+        """Remove the blob stored under key, if any."""
+        pass
+
+    @abstractmethod
+    def list(self, prefix: str) -> List[str]:
+        """Keys directly under a prefix ending in "/", sorted."""
+        pass
+
+    @abstractmethod
+    def list_dirs(self, prefix: str) -> List[str]:
+        """Names of the sub-prefixes directly under a prefix ending in "/", sorted."""
+        pass
+
+
+class LocalArchiveBackend(ArchiveBackend):
+    """Archive backend storing each blob as a file under a root directory."""
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, *key.split("/"))
+
+    def get(self, key: str) -> Optional[bytes]:
+        try:
+            with open(self._path(key), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def put(self, key: str, data: bytes):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write then rename, so readers never see a partial segment
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def delete(self, key: str):
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def _entries(self, prefix: str) -> List[os.DirEntry]:
+        try:
+            with os.scandir(self._path(prefix.rstrip("/"))) as entries:
+                return list(entries)
+        except FileNotFoundError:
+            return []
+
+    def list(self, prefix: str) -> List[str]:
+        return sorted(
+            prefix + entry.name
+            for entry in self._entries(prefix)
+            if entry.is_file() and not entry.name.endswith(".tmp")
+        )
+
+    def list_dirs(self, prefix: str) -> List[str]:
+        return sorted(entry.name for entry in self._entries(prefix) if entry.is_dir())
+
+
+class S3ArchiveBackend(ArchiveBackend):
+    """
+    Archive backend storing one S3 object per blob.
+
+    Tests pass the in-memory client from benchmarks/fake_aws.py as ``s3_client``.
+    """
+
+    def __init__(self, bucket: str, prefix: str = "lineup-archive/", s3_client=None):
+        self.s3 = s3_client or get_boto3_client("s3")
+        self.bucket = bucket
+        self.prefix = prefix
+
+    def get(self, key: str) -> Optional[bytes]:
+        from botocore.exceptions import ClientError
+
+        try:
+            response = self.s3.get_object(Bucket=self.bucket, Key=self.prefix + key)
+        except ClientError as e:
+            if e.response["Error"]["Code"] in ("NoSuchKey", "404"):
+                return None
+            raise
+        return response["Body"].read()
+
+    def put(self, key: str, data: bytes):
+        self.s3.put_object(
+            Bucket=self.bucket,
+            Key=self.prefix + key,
+            Body=data,
+            ContentType="application/octet-stream",
+        )
+
+    def delete(self, key: str):
+        self.s3.delete_object(Bucket=self.bucket, Key=self.prefix + key)
+
+    def _list_pages(self, prefix: str) -> Iterator[Dict]:
+        kwargs = {"Bucket": self.bucket, "Prefix": self.prefix + prefix, "Delimiter": "/"}
+        while True:
+            response = self.s3.list_objects_v2(**kwargs)
+            yield response
+            if not response.get("IsTruncated"):
+                return
+            kwargs["ContinuationToken"] = response["NextContinuationToken"]
+
+    def list(self, prefix: str) -> List[str]:
+        return sorted(
+            obj["Key"][len(self.prefix) :]
+            for page in self._list_pages(prefix)
+            for obj in page.get("Contents", [])
+        )
+
+    def list_dirs(self, prefix: str) -> List[str]:
+        start = len(self.prefix + prefix)
+        return sorted(
+            common["Prefix"][start:].rstrip("/")
+            for page in self._list_pages(prefix)
+            for common in page.get("CommonPrefixes", [])
+        )
+
+
+class ShowArchive:
+    """
+    Append-only history of every show seen by each run.
+
+    ``append`` writes one segment per venue, run and calendar month of show
+    dates: a serialized LineupTable under
+    ``segments/<YYYY-MM>/<timestamp>-<venue>-<id>.seg``. Next to each segment,
+    a small comedian index under ``index/<YYYY-MM>/...idx`` maps each
+    normalized performer name to the (venue, date) pairs the segment lists
+    them at. Keys sort in write order, and nothing is rewritten, so runs
+    (and fan-out work items) can append concurrently.
+
+    Queries are partitioned by month. Range scans read only the months in
+    range and hold one month at a time. Comedian queries read only the
+    indexes, never the segments. ``compact`` merges a finished month into one
+    pack of its segments and one index, so the number of reads per month
+    stays constant as daily snapshots accumulate while every run's lineups
+    are kept.
+    """
+
+    SEGMENTS = "segments/"
+    INDEX = "index/"
+    # A compacted segment: length-prefixed serialized tables, one per run
+    PACK_MAGIC = b"LUP1"
+
+    def __init__(self, backend: ArchiveBackend, clock: Callable[[], float] = time.time):
+        """
+        Initialize the archive.
+
+        Args:
+            backend: Where segments and indexes are stored
+            clock: Wall clock in seconds, replaceable in tests
+        """
+        self.backend = backend
+        self.clock = clock
+
+    def append(self, shows: Iterable[Show], source: str = "") -> List[str]:
+        """
+        Archive one run's shows.
+
+        Args:
+            shows: Shows seen by the run; shows without a valid date are skipped
+            source: Identifier included in the segment keys, e.g. the venue
+
+        Returns:
+            The keys of the segments written
+        """
+        by_month: Dict[str, List[Show]] = {}
+        for show in shows:
+            if show.day is not None:
+                by_month.setdefault(show.date[:7], []).append(show)
+
+        stamp = datetime.fromtimestamp(self.clock(), timezone.utc).strftime(
+            "%Y%m%dT%H%M%S"
+        )
+        name = "-".join(part for part in (stamp, source, uuid.uuid4().hex[:8]) if part)
+        keys = []
+        for month, month_shows in sorted(by_month.items()):
+            table = LineupTable(month_shows)
+            # Index first, so every segment that exists is indexed
+            self.backend.put(
+                f"{self.INDEX}{month}/{name}.idx", self._encode_index(self._index(table))
+            )
+            key = f"{self.SEGMENTS}{month}/{name}.seg"
+            self.backend.put(key, table.to_bytes())
+            keys.append(key)
+        return keys
+
+    def months(self) -> List[str]:
+        """The YYYY-MM months that have archived shows, oldest first."""
+        return self.backend.list_dirs(self.SEGMENTS)
+
+    def scan(
+        self,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        venue: Optional[str] = None,
+        comedians: Optional[Iterable[str]] = None,
+        latest_only: bool = True,
+    ) -> Iterator[Show]:
+        """
+        Yield archived shows in date order, one month at a time.
+
+        Args:
+            start: Only dates on or after this YYYY-MM-DD date
+            end: Only dates on or before this YYYY-MM-DD date
+            venue: Only shows at this venue name
+            comedians: Only shows featuring at least one of these comedians
+            latest_only: For each venue and date, only the lineup from the
+                last run that saw it; otherwise every run's copy
+        """
+        comedians = list(comedians) if comedians is not None else None
+        low, high = start or "", end or "\uffff"
+        for month in self._months_between(start, end):
+            # (table, rows in range) per segment, and (venue, date) -> index
+            # of the segment holding its latest lineup
+            tables: List[Tuple[LineupTable, List[int]]] = []
+            latest: Dict[Tuple[str, str], int] = {}
+            for table in self._load_month(month):
+                rows = table.rows_between(low, high)
+                if venue is not None:
+                    rows = [row for row in rows if table.venue(row) == venue]
+                if not rows:
+                    continue
+                for row in rows:
+                    latest[(table.venue(row), table.date(row))] = len(tables)
+                tables.append((table, rows))
+
+            selected: List[Tuple[str, str, int, int]] = []
+            for index, (table, rows) in enumerate(tables):
+                if comedians is not None:
+                    featuring = set(table.rows_with_comedians(comedians))
+                    rows = [row for row in rows if row in featuring]
+                for row in rows:
+                    show_venue, date = table.venue(row), table.date(row)
+                    if latest_only and latest[(show_venue, date)] != index:
+                        continue
+                    selected.append((date, show_venue, index, row))
+
+            for _, _, index, row in sorted(selected):
+                yield tables[index][0].show(row)
+
+    def appearances(
+        self,
+        name: str,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        venue: Optional[str] = None,
+    ) -> List[Tuple[str, str]]:
+        """
+        The (venue, date) pairs a comedian was ever listed at, in date order.
+
+        Only the comedian indexes are read. A comedian dropped from a lineup
+        by a later run is still counted, since the index records every
+        listing seen; use ``scan`` for final lineups.
+        """
+        key = normalize_name(name)
+        found: Set[Tuple[str, str]] = set()
+        for month in self._months_between(start, end, self.INDEX):
+            found.update(self._month_appearances(month, key))
+        return sorted(
+            (
+                (pair_venue, date)
+                for pair_venue, date in found
+                if (venue is None or pair_venue == venue)
+                and (start is None or date >= start)
+                and (end is None or date <= end)
+            ),
+            key=lambda pair: (pair[1], pair[0]),
+        )
+
+    def last_appearance(
+        self, name: str, venue: Optional[str] = None, until: Optional[str] = None
+    ) -> Optional[Tuple[str, str]]:
+        """
+        The latest (venue, date) a comedian was listed at, or None.
+
+        Months are read newest first and the search stops at the first month
+        with a listing.
+
+        Args:
+            name: Comedian name, compared normalized
+            venue: Only listings at this venue name
+            until: Only dates on or before this YYYY-MM-DD date
+        """
+        key = normalize_name(name)
+        for month in reversed(self._months_between(None, until, self.INDEX)):
+            pairs = [
+                (pair_venue, date)
+                for pair_venue, date in self._month_appearances(month, key)
+                if (venue is None or pair_venue == venue)
+                and (until is None or date <= until)
+            ]
+            if pairs:
+                return max(pairs, key=lambda pair: (pair[1], pair[0]))
+        return None
+
+    def compact(self, before: Optional[str] = None) -> int:
+        """
+        Merge each finished month's segments and indexes into one of each.
+
+        The merged segment packs every run's table in write order, so scans
+        return the same shows as before, earlier runs' lineups included. The
+        merged index keeps every listing.
+
+        Args:
+            before: Compact months before this YYYY-MM; defaults to the
+                current month, which is still being appended to
+
+        Returns:
+            The number of months compacted
+        """
+        if before is None:
+            before = datetime.fromtimestamp(self.clock(), timezone.utc).strftime("%Y-%m")
+
+        compacted = 0
+        for month in self.months():
+            if month >= before:
+                continue
+            segment_keys = self.backend.list(f"{self.SEGMENTS}{month}/")
+            index_keys = self.backend.list(f"{self.INDEX}{month}/")
+            if len(segment_keys) <= 1 and len(index_keys) <= 1:
+                continue
+
+            merged = self._encode_pack(self._load_month(month))
+            appearances: Dict[str, Set[Tuple[str, str]]] = {}
+            for key in index_keys:
+                for name, pairs in self._load_index(key).items():
+                    appearances.setdefault(name, set()).update(map(tuple, pairs))
+
+            # Sorts after the keys it replaces, before anything appended later
+            name = segment_keys[-1].rsplit("/", 1)[1][: -len(".seg")] + "-compacted"
+            self.backend.put(
+                f"{self.INDEX}{month}/{name}.idx",
+                self._encode_index(
+                    {key: sorted(pairs) for key, pairs in appearances.items()}
+                ),
+            )
+            self.backend.put(f"{self.SEGMENTS}{month}/{name}.seg", merged)
+            for key in segment_keys + index_keys:
+                self.backend.delete(key)
+            compacted += 1
+            print(f"Compacted {len(segment_keys)} archive segments for {month}")
+        return compacted
+
+    def _months_between(
+        self, start: Optional[str], end: Optional[str], prefix: str = SEGMENTS
+    ) -> List[str]:
+        return [
+            month
+            for month in self.backend.list_dirs(prefix)
+            if (start is None or month >= start[:7]) and (end is None or month <= end[:7])
+        ]
+
+    def _month_appearances(self, month: str, name_key: str) -> Set[Tuple[str, str]]:
+        pairs: Set[Tuple[str, str]] = set()
+        for key in self.backend.list(f"{self.INDEX}{month}/"):
+            pairs.update(map(tuple, self._load_index(key).get(name_key, ())))
+        return pairs
+
+    @staticmethod
+    def _index(table: LineupTable) -> Dict[str, List[Tuple[str, str]]]:
+        """Normalized performer name -> (venue, date) pairs in a table."""
+        appearances: Dict[str, Set[Tuple[str, str]]] = {}
+        for show in table.shows():
+            for name in show.comedians:
+                appearances.setdefault(normalize_name(name), set()).add(
+                    (show.venue, show.date)
+                )
+        return {name: sorted(pairs) for name, pairs in appearances.items()}
+
+    @staticmethod
+    def _encode_index(index: Dict[str, List[Tuple[str, str]]]) -> bytes:
+        return zlib.compress(json.dumps(index, separators=(",", ":")).encode("utf-8"))
+
+    def _load_index(self, key: str) -> Dict[str, List[List[str]]]:
+        data = self.backend.get(key)
+        return json.loads(zlib.decompress(data)) if data is not None else {}
+
+    def _load_month(self, month: str) -> Iterator[LineupTable]:
+        """A month's tables in write order, unpacking compacted segments."""
+        for key in self.backend.list(f"{self.SEGMENTS}{month}/"):
+            data = self.backend.get(key)
+            if data is None:
+                continue
+            if not data.startswith(self.PACK_MAGIC):
+                yield LineupTable.from_bytes(data)
+                continue
+            offset = len(self.PACK_MAGIC)
+            while offset < len(data):
+                (length,) = struct.unpack_from("<I", data, offset)
+                offset += 4
+                yield LineupTable.from_bytes(data[offset : offset + length])
+                offset += length
+
+    @classmethod
+    def _encode_pack(cls, tables: Iterable[LineupTable]) -> bytes:
+        parts = [cls.PACK_MAGIC]
+        for table in tables:
+            data = table.to_bytes()
+            parts += [struct.pack("<I", len(data)), data]
+        return b"".join(parts)
+
+    @classmethod
+    def from_config(cls) -> Optional["ShowArchive"]:
+        """Build the archive configured by Config, or None if archiving is disabled."""
+        backend_name = Config.ARCHIVE_BACKEND
+        if backend_name == "local":
+            return cls(LocalArchiveBackend(Config.ARCHIVE_PATH))
+        if backend_name == "s3":
+            return cls(S3ArchiveBackend(Config.ARCHIVE_BUCKET))
+        return None
@@ -1,72 +1,537 @@
-from typing import Dict, List
-from .venues import VenueBot
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Dict, List, Optional, Set, Tuple
+from .venues import Show, VenueBot
+from .archive import ShowArchive
+from .change_detection import LineupTracker
+from .checkpoint import RunCheckpoint
+from .circuit_breaker import CircuitBreaker, CircuitOpenError
+from .comedian_matcher import ComedianMatcher
 from .email_service import EmailService
-from .utils import get_next_days
+from .metrics import metrics
+from .poll_scheduler import PollScheduler
+from .snapshot import LineupSnapshot
+from .utils import DeadlineExceeded, get_next_days, seconds_until
 from .config import Config
+from .state_store import StateStore
+from .subscribers import SubscriberRegistry, merge_results
 
 
 class ComedyBotService:
     """Main service for coordinating comedy show checking and notifications."""
 
-    def __init__(self, venues: List[VenueBot], email_service: EmailService):
+    COLLECT_GRACE_SECONDS = 1.0
+    # Subscriber digests that failed to send, retried by the next run
+    OUTBOX_KEY = "outbox:digests"
+
+    def __init__(
+        self,
+        venues: List[VenueBot],
+        email_service: EmailService,
+        state_store: Optional[StateStore] = None,
+        subscribers: Optional[SubscriberRegistry] = None,
+        archive: Optional[ShowArchive] = None,
+    ):
         self.venues = venues
         self.email_service = email_service
-        self.favorite_comedians = Config.get_favorite_comedians()
+        self.state_store = state_store
         self.email_config = Config.get_email_config()
 
-    def check_all_venues(self) -> Dict[str, Dict[str, Dict[str, List[str]]]]:
-        """Check all venues for favorite comedians in the next 7 days."""
-        all_results = {}
-        dates = get_next_days(21)
+        # With a subscriber registry, lineups are matched once against every
+        # subscriber's favorites and split into per-subscriber digests
+        self.subscribers = subscribers
+        if subscribers is not None:
+            self.comedian_matcher = subscribers.matcher
+        else:
+            self.comedian_matcher = ComedianMatcher.from_config()
 
-        for venue in self.venues:
-            venue_results = {}
-            for date in dates:
-                try:
-                    shows = venue.fetch_lineup(date)
-                    matches = venue.find_favorite_comedians(
-                        shows, self.favorite_comedians
+        # In delta mode only shows that are new or gained performers since the
+        # previous run are alerted on
+        self.lineup_tracker = None
+        if state_store is not None and Config.ALERT_MODE == "delta":
+            self.lineup_tracker = LineupTracker(state_store)
+
+        # Tracks how often each venue and date changes, so polling runs can
+        # check only the dates that are due
+        self.poll_scheduler = None
+        if self.lineup_tracker is not None:
+            self.poll_scheduler = PollScheduler.from_config(state_store)
+
+        # Each venue gets a circuit breaker, so a venue that is down costs a
+        # few failed requests rather than a timeout per date
+        for venue in venues:
+            venue.breaker = CircuitBreaker.from_config(
+                venue.get_venue_identifier(), state_store
+            )
+        # Venues that could not be fully checked in the last run, mapped to why
+        self.degraded_venues: Dict[str, str] = {}
+
+        # Every fetched lineup is appended to the archive, when there is one
+        self.archive = archive
+
+        # Upcoming matched shows, precomputed for the read API
+        self.snapshot = LineupSnapshot.from_config(state_store)
+
+        # Venue dates a run could not check before its deadline, resumed by
+        # the next run
+        self.checkpoint = RunCheckpoint.from_config(state_store)
+        self.pending_work: Dict[str, List[str]] = {}
+        self.resumed_run = False
+
+        # Venue threads keep running past the deadline, and the service is
+        # reused by warm invocations. Each run has an ID and the venues it
+        # gave up on, and a thread only stages state while its run is current
+        # and still waiting for it
+        self._staging_lock = threading.Lock()
+        self._run_id = 0
+        self._abandoned_venues: Set[str] = set()
+
+    def check_all_venues(
+        self, deadline: Optional[float] = None, due_only: bool = False
+    ) -> Dict[str, Dict[str, Dict[str, List[str]]]]:
+        """
+        Check all venues for favorite comedians over the lookahead window.
+
+        Venues are checked concurrently and each loads its lineups for the
+        whole window through ``fetch_lineup_range``, so the run takes roughly
+        as long as the slowest venue. Results are merged in venue and date order.
+        Venues that failed, timed out or whose circuit is open are recorded
+        in ``degraded_venues``.
+
+        Each venue's dates are fetched nearest first, so when the deadline
+        cuts a run short it is the later dates that are left. Those are
+        saved to the checkpoint and kept in ``pending_work``; the next run
+        checks only them instead of starting over. A resumed run keeps the
+        dates it could not check for any reason, errors and open circuits
+        included, since no other run would check them before the
+        checkpoint expires.
+
+        Args:
+            deadline: Optional ``time.monotonic()`` timestamp. Venues that have
+                not finished by then are dropped from the results, and
+                whatever they stage afterwards is discarded.
+            due_only: Only check the dates the poll scheduler says are due,
+                within each venue's fetch budget (see ``due_dates``)
+        """
+        if due_only and self.poll_scheduler is None:
+            raise ValueError("due_only requires delta alerts and a state store")
+
+        resumed = self.checkpoint.load() if self.checkpoint is not None else None
+        self.resumed_run = resumed is not None
+        work = self._plan_work(get_next_days(Config.LOOKAHEAD_DAYS), due_only, resumed)
+        with self._staging_lock:
+            self._run_id += 1
+            self._abandoned_venues = set()
+            run_id = self._run_id
+        executor = ThreadPoolExecutor(
+            max_workers=max(len(self.venues), 1), thread_name_prefix="venue"
+        )
+        futures = [
+            (
+                venue,
+                executor.submit(
+                    self._check_venue,
+                    venue,
+                    work[venue.get_venue_identifier()],
+                    deadline,
+                    run_id,
+                ),
+            )
+            for venue in self.venues
+            if work[venue.get_venue_identifier()]
+        ]
+        # Venues stop at the deadline themselves, so allow a moment to collect
+        # their partial results before giving up on them
+        timeout = seconds_until(deadline)
+        if timeout is not None:
+            timeout += self.COLLECT_GRACE_SECONDS
+        done, _ = wait([f for _, f in futures], timeout=timeout)
+        executor.shutdown(wait=False, cancel_futures=True)
+
+        all_results = {}
+        self.degraded_venues = {}
+        out_of_time = deadline is not None and time.monotonic() >= deadline
+        pending = {}
+        for venue, future in futures:
+            venue_id = venue.get_venue_identifier()
+            if future not in done:
+                print(f"Deadline reached before {venue.name} finished")
+                metrics.count("VenuesTimedOut", Venue=venue.get_venue_identifier())
+                self._mark_degraded(venue, "timed out")
+                self._abandon(venue)
+                pending[venue_id] = work[venue_id]
+                continue
+            try:
+                venue_results, fetched = future.result()
+            except Exception as e:
+                print(f"Error fetching {venue.name} lineups: {e}")
+                if not isinstance(e, CircuitOpenError):
+                    metrics.count(
+                        "Errors", Stage="Venue", Venue=venue.get_venue_identifier()
                     )
-                    if matches:
-                        venue_results[date] = matches
-                except Exception as e:
-                    print(f"Error fetching {venue.name} lineup for {date}: {e}")
-                    continue
+                self._mark_degraded(venue, self.degraded_reason(venue, e))
+                if resumed is not None:
+                    pending[venue_id] = work[venue_id]
+                continue
 
+            reason = self.degraded_reason(venue)
+            if reason is not None:
+                self._mark_degraded(venue, reason)
             if venue_results:
                 all_results[venue.name] = venue_results
+            # Dates left unfetched by the deadline, rather than by errors, or
+            # by anything on a resumed run
+            if (out_of_time or resumed is not None) and len(fetched) < len(work[venue_id]):
+                pending[venue_id] = [d for d in work[venue_id] if d not in fetched]
+                self._mark_degraded(venue, "unfinished")
 
+        self._save_checkpoint(pending, resumed)
         return all_results
 
+    def _plan_work(
+        self, dates: List[str], due_only: bool, resumed: Optional[Dict]
+    ) -> Dict[str, List[str]]:
+        """Each venue's dates to check this run, nearest first."""
+        work = {}
+        for venue in self.venues:
+            venue_id = venue.get_venue_identifier()
+            if resumed is not None:
+                venue_dates = [d for d in resumed["pending"].get(venue_id, []) if d in dates]
+            elif due_only:
+                venue_dates = self.due_dates(venue, dates)
+            else:
+                venue_dates = dates
+            work[venue_id] = sorted(venue_dates)
+
+        if resumed is not None:
+            count = sum(len(venue_dates) for venue_dates in work.values())
+            print(f"Resuming {count} venue dates from the checkpoint")
+            metrics.count("ResumedWorkItems", count)
+        return work
+
+    def due_dates(self, venue: VenueBot, dates: List[str]) -> List[str]:
+        """
+        A venue's dates that are due a check, within its polling fetch budget.
+
+        The budget is ``POLL_FETCH_BUDGET`` times what one full check of the
+        dates costs: a fetch per date, or one for venues that load their
+        whole calendar at once.
+        """
+        budget = Config.POLL_FETCH_BUDGET * (len(dates) if venue.splits_by_date else 1)
+        due = self.poll_scheduler.due_dates(
+            venue.get_venue_identifier(), dates, budget=budget, per_date=venue.splits_by_date
+        )
+        print(f"{venue.name}: {len(due)} dates due")
+        return due
+
+    def record_checks(self, venue: VenueBot, checks: Dict[str, bool]):
+        """Stage a venue's checked dates and the fetches they cost on the poll scheduler."""
+        if self.poll_scheduler is None or not checks:
+            return
+        fetches = len(checks) if venue.splits_by_date else 1
+        self.poll_scheduler.record(venue.get_venue_identifier(), checks, fetches)
+
+    def _save_checkpoint(self, pending: Dict[str, List[str]], resumed: Optional[Dict]):
+        """Checkpoint the dates left pending, or clear a finished checkpoint."""
+        self.pending_work = pending
+        if self.checkpoint is None:
+            return
+        if pending:
+            metrics.count("PendingWorkItems", sum(len(dates) for dates in pending.values()))
+            self.checkpoint.save(pending, resumed)
+        elif resumed is not None:
+            self.checkpoint.clear()
+
+    def degraded_reason(
+        self, venue: VenueBot, error: Optional[Exception] = None
+    ) -> Optional[str]:
+        """Why a venue's check is incomplete, or None if it is not."""
+        if isinstance(error, CircuitOpenError):
+            return "circuit open"
+        if error is not None:
+            return str(error) or type(error).__name__
+        if venue.breaker is not None and venue.breaker.state == CircuitBreaker.OPEN:
+            return "circuit open"
+        return None
+
+    def _abandon(self, venue: VenueBot):
+        """Drop a timed-out venue's staged state and keep its thread from staging more."""
+        venue_id = venue.get_venue_identifier()
+        with self._staging_lock:
+            self._abandoned_venues.add(venue_id)
+            if self.lineup_tracker is not None:
+                self.lineup_tracker.discard(venue_id)
+            if self.poll_scheduler is not None:
+                self.poll_scheduler.discard(venue_id)
+            if self.snapshot is not None:
+                self.snapshot.unstage(venue_id)
+
+    def _is_current(self, venue: VenueBot, run_id: Optional[int]) -> bool:
+        """Whether a venue's check may stage state; call with the staging lock held."""
+        return run_id is None or (
+            run_id == self._run_id
+            and venue.get_venue_identifier() not in self._abandoned_venues
+        )
+
+    def _mark_degraded(self, venue: VenueBot, reason: str):
+        print(f"{venue.name} is degraded: {reason}")
+        metrics.count("VenuesDegraded", Venue=venue.get_venue_identifier())
+        self.degraded_venues[venue.name] = reason
+
+    def _check_venue(
+        self, venue: VenueBot, dates: List[str], deadline: Optional[float], run_id: int
+    ) -> Tuple[Dict[str, Dict[str, List[str]]], Dict[str, bool]]:
+        """
+        Check one venue and stage its poll history for ``send_comedy_alerts``.
+
+        Returns:
+            The matches by date, and the dates that were fetched
+        """
+        venue_results, checks = self.check_venue(venue, dates, deadline, run_id)
+        with self._staging_lock:
+            if self._is_current(venue, run_id):
+                self.record_checks(venue, checks)
+        return venue_results, checks
+
+    def check_venue(
+        self,
+        venue: VenueBot,
+        dates: List[str],
+        deadline: Optional[float] = None,
+        run_id: Optional[int] = None,
+    ) -> Tuple[Dict[str, Dict[str, List[str]]], Dict[str, bool]]:
+        """
+        Fetch one venue's lineups for the dates and match favorite comedians.
+
+        In delta mode the venue's new lineup state is staged on the tracker.
+        With a ``run_id``, nothing is staged once ``check_all_venues`` has
+        moved on to another run or given up on the venue.
+
+        Returns:
+            The matches by date, and each fetched date mapped to whether its
+            lineup changed (always True outside delta mode)
+
+        Raises:
+            CircuitOpenError: If the venue's circuit is open and its cooldown
+                has not passed
+            DeadlineExceeded: If the run gave up on the venue before its
+                lineups were fetched
+        """
+        if venue.breaker is not None:
+            venue.breaker.load()
+            venue.breaker.raise_if_open()
+
+        venue_results = {}
+        shows_by_date = venue.fetch_lineup_range(dates, deadline=deadline)
+        if self.archive is not None and shows_by_date:
+            self._archive_lineups(venue, shows_by_date)
+
+        diff = None
+        checks = {date: True for date in shows_by_date}
+        with self._staging_lock:
+            if not self._is_current(venue, run_id):
+                raise DeadlineExceeded(f"{venue.name} finished after its run gave up on it")
+            if self.snapshot is not None:
+                self._stage_snapshot(venue, shows_by_date)
+            if self.lineup_tracker is not None:
+                diff = self.lineup_tracker.diff(venue.get_venue_identifier(), shows_by_date)
+                print(f"{venue.name} lineup changes: {diff.summary()}")
+                checks = {date: date not in diff.unchanged_dates for date in shows_by_date}
+
+        with metrics.span("Match", Venue=venue.get_venue_identifier()):
+            for date in dates:
+                if diff is None:
+                    shows = shows_by_date.get(date, [])
+                elif date in diff.unchanged_dates:
+                    continue
+                else:
+                    shows = diff.changed_shows(date)
+
+                matches = venue.find_favorite_comedians(shows, self.comedian_matcher)
+                if matches:
+                    venue_results[date] = matches
+
+        metrics.count(
+            "Matches",
+            sum(len(names) for shows in venue_results.values() for names in shows.values()),
+            Venue=venue.get_venue_identifier(),
+        )
+        return venue_results, checks
+
+    def _archive_lineups(self, venue: VenueBot, shows_by_date: Dict[str, List[Show]]):
+        """Append a venue's fetched lineups to the archive, logging any failure."""
+        try:
+            with metrics.span("Archive", Venue=venue.get_venue_identifier()):
+                self.archive.append(
+                    (show for shows in shows_by_date.values() for show in shows),
+                    source=venue.get_venue_identifier(),
+                )
+        except Exception as e:
+            print(f"Error archiving {venue.name} lineups: {e}")
+            metrics.count("Errors", Stage="Archive", Venue=venue.get_venue_identifier())
+
+    def _stage_snapshot(self, venue: VenueBot, shows_by_date: Dict[str, List[Show]]):
+        """Stage every fetched show that features a favorite, changed or not."""
+        entries_by_date = {}
+        for date, shows in shows_by_date.items():
+            entries = []
+            for show in shows:
+                favorites = venue.find_favorite_comedians([show], self.comedian_matcher)
+                if favorites:
+                    entries.append(
+                        LineupSnapshot.entry(
+                            show, favorites[show.time_and_venue], venue.show_link(show)
+                        )
+                    )
+            entries_by_date[date] = entries
+        self.snapshot.stage(venue.get_venue_identifier(), entries_by_date)
+
     def send_comedy_alerts(self, results: Dict[str, Dict[str, Dict[str, List[str]]]]):
-        """Send email alerts for all venues with matches."""
-        if not results:
+        """
+        Send email alerts for all venues with matches, then commit the run's state.
+
+        In delta mode the lineup state of a venue whose alert failed is not
+        committed, so its changes are alerted on again by the next run.
+        Subscriber digests that failed are kept and sent with the next run's.
+        """
+        failed_venues: List[str] = []
+        if self.subscribers is not None:
+            self._send_subscriber_digests(results)
+        elif not results and self.lineup_tracker is not None:
+            print("No new or changed shows with favorite comedians")
+        elif not results and self.degraded_venues:
+            # Some venues were not checked, so "no shows" may not be true
+            print(f"Not sending the no-shows email, degraded: {self.degraded_venues}")
+        elif not results and self.resumed_run:
+            # Only the dates left by an earlier run were checked
+            print("No shows with favorite comedians in the resumed dates")
+        elif not results:
             self._send_no_shows_email()
+        else:
+            failed_venues = [
+                venue_name
+                for venue_name, venue_results in results.items()
+                if not self._send_venue_alert(venue_name, venue_results)
+            ]
+
+        for venue in self.venues:
+            if venue.name in failed_venues:
+                print(f"Not committing {venue.name} state, its alert was not sent")
+                if self.lineup_tracker is not None:
+                    self.lineup_tracker.discard(venue.get_venue_identifier())
+                if self.poll_scheduler is not None:
+                    self.poll_scheduler.discard(venue.get_venue_identifier())
+        if self.lineup_tracker is not None:
+            self.lineup_tracker.commit()
+        if self.poll_scheduler is not None:
+            self.poll_scheduler.commit()
+        if self.snapshot is not None:
+            try:
+                self.snapshot.commit()
+            except Exception as e:
+                print(f"Failed to update the lineup snapshot: {e}")
+                metrics.count("Errors", Stage="Snapshot")
+
+    def _send_subscriber_digests(self, results: Dict[str, Dict[str, Dict[str, List[str]]]]):
+        """
+        Send each subscriber one email covering their matches at every venue.
+
+        Failed digests are logged by subscriber ID and counted. In delta
+        mode they are saved to the outbox and merged into the subscriber's
+        digest on the next run.
+        """
+        with metrics.span("Render"):
+            digests = self.subscribers.build_digests(results)
+            for subscriber_id, digest in self._load_outbox().items():
+                if subscriber_id in self.subscribers.subscribers:
+                    merge_results(digests.setdefault(subscriber_id, {}), digest)
+            subscriber_ids = sorted(digests)
+            messages = []
+            for subscriber_id in subscriber_ids:
+                digest = digests[subscriber_id]
+                messages.append(
+                    {
+                        "to": self.subscribers.subscribers[subscriber_id].email,
+                        "html": self.email_service.format_digest_sections_html(digest),
+                        "text": self.email_service.format_digest_sections_text(digest),
+                    }
+                )
+
+        if not messages:
+            print("No subscribers have matching shows")
             return
 
-        for venue_name, venue_results in results.items():
-            self._send_venue_alert(venue_name, venue_results)
+        statuses: List[Dict] = []
+        try:
+            with metrics.span("Send"):
+                statuses = self.email_service.send_bulk_digests(
+                    messages, from_address=self.email_config["from"]
+                )
+        except Exception as e:
+            print(f"Failed to send subscriber digests: {e}")
+
+        failed = [
+            subscriber_id
+            for i, subscriber_id in enumerate(subscriber_ids)
+            if i >= len(statuses) or statuses[i].get("Status") != "Success"
+        ]
+        print(f"Sent {len(messages) - len(failed)} digests, {len(failed)} failed")
+        if failed:
+            print(f"Digests not sent to subscribers: {', '.join(failed)}")
+        metrics.count("EmailsSent", len(messages) - len(failed))
+        metrics.count("EmailsFailed", len(failed))
+        self._save_outbox({subscriber_id: digests[subscriber_id] for subscriber_id in failed})
+
+    def _load_outbox(self) -> Dict[str, Dict[str, Dict[str, Dict[str, List[str]]]]]:
+        """Digests that failed to send on earlier runs, without past dates."""
+        if self.lineup_tracker is None:
+            return {}
+        outbox = self.state_store.get(self.OUTBOX_KEY) or {}
+        today = get_next_days(1)[0]
+        return {
+            subscriber_id: {
+                venue_name: {date: shows for date, shows in dates.items() if date >= today}
+                for venue_name, dates in digest.items()
+            }
+            for subscriber_id, digest in outbox.get("digests", {}).items()
+        }
+
+    def _save_outbox(self, digests: Dict[str, Dict[str, Dict[str, Dict[str, List[str]]]]]):
+        """Keep failed digests for the next run, which commits their lineup state."""
+        if self.lineup_tracker is None:
+            return
+        if digests:
+            self.state_store.put(self.OUTBOX_KEY, {"digests": digests})
+        else:
+            self.state_store.delete(self.OUTBOX_KEY)
 
     def _send_venue_alert(
         self, venue_name: str, results: Dict[str, Dict[str, List[str]]]
-    ):
-        """Send alert for a specific venue."""
+    ) -> bool:
+        """Send alert for a specific venue; return whether it was sent."""
         subject = f"{venue_name} Comedy Alert - Your Favorite Comedians!"
 
-        html_body = self.email_service.format_comedy_alert_html(results, venue_name)
-        text_body = self.email_service.format_comedy_alert_text(results, venue_name)
+        with metrics.span("Render"):
+            html_body = self.email_service.format_comedy_alert_html(results, venue_name)
+            text_body = self.email_service.format_comedy_alert_text(results, venue_name)
 
         try:
-            response = self.email_service.send_email(
-                subject=subject,
-                body=text_body,
-                html_body=html_body,
-                to_address=self.email_config["to"],
-                from_address=self.email_config["from"],
-            )
+            with metrics.span("Send"):
+                response = self.email_service.send_email(
+                    subject=subject,
+                    body=text_body,
+                    html_body=html_body,
+                    to_address=self.email_config["to"],
+                    from_address=self.email_config["from"],
+                )
             print(f"Email sent for {venue_name}: {response.get('MessageId', 'No ID')}")
+            metrics.count("EmailsSent")
+            return True
         except Exception as e:
             print(f"Failed to send email for {venue_name}: {e}")
+            metrics.count("EmailsFailed")
+            return False
 
     def _send_no_shows_email(self):
         """Send email when no shows are found at any venue."""
@@ -84,13 +549,15 @@ class ComedyBotService:
         """
 
         try:
-            response = self.email_service.send_email(
-                subject=subject,
-                body=text_body,
-                html_body=html_body,
-                to_address=self.email_config["to"],
-                from_address=self.email_config["from"],
-            )
+            with metrics.span("Send"):
+                response = self.email_service.send_email(
+                    subject=subject,
+                    body=text_body,
+                    html_body=html_body,
+                    to_address=self.email_config["to"],
+                    from_address=self.email_config["from"],
+                )
             print(f"No shows email sent: {response.get('MessageId', 'No ID')}")
+            metrics.count("EmailsSent")
         except Exception as e:
             print(f"Failed to send no shows email: {e}")
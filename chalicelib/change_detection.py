@@ -0,0 +1,167 @@
+import hashlib
+import threading
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from .comedian_matcher import normalize_name
+from .state_store import StateStore
+from .venues.base import Show
+
+
+def fingerprint(*parts: str) -> str:
+    """Short stable hash of the given strings."""
+    digest = hashlib.sha1()
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()[:16]
+
+
+class LineupDiff:
+    """Changes to one venue's lineups since the previous run."""
+
+    def __init__(self):
+        # date -> shows that did not exist before
+        self.added: Dict[str, List[Show]] = {}
+        # date -> keys of shows that are gone
+        self.removed: Dict[str, List[str]] = {}
+        # date -> show key -> performers newly added to an existing show
+        self.added_performers: Dict[str, Dict[str, List[str]]] = {}
+        # date -> show key -> performers dropped from an existing show
+        self.removed_performers: Dict[str, Dict[str, List[str]]] = {}
+        # dates whose lineup fingerprint is unchanged
+        self.unchanged_dates: List[str] = []
+
+    def changed_shows(self, date: str) -> List[Show]:
+        """
+        Shows to match for a date: new shows, plus existing shows reduced to
+        their newly added performers.
+        """
+        shows = list(self.added.get(date, []))
+        for show_key, performers in self.added_performers.get(date, {}).items():
+            shows.append(Show(time_and_venue=show_key, comedians=performers, date=date))
+        return shows
+
+    def summary(self) -> Dict[str, int]:
+        return {
+            "added_shows": sum(len(shows) for shows in self.added.values()),
+            "removed_shows": sum(len(keys) for keys in self.removed.values()),
+            "changed_shows": len(
+                {
+                    (date, key)
+                    for changes in (self.added_performers, self.removed_performers)
+                    for date, shows in changes.items()
+                    for key in shows
+                }
+            ),
+            "unchanged_dates": len(self.unchanged_dates),
+        }
+
+
+class LineupTracker:
+    """
+    Remembers each venue's lineups between runs and diffs new lineups against them.
+
+    State is kept per venue as a fingerprint per date plus the performers of
+    each show, keyed by the show's time_and_venue label. New state is staged
+    during a run and only written by ``commit``, after alerts have gone out.
+    """
+
+    KEY_PREFIX = "lineup:"
+
+    def __init__(self, store: StateStore):
+        self.store = store
+        self._staged: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    def diff(self, venue_id: str, shows_by_date: Dict[str, List[Show]]) -> LineupDiff:
+        """
+        Compare fetched lineups with the previous run and stage the new state.
+
+        Dates missing from shows_by_date (for example because the fetch failed)
+        are neither diffed nor overwritten.
+        """
+        previous = self._load(venue_id)
+        diff = LineupDiff()
+        dates_state = {}
+
+        for date, shows in shows_by_date.items():
+            current = self._date_state(shows)
+            before = previous.get(date)
+            dates_state[date] = current
+
+            if before is not None and before["fingerprint"] == current["fingerprint"]:
+                diff.unchanged_dates.append(date)
+                continue
+
+            before_shows = before["shows"] if before else {}
+            for show in shows:
+                old_performers = before_shows.get(show.time_and_venue)
+                if old_performers is None:
+                    diff.added.setdefault(date, []).append(show)
+                    continue
+
+                old_keys = {normalize_name(name) for name in old_performers}
+                new_keys = {normalize_name(name) for name in show.comedians}
+                added = [n for n in show.comedians if normalize_name(n) not in old_keys]
+                removed = [n for n in old_performers if normalize_name(n) not in new_keys]
+                if added:
+                    diff.added_performers.setdefault(date, {})[show.time_and_venue] = added
+                if removed:
+                    diff.removed_performers.setdefault(date, {})[show.time_and_venue] = removed
+
+            gone = set(before_shows) - {show.time_and_venue for show in shows}
+            if gone:
+                diff.removed[date] = sorted(gone)
+
+        self._stage(venue_id, previous, dates_state)
+        return diff
+
+    def stage(self, venue_id: str, dates_state: Dict[str, Dict]):
+        """
+        Stage lineup state taken from another tracker with ``unstage``.
+
+        Used when venues or date slices are checked by separate workers and
+        the state is committed once by the aggregator.
+        """
+        self._stage(venue_id, self._load(venue_id), dates_state)
+
+    def unstage(self, venue_id: str, dates: Iterable[str]) -> Dict[str, Dict]:
+        """Remove a venue's staged state and return it for the given dates."""
+        with self._lock:
+            staged = self._staged.pop(venue_id, {})
+        return {date: staged[date] for date in dates if date in staged}
+
+    def discard(self, venue_id: str):
+        """Drop a venue's staged state, so its changes are alerted on again next run."""
+        with self._lock:
+            self._staged.pop(venue_id, None)
+
+    def _stage(self, venue_id: str, previous: Dict[str, Dict], dates_state: Dict[str, Dict]):
+        """Merge new per-date state over the venue's state, dropping past dates."""
+        today = datetime.now().strftime("%Y-%m-%d")
+        with self._lock:
+            if venue_id not in self._staged:
+                self._staged[venue_id] = {
+                    date: state for date, state in previous.items() if date >= today
+                }
+            self._staged[venue_id].update(dates_state)
+
+    def commit(self):
+        """Persist the state staged by ``diff`` calls since the last commit."""
+        with self._lock:
+            staged, self._staged = self._staged, {}
+        for venue_id, dates_state in staged.items():
+            self.store.put(self.KEY_PREFIX + venue_id, {"dates": dates_state})
+
+    def _load(self, venue_id: str) -> Dict[str, Dict]:
+        state: Optional[Dict] = self.store.get(self.KEY_PREFIX + venue_id)
+        return state["dates"] if state else {}
+
+    def _date_state(self, shows: List[Show]) -> Dict:
+        performers = {show.time_and_venue: list(show.comedians) for show in shows}
+        show_fingerprints = sorted(
+            fingerprint(key, *sorted(normalize_name(name) for name in names))
+            for key, names in performers.items()
+        )
+        return {"fingerprint": fingerprint(*show_fingerprints), "shows": performers}
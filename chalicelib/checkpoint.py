@@ -0,0 +1,100 @@
+import time
+from typing import Callable, Dict, List, Optional
+
+from .config import Config
+from .state_store import StateStore
+
+
+class RunCheckpoint:
+    """
+    Work a check left unfinished when its time budget ran out.
+
+    A check that reaches its deadline sends what it has and saves the
+    (venue, date) items it did not get to. The next check resumes from them
+    instead of starting over. A checkpoint is ignored once it is older
+    than ``max_age_seconds``, and dropped after ``max_resumes`` resumed runs
+    that still could not finish, so a venue that is always slow cannot keep
+    the checks resuming forever.
+    """
+
+    KEY = "checkpoint:check"
+
+    def __init__(
+        self,
+        store: StateStore,
+        max_age_seconds: float = 2 * 3600,
+        max_resumes: int = 3,
+        clock: Callable[[], float] = time.time,
+    ):
+        """
+        Initialize the checkpoint.
+
+        Args:
+            store: Where the pending work is kept between invocations
+            max_age_seconds: Age after which a checkpoint is ignored
+            max_resumes: Resumed runs allowed before the work is dropped
+            clock: Wall clock in seconds, replaceable in tests
+        """
+        self.store = store
+        self.max_age_seconds = max_age_seconds
+        self.max_resumes = max_resumes
+        self.clock = clock
+
+    def load(self) -> Optional[Dict]:
+        """
+        The saved checkpoint, or None if there is none or it is too old.
+
+        Returns:
+            {"pending": {venue_id: [dates]}, "resumes": int, "created_at": float}
+        """
+        checkpoint = self.store.get(self.KEY)
+        if checkpoint is None:
+            return None
+        if self.clock() - checkpoint["created_at"] > self.max_age_seconds:
+            print("Ignoring a stale checkpoint")
+            self.clear()
+            return None
+        return checkpoint
+
+    def save(self, pending: Dict[str, List[str]], resumed: Optional[Dict] = None):
+        """
+        Save the work items left pending by a run.
+
+        Args:
+            pending: Venue identifier mapped to the dates not checked
+            resumed: The checkpoint the run resumed from, if any
+        """
+        resumes = resumed["resumes"] + 1 if resumed else 0
+        if resumes > self.max_resumes:
+            print(f"Dropping work still pending after {self.max_resumes} resumed runs")
+            self.clear()
+            return
+        self.store.put(
+            self.KEY,
+            {
+                "pending": pending,
+                "resumes": resumes,
+                "created_at": resumed["created_at"] if resumed else self.clock(),
+            },
+        )
+        count = sum(len(dates) for dates in pending.values())
+        print(f"Checkpointed {count} pending venue dates")
+
+    def clear(self):
+        self.store.delete(self.KEY)
+
+    @classmethod
+    def from_config(cls, store: Optional[StateStore]) -> Optional["RunCheckpoint"]:
+        """
+        Build the checkpoint for a state store, or None without a shared one.
+
+        The resumed run may land in another container, which cannot read
+        this one's SQLite file.
+        """
+        if store is None or not Config.shared_state_store():
+            return None
+        return cls(
+            store,
+            max_age_seconds=Config.CHECKPOINT_MAX_AGE_MINUTES * 60,
+            max_resumes=Config.CHECKPOINT_MAX_RESUMES,
+        )
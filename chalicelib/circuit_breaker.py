@@ -0,0 +1,202 @@
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from .config import Config
+from .metrics import metrics
+from .state_store import StateStore
+from .utils import DeadlineExceeded
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a venue whose circuit is open."""
+
+
+class CircuitBreaker:
+    """
+    Stops calling a venue after consecutive failures.
+
+    Every call made through ``call`` counts as a success or a failure, except
+    for errors that say nothing about the venue's health: the run's deadline
+    passing and 4xx responses other than 429 (see ``counts_as_failure``). After
+    ``failure_threshold`` failures in a row the circuit opens, and for the
+    rest of the run calls fail immediately with CircuitOpenError instead of
+    each waiting out its own timeout.
+
+    The open state is kept in the state store, so later runs skip the venue
+    until a cooldown has passed. The next run after that is half-open: one
+    call is let through as a probe while the others wait for its outcome. A
+    successful probe closes the circuit. A failed one opens it again, for
+    twice as long each time up to ``max_cooldown_seconds``.
+
+    The store is only written when failures occur or the circuit recovers.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    KEY_PREFIX = "breaker:"
+
+    def __init__(
+        self,
+        name: str,
+        store: Optional[StateStore] = None,
+        failure_threshold: int = 3,
+        cooldown_seconds: float = 30 * 60,
+        max_cooldown_seconds: float = 6 * 3600,
+        clock: Callable[[], float] = time.time,
+    ):
+        """
+        Initialize the breaker.
+
+        Args:
+            name: Identifier of the guarded venue
+            store: Where the circuit state is kept between runs; without one
+                it only lasts as long as the container
+            failure_threshold: Consecutive failures that open the circuit
+            cooldown_seconds: How long the circuit first stays open
+            max_cooldown_seconds: Longest the circuit stays open after
+                repeated failed probes
+            clock: Wall clock in seconds, replaceable in tests
+        """
+        self.name = name
+        self.store = store
+        self.failure_threshold = max(failure_threshold, 1)
+        self.cooldown_seconds = cooldown_seconds
+        self.max_cooldown_seconds = max_cooldown_seconds
+        self.clock = clock
+        self._cond = threading.Condition()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._trips = 0
+        self._retry_at = 0.0
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        """The current state, treating an open circuit past its cooldown as half-open."""
+        with self._cond:
+            if self._state == self.OPEN and self.clock() >= self._retry_at:
+                return self.HALF_OPEN
+            return self._state
+
+    def load(self):
+        """Refresh the circuit state from the store, e.g. at the start of a run."""
+        if self.store is None:
+            return
+        saved = self.store.get(self.KEY_PREFIX + self.name) or {}
+        with self._cond:
+            self._state = saved.get("state", self.CLOSED)
+            self._failures = saved.get("failures", 0)
+            self._trips = saved.get("trips", 0)
+            self._retry_at = saved.get("retry_at", 0.0)
+            self._probing = False
+
+    def raise_if_open(self):
+        """Raise CircuitOpenError if calls would currently be refused."""
+        if self.state == self.OPEN:
+            raise CircuitOpenError(f"Circuit for {self.name} is open")
+
+    def call(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Call fn unless the circuit is open, and record whether it failed."""
+        self._before_call()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            if self.counts_as_failure(e):
+                self.record_failure()
+            else:
+                self._release_probe()
+            raise
+        self.record_success()
+        return result
+
+    @staticmethod
+    def counts_as_failure(error: Exception) -> bool:
+        """Whether an error is the venue's: connection errors, 429, 5xx and parse failures."""
+        if isinstance(error, DeadlineExceeded):
+            return False
+        status = getattr(getattr(error, "response", None), "status_code", None)
+        return status is None or status == 429 or status >= 500
+
+    def record_success(self):
+        with self._cond:
+            if self._state == self.CLOSED and self._failures == 0:
+                return
+            if self._state != self.CLOSED:
+                print(f"Circuit for {self.name} closed")
+            self._state = self.CLOSED
+            self._failures = 0
+            self._trips = 0
+            self._probing = False
+            self._cond.notify_all()
+            if self.store is not None:
+                self.store.delete(self.KEY_PREFIX + self.name)
+
+    def record_failure(self):
+        with self._cond:
+            if self._state == self.OPEN:
+                # A call that started before the circuit opened
+                return
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._trips += 1
+                cooldown = min(
+                    self.cooldown_seconds * 2 ** (self._trips - 1),
+                    self.max_cooldown_seconds,
+                )
+                self._state = self.OPEN
+                self._retry_at = self.clock() + cooldown
+                self._probing = False
+                self._cond.notify_all()
+                print(
+                    f"Circuit for {self.name} opened after {self._failures} "
+                    f"failures, retrying in {cooldown / 60:.0f} minutes"
+                )
+                metrics.count("CircuitTrips", Venue=self.name)
+            self._save()
+
+    def _release_probe(self):
+        """Let another call probe a half-open circuit after an inconclusive one."""
+        with self._cond:
+            if self._state == self.HALF_OPEN and self._probing:
+                self._probing = False
+                self._cond.notify_all()
+
+    def _before_call(self):
+        with self._cond:
+            while True:
+                if self._state == self.CLOSED:
+                    return
+                if self._state == self.OPEN:
+                    if self.clock() < self._retry_at:
+                        metrics.count("CallsShortCircuited", Venue=self.name)
+                        raise CircuitOpenError(f"Circuit for {self.name} is open")
+                    self._state = self.HALF_OPEN
+                if not self._probing:
+                    self._probing = True
+                    return
+                self._cond.wait()
+
+    def _save(self):
+        if self.store is None:
+            return
+        state: Dict[str, Any] = {
+            "state": self._state,
+            "failures": self._failures,
+            "trips": self._trips,
+            "retry_at": self._retry_at,
+        }
+        self.store.put(self.KEY_PREFIX + self.name, state)
+
+    @classmethod
+    def from_config(cls, name: str, store: Optional[StateStore]) -> "CircuitBreaker":
+        """Build a breaker for a venue with the configured thresholds."""
+        return cls(
+            name,
+            store,
+            failure_threshold=Config.BREAKER_FAILURE_THRESHOLD,
+            cooldown_seconds=Config.BREAKER_COOLDOWN_MINUTES * 60,
+            max_cooldown_seconds=Config.BREAKER_MAX_COOLDOWN_MINUTES * 60,
+        )
@@ -0,0 +1,115 @@
+import re
+import threading
+import unicodedata
+from difflib import SequenceMatcher
+from typing import Dict, Iterable, List, Optional
+
+from .config import Config
+
+
+def normalize_name(name: str) -> str:
+    """
+    Normalize a comedian name for lookup.
+
+    Strips accents, casefolds, drops apostrophes, turns other punctuation into
+    spaces and collapses whitespace, so "  Chris  D'Elia " and "chris delia"
+    normalize to the same key.
+    """
+    decomposed = unicodedata.normalize("NFKD", name)
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    folded = stripped.casefold().replace("'", "").replace("’", "")
+    return " ".join(re.sub(r"[^\w\s]", " ", folded).split())
+
+
+class ComedianMatcher:
+    """
+    Precompiled lookup from performer names to favorite comedians.
+
+    Exact matches are a single dictionary lookup on the normalized name.
+    Aliases map alternate spellings to a favorite. The optional fuzzy tier
+    only compares against favorites with the same first letter and a similar
+    length, and remembers its answers.
+    """
+
+    FUZZY_CACHE_SIZE = 4096
+
+    def __init__(
+        self,
+        favorites: Iterable[str],
+        aliases: Optional[Dict[str, str]] = None,
+        fuzzy_cutoff: Optional[float] = None,
+    ):
+        """
+        Build the matcher.
+
+        Args:
+            favorites: Favorite comedian names, as they should be reported
+            aliases: Optional mapping of alternate name to favorite name.
+                Matches are reported as the favorite is spelled in favorites,
+                and aliases of names that are not favorites are ignored.
+            fuzzy_cutoff: Similarity ratio (0-1) required for a fuzzy match;
+                None disables fuzzy matching
+        """
+        self.favorites: List[str] = list(favorites)
+        self.fuzzy_cutoff = fuzzy_cutoff
+        self._exact: Dict[str, str] = {}
+        for favorite in self.favorites:
+            self._exact.setdefault(normalize_name(favorite), favorite)
+        for alias, target in (aliases or {}).items():
+            favorite = self._exact.get(normalize_name(target))
+            if favorite is not None:
+                self._exact.setdefault(normalize_name(alias), favorite)
+
+        self._buckets: Dict[str, List[str]] = {}
+        for key in self._exact:
+            if key:
+                self._buckets.setdefault(key[0], []).append(key)
+
+        self._fuzzy_cache: Dict[str, Optional[str]] = {}
+        self._fuzzy_lock = threading.Lock()
+
+    def match(self, name: str) -> Optional[str]:
+        """Return the favorite comedian a performer name refers to, if any."""
+        key = normalize_name(name)
+        favorite = self._exact.get(key)
+        if favorite is not None or self.fuzzy_cutoff is None or not key:
+            return favorite
+
+        with self._fuzzy_lock:
+            if key in self._fuzzy_cache:
+                return self._fuzzy_cache[key]
+
+        favorite = self._fuzzy_match(key)
+
+        with self._fuzzy_lock:
+            if len(self._fuzzy_cache) >= self.FUZZY_CACHE_SIZE:
+                self._fuzzy_cache.clear()
+            self._fuzzy_cache[key] = favorite
+        return favorite
+
+    def _fuzzy_match(self, key: str) -> Optional[str]:
+        """Find the closest favorite among same-initial, similar-length names."""
+        best_key, best_ratio = None, self.fuzzy_cutoff
+        max_length_gap = max(2, len(key) // 5)
+        matcher = SequenceMatcher(b=key, autojunk=False)
+
+        for candidate in self._buckets.get(key[0], []):
+            if abs(len(candidate) - len(key)) > max_length_gap:
+                continue
+            matcher.set_seq1(candidate)
+            if matcher.real_quick_ratio() < best_ratio or matcher.quick_ratio() < best_ratio:
+                continue
+            ratio = matcher.ratio()
+            if ratio >= best_ratio:
+                best_key, best_ratio = candidate, ratio
+
+        return self._exact[best_key] if best_key is not None else None
+
+    @classmethod
+    def from_config(cls) -> "ComedianMatcher":
+        """Build the matcher for the configured favorites and aliases."""
+        return cls(
+            Config.get_favorite_comedians(),
+            aliases=Config.COMEDIAN_ALIASES,
+            fuzzy_cutoff=Config.FUZZY_MATCH_CUTOFF,
+        )
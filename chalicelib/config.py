@@ -1,5 +1,6 @@
+import json
 import os
-from typing import List
+from typing import Dict, List, Optional
 
 
 class Config:
@@ -25,10 +26,151 @@ class Config:
         "Matt Rife",
     ]
 
+    # Alternate spellings mapped to the favorite they refer to
+    COMEDIAN_ALIASES: Dict[str, str] = json.loads(
+        os.environ.get("COMEDIAN_ALIASES", "{}")
+    )
+    # Similarity ratio for fuzzy name matching; unset disables it
+    FUZZY_MATCH_CUTOFF: Optional[float] = (
+        float(os.environ["FUZZY_MATCH_CUTOFF"])
+        if os.environ.get("FUZZY_MATCH_CUTOFF")
+        else None
+    )
+
+    # JSON list of {"id", "email", "favorites"} subscribers, from a file or inline
+    SUBSCRIBERS_FILE = os.environ.get("SUBSCRIBERS_FILE", "")
+    SUBSCRIBERS_JSON = os.environ.get("SUBSCRIBERS_JSON", "")
+
     EMAIL_TO = os.environ.get("EMAIL_TO", "jonathangee09@gmail.com")
     EMAIL_FROM = os.environ.get("EMAIL_FROM", "comedy-alerts@jonathangaytan.com")
     AWS_REGION = os.environ.get("AWS_REGION", "us-east-1")
 
+    # Concurrency settings for checking venues
+    LOOKAHEAD_DAYS = int(os.environ.get("LOOKAHEAD_DAYS", "21"))
+    DEADLINE_SAFETY_MARGIN_SECONDS = float(
+        os.environ.get("DEADLINE_SAFETY_MARGIN_SECONDS", "15")
+    )
+
+    # Work a run leaves unchecked at its deadline is resumed by the next run
+    # unless older than the maximum age or still pending after the maximum
+    # number of resumed runs. Needs the dynamodb state store. With
+    # self-invoke, the function starts the next run itself instead of waiting
+    # for the schedule; without it, the daily schedule only resumes
+    # checkpoints if the maximum age is raised past a day.
+    CHECKPOINT_MAX_AGE_MINUTES = float(os.environ.get("CHECKPOINT_MAX_AGE_MINUTES", "120"))
+    CHECKPOINT_MAX_RESUMES = int(os.environ.get("CHECKPOINT_MAX_RESUMES", "3"))
+    CHECKPOINT_SELF_INVOKE = (
+        os.environ.get("CHECKPOINT_SELF_INVOKE", "true").lower() == "true"
+    )
+
+    # Consecutive venue failures before its circuit opens, and how long it
+    # stays open (doubling after each failed probe, up to the maximum)
+    BREAKER_FAILURE_THRESHOLD = int(os.environ.get("BREAKER_FAILURE_THRESHOLD", "3"))
+    BREAKER_COOLDOWN_MINUTES = float(os.environ.get("BREAKER_COOLDOWN_MINUTES", "30"))
+    BREAKER_MAX_COOLDOWN_MINUTES = float(
+        os.environ.get("BREAKER_MAX_COOLDOWN_MINUTES", "360")
+    )
+
+    # "delta" alerts only on new or changed shows, "full" on every match.
+    # Delta mode needs a state store shared by every invocation (dynamodb).
+    ALERT_MODE = os.environ.get("ALERT_MODE", "full")
+
+    # Period of the adaptive polling schedule in app.py, which is built from it
+    POLL_TICK_MINUTES = int(os.environ.get("POLL_TICK_MINUTES", "60"))
+    # Fetches each venue may make per 24 hours while polling, as a multiple of
+    # one full check. At 1.0 polling costs no more requests than the daily run.
+    POLL_FETCH_BUDGET = float(os.environ.get("POLL_FETCH_BUDGET", "1.0"))
+
+    # Fan-out mode: one SQS message per venue or date slice, aggregated before
+    # alerting. Needs a state store shared by all invocations (dynamodb), and
+    # the first invocation fails without one.
+    FANOUT_MODE = os.environ.get("FANOUT_MODE", "false").lower() == "true"
+    FANOUT_QUEUE_NAME = os.environ.get("FANOUT_QUEUE_NAME", "comedy-show-bots-fanout")
+    FANOUT_DATES_PER_ITEM = int(os.environ.get("FANOUT_DATES_PER_ITEM", "7"))
+    FANOUT_AGGREGATE_DELAY_SECONDS = int(
+        os.environ.get("FANOUT_AGGREGATE_DELAY_SECONDS", "30")
+    )
+    FANOUT_AGGREGATE_MAX_ATTEMPTS = int(
+        os.environ.get("FANOUT_AGGREGATE_MAX_ATTEMPTS", "20")
+    )
+
+    # Persistent state between runs ("sqlite", "dynamodb" or "none"). Each Lambda function has its own /tmp, so the SQLite file is
+    # only for local runs; deployed functions need dynamodb.
+    STATE_STORE_BACKEND = os.environ.get("STATE_STORE_BACKEND", "none")
+    STATE_STORE_PATH = os.environ.get("STATE_STORE_PATH", "/tmp/comedy_state.sqlite3")
+    STATE_STORE_TABLE = os.environ.get("STATE_STORE_TABLE", "comedy-show-bots-state")
+
+    # History of every show seen ("local", "s3" or "none")
+    ARCHIVE_BACKEND = os.environ.get("ARCHIVE_BACKEND", "none")
+    ARCHIVE_PATH = os.environ.get("ARCHIVE_PATH", "/tmp/lineup_archive")
+    ARCHIVE_BUCKET = os.environ.get("ARCHIVE_BUCKET", "")
+
+    # Read API: how long a container reuses the loaded snapshot, and the
+    # Cache-Control max-age sent to clients and caches
+    SNAPSHOT_REFRESH_SECONDS = float(os.environ.get("SNAPSHOT_REFRESH_SECONDS", "60"))
+    API_CACHE_MAX_AGE_SECONDS = int(os.environ.get("API_CACHE_MAX_AGE_SECONDS", "300"))
+
+    # Shared HTTP transport settings for venue bots
+    HTTP_POOL_HOSTS = int(os.environ.get("HTTP_POOL_HOSTS", "10"))
+    HTTP_MAX_CONNECTIONS_PER_HOST = int(
+        os.environ.get("HTTP_MAX_CONNECTIONS_PER_HOST", "6")
+    )
+    HTTP_CONNECT_TIMEOUT = float(os.environ.get("HTTP_CONNECT_TIMEOUT", "3.05"))
+    HTTP_READ_TIMEOUT = float(os.environ.get("HTTP_READ_TIMEOUT", "10"))
+    HTTP_MAX_RETRIES = int(os.environ.get("HTTP_MAX_RETRIES", "3"))
+    HTTP_BACKOFF_BASE = float(os.environ.get("HTTP_BACKOFF_BASE", "0.5"))
+    HTTP_BACKOFF_MAX = float(os.environ.get("HTTP_BACKOFF_MAX", "8"))
+
+    # LLM extraction cache ("sqlite", "s3" or "none")
+    EXTRACTION_CACHE_BACKEND = os.environ.get("EXTRACTION_CACHE_BACKEND", "sqlite")
+    EXTRACTION_CACHE_PATH = os.environ.get(
+        "EXTRACTION_CACHE_PATH", "/tmp/extraction_cache.sqlite3"
+    )
+    EXTRACTION_CACHE_BUCKET = os.environ.get("EXTRACTION_CACHE_BUCKET", "")
+    EXTRACTION_CACHE_TTL_SECONDS = float(
+        os.environ.get("EXTRACTION_CACHE_TTL_SECONDS", str(7 * 24 * 3600))
+    )
+    EXTRACTION_CACHE_MAX_ENTRIES = int(
+        os.environ.get("EXTRACTION_CACHE_MAX_ENTRIES", "256")
+    )
+
+    # BeautifulSoup backend ("lxml" or "html.parser"); unset picks the fastest
+    HTML_PARSER = os.environ.get("HTML_PARSER", "")
+
+    # Chunked LLM extraction for large venue pages
+    STAND_CARDS_PER_CHUNK = int(os.environ.get("STAND_CARDS_PER_CHUNK", "15"))
+    LLM_MAX_WORKERS = int(os.environ.get("LLM_MAX_WORKERS", "4"))
+    # Cheaper Bedrock models tried first, comma-separated; responses that
+    # fail schema validation are retried on the next, then the default model
+    LLM_CASCADE_MODEL_IDS = tuple(
+        model_id.strip()
+        for model_id in os.environ.get("LLM_CASCADE_MODEL_IDS", "").split(",")
+        if model_id.strip()
+    )
+    # Stream LLM responses and keep the complete shows of truncated ones
+    LLM_STREAMING = os.environ.get("LLM_STREAMING", "true").lower() == "true"
+    # Mark the fixed extraction instructions for Bedrock prompt caching. Off by
+    # default: Bedrock only caches prefixes of at least 1,024 tokens (Claude
+    # Sonnet 4.5), and the instructions are about 200
+    LLM_PROMPT_CACHING = os.environ.get("LLM_PROMPT_CACHING", "false").lower() == "true"
+    HTML_COMPACT_TEXT_MODE = (
+        os.environ.get("HTML_COMPACT_TEXT_MODE", "false").lower() == "true"
+    )
+
+    # Embedded Metric Format output ("stdout" for CloudWatch, "memory" for tests)
+    METRICS_NAMESPACE = os.environ.get("METRICS_NAMESPACE", "ComedyShowBots")
+    METRICS_SINK = os.environ.get("METRICS_SINK", "stdout")
+
+    @classmethod
+    def shared_state_store(cls) -> bool:
+        """Whether the state store is shared by every function and invocation."""
+        return cls.STATE_STORE_BACKEND == "dynamodb"
+
+    @classmethod
+    def adaptive_polling(cls) -> bool:
+        """Whether the polling schedule runs, which needs delta alerts and shared state."""
+        return cls.ALERT_MODE == "delta" and cls.shared_state_store()
+
     @classmethod
     def get_favorite_comedians(cls) -> List[str]:
         """Get list of favorite comedians."""
@@ -1,11 +1,39 @@
-import boto3
-from typing import Dict, List
-from datetime import datetime
+import hashlib
+import json
+from typing import Dict, List, Optional
+from . import email_templates as templates
+from .lazy import get_boto3_client
+from .rate_limiter import TokenBucket
 
 
 class EmailService:
-    def __init__(self, region_name: str = "us-east-1"):
-        self.ses = boto3.client("ses", region_name=region_name)
+    # SES allows at most 50 destinations per bulk send
+    BULK_BATCH_SIZE = 50
+    DIGEST_TEMPLATE_NAME = "comedy-show-bots-digest"
+    # The digest layout lives in the SES template; each destination only
+    # sends its venue and date sections
+    DIGEST_TEMPLATE = {
+        "SubjectPart": templates.DIGEST_SUBJECT,
+        "HtmlPart": templates.digest_html_header("Comedy Alert!")
+        + "{{{sections}}}"
+        + templates.ALERT_HTML_FOOTER,
+        "TextPart": templates.DIGEST_TEXT_HEADER
+        + templates.ALERT_TEXT_RULE
+        + "{{{text_sections}}}"
+        + templates.ALERT_TEXT_FOOTER,
+    }
+
+    def __init__(self, region_name: str = "us-east-1", ses_client=None):
+        self.region_name = region_name
+        self._ses = ses_client
+        self._digest_template_ready = False
+
+    @property
+    def ses(self):
+        """SES client, created on first use."""
+        if self._ses is None:
+            self._ses = get_boto3_client("ses", region_name=self.region_name)
+        return self._ses
 
     def send_email(
         self,
@@ -30,63 +58,97 @@ class EmailService:
         )
         return response
 
+    def send_bulk_digests(
+        self,
+        messages: List[Dict[str, str]],
+        from_address: str,
+        rate_limiter: Optional[TokenBucket] = None,
+    ) -> List[Dict]:
+        """
+        Send digests in batches through the SES digest template.
+
+        Each message is a dict with "to" and the digest's "html" and "text"
+        sections (see ``format_digest_sections_html``); the template adds the
+        subject, styles, banner and footer. Messages are sent with
+        send_bulk_templated_email, up to BULK_BATCH_SIZE destinations per
+        call and never more than the rate limiter's capacity, pacing
+        recipients through the rate limiter (by default one sized to the
+        account's MaxSendRate).
+
+        Returns:
+            One SES status entry per message, in message order. Every
+            message of a batch whose call failed gets a "Failed" status.
+        """
+        template_name = self._ensure_digest_template()
+        if rate_limiter is None:
+            rate_limiter = TokenBucket(self.get_max_send_rate())
+        batch_size = max(min(self.BULK_BATCH_SIZE, int(rate_limiter.capacity)), 1)
+
+        statuses = []
+        for start in range(0, len(messages), batch_size):
+            batch = messages[start : start + batch_size]
+            rate_limiter.acquire(len(batch))
+            try:
+                response = self.ses.send_bulk_templated_email(
+                    Source=from_address,
+                    Template=template_name,
+                    DefaultTemplateData=json.dumps({"sections": "", "text_sections": ""}),
+                    Destinations=[
+                        {
+                            "Destination": {"ToAddresses": [message["to"]]},
+                            "ReplacementTemplateData": json.dumps(
+                                {"sections": message["html"], "text_sections": message["text"]}
+                            ),
+                        }
+                        for message in batch
+                    ],
+                )
+                batch_statuses = response.get("Status", [])
+            except Exception as e:
+                print(f"Failed to send a batch of {len(batch)} digests: {e}")
+                batch_statuses = []
+            statuses.extend(batch_statuses)
+            statuses.extend(
+                {"Status": "Failed"} for _ in range(len(batch) - len(batch_statuses))
+            )
+        return statuses
+
+    def get_max_send_rate(self) -> float:
+        """Return the account's SES MaxSendRate (emails per second)."""
+        return float(self.ses.get_send_quota()["MaxSendRate"])
+
+    @classmethod
+    def digest_template_name(cls) -> str:
+        """Template name, versioned by the layout so layout changes get a new template."""
+        digest = hashlib.sha256(
+            json.dumps(cls.DIGEST_TEMPLATE, sort_keys=True).encode("utf-8")
+        ).hexdigest()
+        return f"{cls.DIGEST_TEMPLATE_NAME}-{digest[:12]}"
+
+    def _ensure_digest_template(self) -> str:
+        """Create the SES digest template if it is missing; return its name."""
+        template_name = self.digest_template_name()
+        if self._digest_template_ready:
+            return template_name
+        try:
+            self.ses.get_template(TemplateName=template_name)
+        except self.ses.exceptions.TemplateDoesNotExistException:
+            self.ses.create_template(
+                Template=dict(self.DIGEST_TEMPLATE, TemplateName=template_name)
+            )
+        self._digest_template_ready = True
+        return template_name
+
     def format_comedy_alert_html(
         self, results: Dict[str, Dict[str, List[str]]], venue_name: str = "Comedy Venue"
     ) -> str:
         """Format comedy show results into HTML email."""
         if not any(results.values()):
-            return self._get_no_shows_html(venue_name)
-
-        html_parts = [
-            f"""
-            <html>
-            <head>
-                <style>
-                    body {{ font-family: Arial, sans-serif; margin: 20px; }}
-                    .header {{ background-color: #ff6b6b; color: white; padding: 20px; border-radius: 8px; text-align: center; }}
-                    .date-section {{ margin: 20px 0; padding: 15px; border-left: 4px solid #ff6b6b; background-color: #f8f9fa; }}
-                    .date-title {{ font-size: 18px; font-weight: bold; color: #333; margin-bottom: 10px; }}
-                    .show {{ margin: 10px 0; padding: 10px; background-color: white; border-radius: 5px; box-shadow: 0 2px 4px rgba(0,0,0,0.1); }}
-                    .venue {{ font-weight: bold; color: #ff6b6b; }}
-                    .comedians {{ margin-top: 5px; }}
-                    .comedian {{ display: inline-block; background-color: #e9ecef; padding: 3px 8px; margin: 2px; border-radius: 12px; font-size: 12px; }}
-                    .no-shows {{ text-align: center; color: #666; font-style: italic; margin: 20px 0; }}
-                </style>
-            </head>
-            <body>
-                <div class="header">
-                    <h1>🎭 {venue_name} Comedy Alert!</h1>
-                    <p>Your favorite comedians are performing soon!</p>
-                </div>
-            """
-        ]
-
-        for date, shows in results.items():
-            if shows:
-                formatted_date = self._format_date_display(date)
-                html_parts.append('<div class="date-section">')
-                html_parts.append(f'<div class="date-title">📅 {formatted_date}</div>')
-
-                for venue, comedians in shows.items():
-                    html_parts.append('<div class="show">')
-                    html_parts.append(f'<div class="venue">🎪 {venue}</div>')
-                    html_parts.append('<div class="comedians">')
-                    for comedian in comedians:
-                        html_parts.append(
-                            f'<span class="comedian">⭐ {comedian}</span>'
-                        )
-                    html_parts.append("</div></div>")
-
-                html_parts.append("</div>")
-
-        html_parts.append("""
-                <div style="margin-top: 30px; text-align: center; color: #666; font-size: 12px;">
-                    <p>Sent by your Comedy Show Bot 🤖</p>
-                </div>
-            </body>
-            </html>
-        """)
+            return templates.no_shows_html(venue_name)
 
+        html_parts = [templates.alert_html_header(f"{venue_name} Comedy Alert!")]
+        html_parts.extend(templates.date_sections_html(results))
+        html_parts.append(templates.ALERT_HTML_FOOTER)
         return "".join(html_parts)
 
     def format_comedy_alert_text(
@@ -99,54 +161,35 @@ class EmailService:
         text_parts = [
             f"{venue_name} Comedy Alert - Your favorite comedians are performing!\n"
         ]
-        text_parts.append("=" * 60 + "\n")
+        text_parts.append(templates.ALERT_TEXT_RULE)
+        text_parts.extend(templates.date_sections_text(results))
+        text_parts.append(templates.ALERT_TEXT_FOOTER)
+        return "".join(text_parts)
 
-        for date, shows in results.items():
-            if shows:
-                formatted_date = self._format_date_display(date)
-                text_parts.append(f"\n📅 {formatted_date}\n")
-                text_parts.append("-" * 30 + "\n")
+    def format_digest_sections_html(
+        self, digest: Dict[str, Dict[str, Dict[str, List[str]]]]
+    ) -> str:
+        """Format one subscriber's matches into the HTML sections of the digest template."""
+        return "".join(templates.digest_sections_html(digest))
 
-                for venue, comedians in shows.items():
-                    text_parts.append(f"🎪 {venue}\n")
-                    for comedian in comedians:
-                        text_parts.append(f"  ⭐ {comedian}\n")
-                    text_parts.append("\n")
+    def format_digest_sections_text(
+        self, digest: Dict[str, Dict[str, Dict[str, List[str]]]]
+    ) -> str:
+        """Format one subscriber's matches into the text sections of the digest template."""
+        return "".join(templates.digest_sections_text(digest))
 
-        text_parts.append("\nSent by your Comedy Show Bot 🤖")
-        return "".join(text_parts)
+    def format_digest_html(self, digest: Dict[str, Dict[str, Dict[str, List[str]]]]) -> str:
+        """Format one subscriber's matches across all venues into HTML email."""
+        return self.DIGEST_TEMPLATE["HtmlPart"].replace(
+            "{{{sections}}}", self.format_digest_sections_html(digest)
+        )
 
-    def _get_no_shows_html(self, venue_name: str) -> str:
-        """HTML template for when no shows are found."""
-        return f"""
-        <html>
-        <head>
-            <style>
-                body {{ font-family: Arial, sans-serif; margin: 20px; text-align: center; }}
-                .header {{ background-color: #6c757d; color: white; padding: 20px; border-radius: 8px; }}
-                .message {{ margin: 20px 0; color: #666; }}
-            </style>
-        </head>
-        <body>
-            <div class="header">
-                <h1>🎭 {venue_name} Comedy Alert</h1>
-                <p>No shows with your favorite comedians found</p>
-            </div>
-            <div class="message">
-                <p>No shows found with your favorite comedians at {venue_name} in the next 7 days.</p>
-                <p>Keep checking back - new shows are added regularly! 🎪</p>
-            </div>
-            <div style="margin-top: 30px; color: #666; font-size: 12px;">
-                <p>Sent by your Comedy Show Bot 🤖</p>
-            </div>
-        </body>
-        </html>
-        """
+    def format_digest_text(self, digest: Dict[str, Dict[str, Dict[str, List[str]]]]) -> str:
+        """Format one subscriber's matches across all venues into plain text email."""
+        return self.DIGEST_TEMPLATE["TextPart"].replace(
+            "{{{text_sections}}}", self.format_digest_sections_text(digest)
+        )
 
     def _format_date_display(self, date_str: str) -> str:
         """Format date string for display."""
-        try:
-            date_obj = datetime.strptime(date_str, "%Y-%m-%d")
-            return date_obj.strftime("%A, %B %d, %Y")
-        except ValueError:
-            return date_str
+        return templates.format_date_display(date_str)
@@ -0,0 +1,180 @@
+from functools import lru_cache
+from datetime import datetime
+from html import escape
+from typing import Dict, List, Tuple
+
+# Static fragments are built once at import; per-show and per-date fragments
+# are cached, so sections shared by many recipients are rendered once.
+
+ALERT_HTML_HEAD = """
+            <html>
+            <head>
+                <style>
+                    body { font-family: Arial, sans-serif; margin: 20px; }
+                    .header { background-color: #ff6b6b; color: white; padding: 20px; border-radius: 8px; text-align: center; }
+                    .date-section { margin: 20px 0; padding: 15px; border-left: 4px solid #ff6b6b; background-color: #f8f9fa; }
+                    .date-title { font-size: 18px; font-weight: bold; color: #333; margin-bottom: 10px; }
+                    .show { margin: 10px 0; padding: 10px; background-color: white; border-radius: 5px; box-shadow: 0 2px 4px rgba(0,0,0,0.1); }
+                    .venue { font-weight: bold; color: #ff6b6b; }
+                    .comedians { margin-top: 5px; }
+                    .comedian { display: inline-block; background-color: #e9ecef; padding: 3px 8px; margin: 2px; border-radius: 12px; font-size: 12px; }
+                    .no-shows { text-align: center; color: #666; font-style: italic; margin: 20px 0; }
+                </style>
+            </head>
+            <body>"""
+
+# Digests add venue headings to the alert styles
+DIGEST_HTML_HEAD = ALERT_HTML_HEAD.replace(
+    "                </style>",
+    "                    .venue-title { color: #ff6b6b; margin-top: 30px; }\n                </style>",
+)
+
+ALERT_HTML_BANNER = """
+                <div class="header">
+                    <h1>🎭 {title}</h1>
+                    <p>Your favorite comedians are performing soon!</p>
+                </div>
+            """
+
+ALERT_HTML_FOOTER = """
+                <div style="margin-top: 30px; text-align: center; color: #666; font-size: 12px;">
+                    <p>Sent by your Comedy Show Bot 🤖</p>
+                </div>
+            </body>
+            </html>
+        """
+
+ALERT_TEXT_RULE = "=" * 60 + "\n"
+ALERT_TEXT_FOOTER = "\nSent by your Comedy Show Bot 🤖"
+
+DIGEST_SUBJECT = "Comedy Alert - Your Favorite Comedians!"
+DIGEST_TEXT_HEADER = "Comedy Alert - Your favorite comedians are performing!\n"
+
+NO_SHOWS_HTML = """
+        <html>
+        <head>
+            <style>
+                body {{ font-family: Arial, sans-serif; margin: 20px; text-align: center; }}
+                .header {{ background-color: #6c757d; color: white; padding: 20px; border-radius: 8px; }}
+                .message {{ margin: 20px 0; color: #666; }}
+            </style>
+        </head>
+        <body>
+            <div class="header">
+                <h1>🎭 {venue_name} Comedy Alert</h1>
+                <p>No shows with your favorite comedians found</p>
+            </div>
+            <div class="message">
+                <p>No shows found with your favorite comedians at {venue_name} in the next 7 days.</p>
+                <p>Keep checking back - new shows are added regularly! 🎪</p>
+            </div>
+            <div style="margin-top: 30px; color: #666; font-size: 12px;">
+                <p>Sent by your Comedy Show Bot 🤖</p>
+            </div>
+        </body>
+        </html>
+        """
+
+
+@lru_cache(maxsize=1024)
+def format_date_display(date_str: str) -> str:
+    """Format a YYYY-MM-DD date for display, e.g. "Friday, October 17, 2025"."""
+    try:
+        date_obj = datetime.strptime(date_str, "%Y-%m-%d")
+        return date_obj.strftime("%A, %B %d, %Y")
+    except ValueError:
+        return date_str
+
+
+@lru_cache(maxsize=256)
+def alert_html_header(title: str) -> str:
+    """Opening HTML, styles and banner for alert emails."""
+    return ALERT_HTML_HEAD + ALERT_HTML_BANNER.format(title=escape(title))
+
+
+def digest_html_header(title: str) -> str:
+    """Opening HTML, styles and banner for subscriber digests."""
+    return DIGEST_HTML_HEAD + ALERT_HTML_BANNER.format(title=escape(title))
+
+
+@lru_cache(maxsize=256)
+def no_shows_html(venue_name: str) -> str:
+    """HTML for when no shows are found at a venue."""
+    return NO_SHOWS_HTML.format(venue_name=escape(venue_name))
+
+
+@lru_cache(maxsize=256)
+def venue_title_html(venue_name: str) -> str:
+    return f'<h2 class="venue-title">🎪 {escape(venue_name)}</h2>'
+
+
+@lru_cache(maxsize=1024)
+def date_open_html(date: str) -> str:
+    return (
+        '<div class="date-section">'
+        f'<div class="date-title">📅 {escape(format_date_display(date))}</div>'
+    )
+
+
+@lru_cache(maxsize=1024)
+def date_open_text(date: str) -> str:
+    return f"\n📅 {format_date_display(date)}\n" + "-" * 30 + "\n"
+
+
+@lru_cache(maxsize=8192)
+def show_html(label: str, comedians: Tuple[str, ...]) -> str:
+    """One show with its matched comedians."""
+    names = "".join(
+        f'<span class="comedian">⭐ {escape(comedian)}</span>' for comedian in comedians
+    )
+    return (
+        f'<div class="show"><div class="venue">🎪 {escape(label)}</div>'
+        f'<div class="comedians">{names}</div></div>'
+    )
+
+
+@lru_cache(maxsize=8192)
+def show_text(label: str, comedians: Tuple[str, ...]) -> str:
+    names = "".join(f"  ⭐ {comedian}\n" for comedian in comedians)
+    return f"🎪 {label}\n{names}\n"
+
+
+def date_sections_html(results: Dict[str, Dict[str, List[str]]]) -> List[str]:
+    """HTML fragments for each date's shows."""
+    parts = []
+    for date, shows in results.items():
+        if shows:
+            parts.append(date_open_html(date))
+            for label, comedians in shows.items():
+                parts.append(show_html(label, tuple(comedians)))
+            parts.append("</div>")
+    return parts
+
+
+def digest_sections_html(digest: Dict[str, Dict[str, Dict[str, List[str]]]]) -> List[str]:
+    """HTML fragments for each venue's dates in a subscriber digest."""
+    parts = []
+    for venue_name, results in digest.items():
+        parts.append(venue_title_html(venue_name))
+        parts.extend(date_sections_html(results))
+    return parts
+
+
+def digest_sections_text(digest: Dict[str, Dict[str, Dict[str, List[str]]]]) -> List[str]:
+    """Plain text fragments for each venue's dates in a subscriber digest."""
+    parts = []
+    for venue_name, results in digest.items():
+        parts.append(f"\n🎪 {venue_name.upper()}\n")
+        parts.extend(date_sections_text(results))
+    return parts
+
+
+def date_sections_text(results: Dict[str, Dict[str, List[str]]]) -> List[str]:
+    """Plain text fragments for each date's shows."""
+    parts = []
+    for date, shows in results.items():
+        if shows:
+            parts.append(date_open_text(date))
+            for label, comedians in shows.items():
+                parts.append(show_text(label, tuple(comedians)))
+    return parts
@@ -0,0 +1,231 @@
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional
+
+from .config import Config
+from .lazy import get_boto3_client
+
+
+def normalize_html(html: str) -> str:
+    """Collapse whitespace runs so formatting-only changes keep the same key."""
+    return re.sub(r"\s+", " ", html).strip()
+
+
+class CacheBackend(ABC):
+    """Storage for cache entries of the form {"value": ..., "created_at": ...}."""
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the entry stored under key, or None."""
+        pass
+
+    @abstractmethod
+    def put(self, key: str, entry: Dict[str, Any]):
+        """Store an entry under key."""
+        pass
+
+    @abstractmethod
+    def delete(self, key: str):
+        """Remove the entry stored under key, if any."""
+        pass
+
+    @abstractmethod
+    def evict(self, max_entries: int) -> int:
+        """Drop least recently used entries beyond max_entries; return the count."""
+        pass
+
+
+class SQLiteCacheBackend(CacheBackend):
+    """Local SQLite backend with least-recently-used eviction."""
+
+    def __init__(self, path: str):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE entries SET accessed_at = ? WHERE key = ?", (time.time(), key)
+            )
+        return {"value": json.loads(row[0]), "created_at": row[1]}
+
+    def put(self, key: str, entry: Dict[str, Any]):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?)",
+                (key, json.dumps(entry["value"]), entry["created_at"], time.time()),
+            )
+
+    def delete(self, key: str):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+
+    def evict(self, max_entries: int) -> int:
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "DELETE FROM entries WHERE key IN ("
+                "SELECT key FROM entries ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (max_entries,),
+            )
+            return cursor.rowcount
+
+
+class S3CacheBackend(CacheBackend):
+    """
+    S3 backend storing one JSON object per entry.
+
+    S3 does not track reads, so eviction removes the oldest-written entries.
+    Eviction lists the whole prefix, so it should run once per run rather
+    than per write; an S3 lifecycle rule on the prefix can replace it.
+    Tests pass the in-memory client from benchmarks/fake_aws.py as ``s3_client``.
+    """
+
+    def __init__(self, bucket: str, prefix: str = "extraction-cache/", s3_client=None):
+        self.s3 = s3_client or get_boto3_client("s3")
+        self.bucket = bucket
+        self.prefix = prefix
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        from botocore.exceptions import ClientError
+
+        try:
+            response = self.s3.get_object(Bucket=self.bucket, Key=self.prefix + key)
+        except ClientError as e:
+            if e.response["Error"]["Code"] in ("NoSuchKey", "404"):
+                return None
+            raise
+        return json.loads(response["Body"].read())
+
+    def put(self, key: str, entry: Dict[str, Any]):
+        self.s3.put_object(
+            Bucket=self.bucket,
+            Key=self.prefix + key,
+            Body=json.dumps(entry).encode("utf-8"),
+            ContentType="application/json",
+        )
+
+    def delete(self, key: str):
+        self.s3.delete_object(Bucket=self.bucket, Key=self.prefix + key)
+
+    def evict(self, max_entries: int) -> int:
+        objects = []
+        kwargs = {"Bucket": self.bucket, "Prefix": self.prefix}
+        while True:
+            response = self.s3.list_objects_v2(**kwargs)
+            objects.extend(response.get("Contents", []))
+            if not response.get("IsTruncated"):
+                break
+            kwargs["ContinuationToken"] = response["NextContinuationToken"]
+
+        objects.sort(key=lambda obj: obj["LastModified"], reverse=True)
+        for obj in objects[max_entries:]:
+            self.s3.delete_object(Bucket=self.bucket, Key=obj["Key"])
+        return max(len(objects) - max_entries, 0)
+
+
+class ExtractionCache:
+    """
+    Content-addressed cache for LLM extraction results with TTL and LRU limits.
+
+    Writes do not evict; callers apply the size limit with ``evict`` once a
+    batch of extractions is done.
+    """
+
+    def __init__(
+        self,
+        backend: CacheBackend,
+        ttl_seconds: Optional[float] = None,
+        max_entries: Optional[int] = None,
+    ):
+        """
+        Initialize the extraction cache.
+
+        Args:
+            backend: Storage backend for the entries
+            ttl_seconds: Entries older than this are treated as misses
+            max_entries: Evict least recently used entries beyond this count
+        """
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._writes_since_evict = 0
+        self.stats = {"hits": 0, "misses": 0, "writes": 0, "expired": 0, "evictions": 0}
+
+    @staticmethod
+    def make_key(*parts: str) -> str:
+        """Hash the parts that determine an extraction result into a cache key."""
+        digest = hashlib.sha256()
+        for part in parts:
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value for key, or None on a miss."""
+        entry = self.backend.get(key)
+        expired = (
+            entry is not None
+            and self.ttl_seconds is not None
+            and time.time() - entry["created_at"] > self.ttl_seconds
+        )
+        if expired:
+            self.backend.delete(key)
+            entry = None
+
+        with self._lock:
+            if expired:
+                self.stats["expired"] += 1
+            self.stats["hits" if entry is not None else "misses"] += 1
+        return entry["value"] if entry is not None else None
+
+    def put(self, key: str, value: Any):
+        """Store a value under key."""
+        self.backend.put(key, {"value": value, "created_at": time.time()})
+        with self._lock:
+            self.stats["writes"] += 1
+            self._writes_since_evict += 1
+
+    def evict(self) -> int:
+        """Apply the size limit if anything was written since the last eviction."""
+        with self._lock:
+            if not self.max_entries or not self._writes_since_evict:
+                return 0
+            self._writes_since_evict = 0
+        evicted = self.backend.evict(self.max_entries)
+        with self._lock:
+            self.stats["evictions"] += evicted
+        return evicted
+
+    @classmethod
+    def from_config(cls) -> Optional["ExtractionCache"]:
+        """Build the cache configured by Config, or None if caching is disabled."""
+        backend_name = Config.EXTRACTION_CACHE_BACKEND
+        if backend_name == "sqlite":
+            backend = SQLiteCacheBackend(Config.EXTRACTION_CACHE_PATH)
+        elif backend_name == "s3":
+            backend = S3CacheBackend(Config.EXTRACTION_CACHE_BUCKET)
+        else:
+            return None
+
+        return cls(
+            backend,
+            ttl_seconds=Config.EXTRACTION_CACHE_TTL_SECONDS,
+            max_entries=Config.EXTRACTION_CACHE_MAX_ENTRIES,
+        )
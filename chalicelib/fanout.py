@@ -0,0 +1,289 @@
+import json
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+from .bot_service import ComedyBotService
+from .config import Config
+from .lazy import get_boto3_client
+from .metrics import metrics
+from .state_store import StateStore
+from .utils import get_next_days
+
+
+class FanOutCoordinator:
+    """
+    Runs a check with one queue message per venue or date slice.
+
+    ``dispatch`` enqueues the work items plus one aggregate message, and
+    records the run's manifest in the state store. Each work item is handled
+    by ``handle_message`` in its own invocation: it checks its venue and
+    dates and stores the partial results. The aggregate message waits,
+    re-enqueueing itself with a delay, until every partial result is in or
+    its attempts run out, then merges them and calls ``send_comedy_alerts``
+    once.
+
+    Duplicate work deliveries just overwrite their partial result. Before
+    sending, the aggregate step claims the run by popping its manifest, so
+    when SQS delivers the aggregate message more than once only one delivery
+    sends. The state store must be shared by all invocations, i.e. DynamoDB
+    rather than the per-container SQLite file. With the in-memory SQS client
+    from benchmarks/fake_aws.py, ``run_locally`` runs the whole flow in one
+    process.
+    """
+
+    KEY_PREFIX = "fanout:"
+
+    def __init__(
+        self,
+        service: ComedyBotService,
+        store: StateStore,
+        queue_name: str = Config.FANOUT_QUEUE_NAME,
+        dates_per_item: int = Config.FANOUT_DATES_PER_ITEM,
+        aggregate_delay_seconds: int = Config.FANOUT_AGGREGATE_DELAY_SECONDS,
+        aggregate_max_attempts: int = Config.FANOUT_AGGREGATE_MAX_ATTEMPTS,
+        sqs_client=None,
+    ):
+        """
+        Initialize the coordinator.
+
+        Args:
+            service: Service holding the venues, tracker and email settings
+            store: State store shared by every invocation in the run
+            queue_name: SQS queue for work and aggregate messages
+            dates_per_item: Dates per work item for venues fetched date by date
+            aggregate_delay_seconds: Wait between aggregate attempts
+            aggregate_max_attempts: Aggregate attempts before sending whatever
+                partial results have arrived
+            sqs_client: Optional SQS client; by default one is created on first use
+        """
+        self.service = service
+        self.store = store
+        self.queue_name = queue_name
+        self.dates_per_item = dates_per_item
+        self.aggregate_delay_seconds = aggregate_delay_seconds
+        self.aggregate_max_attempts = aggregate_max_attempts
+        self._sqs = sqs_client
+        self._queue_url: Optional[str] = None
+        self._venues = {venue.get_venue_identifier(): venue for venue in service.venues}
+
+    @property
+    def sqs(self):
+        """SQS client, created on first use."""
+        if self._sqs is None:
+            self._sqs = get_boto3_client("sqs")
+        return self._sqs
+
+    @property
+    def queue_url(self) -> str:
+        if self._queue_url is None:
+            self._queue_url = self.sqs.get_queue_url(QueueName=self.queue_name)["QueueUrl"]
+        return self._queue_url
+
+    def dispatch(self, due_only: bool = False) -> str:
+        """
+        Enqueue one work item per venue or date slice and the aggregate message.
+
+        Args:
+            due_only: Only check the dates the poll scheduler says are due,
+                within each venue's fetch budget
+
+        Returns:
+            The run ID
+        """
+        if due_only and self.service.poll_scheduler is None:
+            raise ValueError("due_only requires delta alerts and a state store")
+        run_id = uuid.uuid4().hex
+        dates = get_next_days(Config.LOOKAHEAD_DAYS)
+        items = []
+        for venue_id, venue in self._venues.items():
+            venue_dates = self.service.due_dates(venue, dates) if due_only else dates
+            # Venues that load their whole calendar at once are not split
+            size = self.dates_per_item if venue.splits_by_date else len(venue_dates)
+            for start in range(0, len(venue_dates), max(size, 1)):
+                items.append(
+                    {
+                        "item_id": f"{venue_id}:{start}",
+                        "venue_id": venue_id,
+                        "dates": venue_dates[start : start + size],
+                    }
+                )
+
+        self.store.put(
+            self.KEY_PREFIX + run_id,
+            {
+                "items": [item["item_id"] for item in items],
+                "dates": dates,
+                "created_at": time.time(),
+            },
+        )
+        for item in items:
+            self._send({"type": "work", "run_id": run_id, **item})
+        self._send({"type": "aggregate", "run_id": run_id, "attempt": 1})
+
+        metrics.count("FanOutItems", len(items))
+        print(f"Dispatched run {run_id} with {len(items)} work items")
+        return run_id
+
+    def handle_message(self, message: Dict[str, Any], deadline: Optional[float] = None):
+        """Handle one work or aggregate message."""
+        if message["type"] == "work":
+            self._handle_work(message, deadline)
+        elif message["type"] == "aggregate":
+            self._handle_aggregate(message)
+        else:
+            print(f"Ignoring unknown fan-out message type: {message['type']}")
+
+    def run_locally(self, due_only: bool = False) -> str:
+        """Dispatch a run and handle its messages in this process until the queue is empty."""
+        run_id = self.dispatch(due_only=due_only)
+        while True:
+            response = self.sqs.receive_message(
+                QueueUrl=self.queue_url, MaxNumberOfMessages=10
+            )
+            messages = response.get("Messages", [])
+            if not messages:
+                return run_id
+            for message in messages:
+                self.handle_message(json.loads(message["Body"]))
+                self.sqs.delete_message(
+                    QueueUrl=self.queue_url, ReceiptHandle=message["ReceiptHandle"]
+                )
+
+    def _handle_work(self, message: Dict[str, Any], deadline: Optional[float]):
+        """Check one venue's date slice and store the partial result."""
+        venue = self._venues.get(message["venue_id"])
+        partial: Dict[str, Any] = {"results": {}, "lineup_state": {}, "checks": {}}
+        if venue is None:
+            partial["error"] = f"Unknown venue {message['venue_id']}"
+        else:
+            error = None
+            try:
+                results, checks = self.service.check_venue(venue, message["dates"], deadline)
+                partial["results"] = results
+                partial["checks"] = checks
+                if self.service.lineup_tracker is not None:
+                    # Committed by the aggregator, after the alerts go out
+                    partial["lineup_state"] = self.service.lineup_tracker.unstage(
+                        message["venue_id"], checks
+                    )
+                if self.service.snapshot is not None:
+                    partial["snapshot"] = self.service.snapshot.unstage(message["venue_id"])
+            except Exception as e:
+                print(f"Error checking {venue.name} for {message['item_id']}: {e}")
+                metrics.count("Errors", Stage="FanOutWork", Venue=message["venue_id"])
+                partial["error"] = str(e)
+                error = e
+            partial["degraded"] = self.service.degraded_reason(venue, error)
+
+        self.store.put(self._partial_key(message["run_id"], message["item_id"]), partial)
+
+    def _handle_aggregate(self, message: Dict[str, Any]):
+        """Send alerts once all partial results are in, or retry later."""
+        run_id = message["run_id"]
+        manifest = self.store.get(self.KEY_PREFIX + run_id)
+        if manifest is None:
+            print(f"Run {run_id} was already aggregated")
+            return
+
+        partials = {}
+        for item_id in manifest["items"]:
+            partial = self.store.get(self._partial_key(run_id, item_id))
+            if partial is not None:
+                partials[item_id] = partial
+
+        missing = len(manifest["items"]) - len(partials)
+        if missing and message["attempt"] < self.aggregate_max_attempts:
+            self._send(
+                {"type": "aggregate", "run_id": run_id, "attempt": message["attempt"] + 1},
+                delay_seconds=self.aggregate_delay_seconds,
+            )
+            return
+        # Only the delivery that removes the manifest sends; redeliveries stop here
+        if self.store.pop(self.KEY_PREFIX + run_id) is None:
+            print(f"Run {run_id} was already aggregated")
+            return
+        if missing:
+            print(f"Run {run_id}: sending without {missing} missing work items")
+            metrics.count("FanOutItemsMissing", missing)
+
+        results = self._merge(manifest, partials)
+        self.service.send_comedy_alerts(results)
+
+        for item_id in manifest["items"]:
+            self.store.delete(self._partial_key(run_id, item_id))
+        print(f"Aggregated run {run_id} from {len(partials)} work items")
+
+    def _merge(
+        self, manifest: Dict[str, Any], partials: Dict[str, Dict[str, Any]]
+    ) -> Dict[str, Dict[str, Dict[str, List[str]]]]:
+        """
+        Merge partial results in venue and date order, and stage their state.
+
+        Lineup state, poll history and snapshot entries are staged on this
+        invocation's tracker, scheduler and snapshot, so
+        ``send_comedy_alerts`` commits them. Venues
+        with a degraded or missing work item are recorded in the service's
+        ``degraded_venues``.
+        """
+        by_venue: Dict[str, Dict[str, Dict[str, List[str]]]] = {}
+        degraded: Dict[str, str] = {}
+        for item_id in manifest["items"]:
+            if item_id not in partials:
+                degraded[item_id.rsplit(":", 1)[0]] = "work item missing"
+        for item_id, partial in partials.items():
+            venue_id = item_id.rsplit(":", 1)[0]
+            if partial.get("degraded"):
+                degraded[venue_id] = partial["degraded"]
+            by_venue.setdefault(venue_id, {}).update(partial["results"])
+            if self.service.lineup_tracker is not None and partial["lineup_state"]:
+                self.service.lineup_tracker.stage(venue_id, partial["lineup_state"])
+            if venue_id in self._venues:
+                self.service.record_checks(self._venues[venue_id], partial["checks"])
+            if self.service.snapshot is not None and partial.get("snapshot"):
+                self.service.snapshot.stage(venue_id, partial["snapshot"])
+
+        results = {}
+        for venue_id, venue in self._venues.items():
+            venue_results = by_venue.get(venue_id, {})
+            ordered = {
+                date: venue_results[date]
+                for date in manifest["dates"]
+                if date in venue_results
+            }
+            if ordered:
+                results[venue.name] = ordered
+        self.service.degraded_venues = {
+            venue.name: degraded[venue_id]
+            for venue_id, venue in self._venues.items()
+            if venue_id in degraded
+        }
+        return results
+
+    def _partial_key(self, run_id: str, item_id: str) -> str:
+        return f"{self.KEY_PREFIX}{run_id}:{item_id}"
+
+    def _send(self, message: Dict[str, Any], delay_seconds: int = 0):
+        self.sqs.send_message(
+            QueueUrl=self.queue_url,
+            MessageBody=json.dumps(message),
+            DelaySeconds=delay_seconds,
+        )
+
+    @classmethod
+    def from_config(
+        cls, service: ComedyBotService, store: Optional[StateStore]
+    ) -> Optional["FanOutCoordinator"]:
+        """
+        Build the coordinator if fan-out mode is enabled.
+
+        Raises:
+            ValueError: If fan-out mode is enabled without a shared state
+                store, where the aggregator could not see the manifest and
+                no alerts would be sent
+        """
+        if not Config.FANOUT_MODE:
+            return None
+        if store is None or not Config.shared_state_store():
+            raise ValueError("FANOUT_MODE requires STATE_STORE_BACKEND=dynamodb")
+        return cls(service, store)
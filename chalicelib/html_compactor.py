@@ -0,0 +1,124 @@
+import re
+from typing import TYPE_CHECKING, List
+from .html_parser import parse_html
+
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup
+
+
+class CompactionResult:
+    """Compacted HTML along with how much it saved."""
+
+    # Rough characters-per-token ratio for estimating prompt size
+    CHARS_PER_TOKEN = 4
+
+    def __init__(self, html: str, original_bytes: int):
+        self.html = html
+        self.original_bytes = original_bytes
+        self.compacted_bytes = len(html.encode("utf-8"))
+
+    @property
+    def saved_bytes(self) -> int:
+        return self.original_bytes - self.compacted_bytes
+
+    @property
+    def original_tokens(self) -> int:
+        return self.original_bytes // self.CHARS_PER_TOKEN
+
+    @property
+    def compacted_tokens(self) -> int:
+        return self.compacted_bytes // self.CHARS_PER_TOKEN
+
+    @property
+    def saved_tokens(self) -> int:
+        return self.original_tokens - self.compacted_tokens
+
+    def __repr__(self):
+        return (
+            f"CompactionResult(bytes={self.original_bytes}->{self.compacted_bytes}, "
+            f"est_tokens={self.original_tokens}->{self.compacted_tokens})"
+        )
+
+
+class HtmlCompactor:
+    """
+    Shrinks HTML before it is sent to the LLM.
+
+    Removes images, SVG and other media, strips every attribute except href,
+    drops containers left without text or links and collapses whitespace.
+    Whitespace between tags is only dropped next to block-level tags, where
+    it does not separate words. In text mode the result is plain text with
+    links written as "text <href>".
+    """
+
+    REMOVE_TAGS = ["img", "svg", "picture", "source", "video", "audio", "iframe", "noscript"]
+    BLOCK_TAGS = {
+        "article", "div", "h1", "h2", "h3", "h4", "h5", "h6",
+        "li", "p", "section", "table", "tr", "ul", "ol",
+    }
+    # Whitespace after or before a block-level tag, which renders as nothing
+    BLOCK_GAP = re.compile(
+        r"(</?(?:{0})\b[^>]*>)\s+(?=<)|(?<=>)\s+(?=</?(?:{0})\b)".format(
+            "|".join(sorted(BLOCK_TAGS))
+        )
+    )
+
+    def __init__(self, text_mode: bool = False):
+        self.text_mode = text_mode
+
+    def compact(self, html: str) -> CompactionResult:
+        """Compact an HTML fragment and report the size saved."""
+        from bs4 import Comment
+
+        soup = parse_html(html)
+
+        # Some parsers wrap fragments in a document skeleton
+        for tag in soup(["html", "body"]):
+            tag.unwrap()
+
+        for comment in soup.find_all(string=lambda text: isinstance(text, Comment)):
+            comment.extract()
+        for tag in soup(self.REMOVE_TAGS):
+            tag.decompose()
+
+        for tag in soup.find_all(True):
+            href = tag.attrs.get("href")
+            tag.attrs = {"href": href} if href else {}
+
+        # Children come after their parents in find_all, so walking it in reverse
+        # empties nested containers before their parents are checked
+        for tag in reversed(soup.find_all(True)):
+            has_link = tag.get("href") or tag.find("a", href=True)
+            if not has_link and not tag.get_text(strip=True):
+                tag.decompose()
+
+        if self.text_mode:
+            compacted = self._to_text(soup)
+        else:
+            compacted = self.BLOCK_GAP.sub(r"\1", re.sub(r"\s+", " ", str(soup))).strip()
+
+        return CompactionResult(compacted, len(html.encode("utf-8")))
+
+    def compact_all(self, fragments: List[str]) -> List[CompactionResult]:
+        """Compact several fragments and log the combined savings."""
+        results = [self.compact(fragment) for fragment in fragments]
+        original = sum(result.original_bytes for result in results)
+        compacted = sum(result.compacted_bytes for result in results)
+        tokens_saved = sum(result.saved_tokens for result in results)
+        print(
+            f"Compacted HTML from {original} to {compacted} bytes, "
+            f"saving ~{tokens_saved} tokens"
+        )
+        return results
+
+    def _to_text(self, soup: "BeautifulSoup") -> str:
+        """Render the tree as text lines with links kept inline."""
+        for link in soup.find_all("a", href=True):
+            text = link.get_text(" ", strip=True)
+            link.replace_with(f" {text} <{link['href']}> " if text else f" <{link['href']}> ")
+        for tag in soup.find_all(self.BLOCK_TAGS):
+            tag.insert_before("\n")
+            tag.insert_after("\n")
+
+        lines = (re.sub(r"\s+", " ", line).strip() for line in soup.get_text().split("\n"))
+        return "\n".join(line for line in lines if line)
@@ -0,0 +1,61 @@
+import importlib.util
+from typing import TYPE_CHECKING, List, Optional
+
+from .config import Config
+
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup, SoupStrainer
+
+
+# BeautifulSoup tree builders that support SoupStrainer, fastest first, with
+# the module each one needs (html.parser ships with Python)
+PARSER_PREFERENCE = ["lxml", "html.parser"]
+_PARSER_MODULES = {"lxml": "lxml", "html.parser": "html.parser"}
+
+_default_backend: Optional[str] = None
+
+
+def available_parser_backends() -> List[str]:
+    """Return the installed parser backends, fastest first."""
+    return [
+        name
+        for name in PARSER_PREFERENCE
+        if importlib.util.find_spec(_PARSER_MODULES[name]) is not None
+    ]
+
+
+def get_parser_backend() -> str:
+    """Return the configured parser backend, or the fastest one installed."""
+    global _default_backend
+    if _default_backend is None:
+        _default_backend = Config.HTML_PARSER or available_parser_backends()[0]
+    return _default_backend
+
+
+def make_strainer(*args, **kwargs) -> "SoupStrainer":
+    """Build a SoupStrainer, importing bs4 only when it is first needed."""
+    from bs4 import SoupStrainer
+
+    return SoupStrainer(*args, **kwargs)
+
+
+def parse_html(
+    html: str,
+    parse_only: Optional["SoupStrainer"] = None,
+    parser: Optional[str] = None,
+) -> "BeautifulSoup":
+    """
+    Parse HTML with the selected backend.
+
+    Args:
+        html: Markup to parse
+        parse_only: Optional SoupStrainer restricting the tree to matching
+            elements and their descendants
+        parser: Backend to use instead of get_parser_backend()
+
+    Returns:
+        The parsed BeautifulSoup tree
+    """
+    from bs4 import BeautifulSoup
+
+    return BeautifulSoup(html, parser or get_parser_backend(), parse_only=parse_only)
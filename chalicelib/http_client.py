@@ -0,0 +1,237 @@
+import random
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Dict, Optional
+from urllib.parse import urlparse
+
+from .config import Config
+from .utils import DeadlineExceeded, seconds_until
+
+if TYPE_CHECKING:
+    import requests
+
+
+class LatencyStats:
+    """Thread-safe per-host request latency statistics."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._latencies: Dict[str, list] = {}
+        self._errors: Dict[str, int] = {}
+        self._retries: Dict[str, int] = {}
+
+    def record(self, host: str, elapsed: float, ok: bool = True):
+        """Record one request attempt against a host."""
+        with self._lock:
+            self._latencies.setdefault(host, []).append(elapsed)
+            if not ok:
+                self._errors[host] = self._errors.get(host, 0) + 1
+
+    def record_retry(self, host: str):
+        """Record that a request to a host is being retried."""
+        with self._lock:
+            self._retries[host] = self._retries.get(host, 0) + 1
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """
+        Summarize latencies per host.
+
+        Returns:
+            Dict mapping host to count, errors, retries and mean/p50/p95/max
+            latency in milliseconds
+        """
+        with self._lock:
+            summary = {}
+            for host, latencies in self._latencies.items():
+                ordered = sorted(latencies)
+                summary[host] = {
+                    "count": len(ordered),
+                    "errors": self._errors.get(host, 0),
+                    "retries": self._retries.get(host, 0),
+                    "mean_ms": round(sum(ordered) / len(ordered) * 1000, 1),
+                    "p50_ms": round(_percentile(ordered, 0.50) * 1000, 1),
+                    "p95_ms": round(_percentile(ordered, 0.95) * 1000, 1),
+                    "max_ms": round(ordered[-1] * 1000, 1),
+                }
+            return summary
+
+    def reset(self):
+        """Clear all recorded statistics."""
+        with self._lock:
+            self._latencies.clear()
+            self._errors.clear()
+            self._retries.clear()
+
+
+def _percentile(ordered: list, fraction: float) -> float:
+    """Return the nearest-rank percentile of an already sorted list."""
+    index = min(int(round(fraction * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+
+class HttpClient:
+    """
+    Shared HTTP transport for venue bots.
+
+    Wraps a pooled ``requests.Session`` with keep-alive connections, a cap on
+    connections per host, connect/read timeouts, gzip negotiation and
+    jittered exponential backoff on connection errors, 429 and 5xx responses.
+    Requests given a deadline never time out, back off or retry past it.
+    """
+
+    RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+    def __init__(
+        self,
+        max_connections_per_host: int = Config.HTTP_MAX_CONNECTIONS_PER_HOST,
+        connect_timeout: float = Config.HTTP_CONNECT_TIMEOUT,
+        read_timeout: float = Config.HTTP_READ_TIMEOUT,
+        max_retries: int = Config.HTTP_MAX_RETRIES,
+        backoff_base: float = Config.HTTP_BACKOFF_BASE,
+        backoff_max: float = Config.HTTP_BACKOFF_MAX,
+        session: Optional["requests.Session"] = None,
+    ):
+        """
+        Initialize the HTTP client.
+
+        Args:
+            max_connections_per_host: Pooled connections kept per host; extra
+                concurrent requests wait for a free connection
+            connect_timeout: Seconds to wait for a connection
+            read_timeout: Seconds to wait between bytes of the response
+            max_retries: Retries after the first attempt
+            backoff_base: Base delay in seconds for exponential backoff
+            backoff_max: Upper bound in seconds for a single backoff delay
+            session: Optional session to use instead of a new pooled one
+        """
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.stats = LatencyStats()
+
+        # requests is imported here rather than at module load to keep cold
+        # starts fast
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=Config.HTTP_POOL_HOSTS,
+                pool_maxsize=max_connections_per_host,
+                pool_block=True,
+                max_retries=0,
+            )
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+        session.headers["Accept-Encoding"] = "gzip, deflate"
+        self.session = session
+
+    def get(self, url: str, **kwargs) -> "requests.Response":
+        """Send a GET request with retries."""
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> "requests.Response":
+        """Send a POST request with retries (only use for idempotent endpoints)."""
+        return self.request("POST", url, **kwargs)
+
+    def request(
+        self, method: str, url: str, deadline: Optional[float] = None, **kwargs
+    ) -> "requests.Response":
+        """
+        Send a request, retrying connection errors, 429 and 5xx responses.
+
+        Args:
+            method: HTTP method
+            url: URL to request
+            deadline: Optional ``time.monotonic()`` timestamp. Each attempt's
+                timeouts are cut to the time left, and a retry whose delay
+                would end after the deadline is not made.
+            **kwargs: Passed on to ``requests.Session.request``
+
+        Returns:
+            The final response. Error statuses are not raised here, so callers
+            keep using ``raise_for_status`` as before.
+
+        Raises:
+            DeadlineExceeded: If the deadline passes before a response. It
+                says nothing about the host's health, unlike requests.Timeout.
+        """
+        import requests
+
+        timeout = kwargs.pop("timeout", self.timeout)
+        host = urlparse(url).netloc
+
+        for attempt in range(self.max_retries + 1):
+            remaining = seconds_until(deadline)
+            if remaining == 0:
+                raise DeadlineExceeded(f"Deadline reached before requesting {url}")
+
+            start = time.monotonic()
+            try:
+                response = self.session.request(
+                    method, url, timeout=self._fit_timeout(timeout, remaining), **kwargs
+                )
+            except (requests.ConnectionError, requests.Timeout) as e:
+                self.stats.record(host, time.monotonic() - start, ok=False)
+                if isinstance(e, requests.Timeout) and seconds_until(deadline) == 0:
+                    # The timeout was cut to the deadline, not the host's to blame
+                    raise DeadlineExceeded(f"Deadline reached while requesting {url}") from e
+                delay = self._backoff(attempt)
+                if attempt == self.max_retries or not self._retry_fits(delay, deadline):
+                    raise
+            else:
+                retryable = response.status_code in self.RETRY_STATUSES
+                self.stats.record(host, time.monotonic() - start, ok=not retryable)
+                if not retryable or attempt == self.max_retries:
+                    return response
+                delay = self._retry_after(response)
+                if delay is None:
+                    delay = self._backoff(attempt)
+                if not self._retry_fits(delay, deadline):
+                    return response
+                response.close()
+
+            self.stats.record_retry(host)
+            time.sleep(delay)
+
+    @staticmethod
+    def _fit_timeout(timeout: Any, remaining: Optional[float]) -> Any:
+        """Cut a timeout, or (connect, read) pair, to the seconds left before a deadline."""
+        if remaining is None or timeout is None:
+            return timeout
+        if isinstance(timeout, tuple):
+            return tuple(remaining if t is None else min(t, remaining) for t in timeout)
+        return min(timeout, remaining)
+
+    @staticmethod
+    def _retry_fits(delay: float, deadline: Optional[float]) -> bool:
+        """Whether a retry after delay seconds would still start before the deadline."""
+        return deadline is None or time.monotonic() + delay < deadline
+
+    def _backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff delay for a retry attempt."""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2**attempt))
+
+    def _retry_after(self, response: "requests.Response") -> Optional[float]:
+        """Return a numeric Retry-After delay, capped at backoff_max."""
+        value = response.headers.get("Retry-After")
+        try:
+            return min(float(value), self.backoff_max) if value else None
+        except ValueError:
+            return None
+
+
+_default_client: Optional[HttpClient] = None
+_default_client_lock = threading.Lock()
+
+
+def get_http_client() -> HttpClient:
+    """Return the process-wide HTTP client shared by all venue bots."""
+    global _default_client
+    if _default_client is None:
+        with _default_client_lock:
+            if _default_client is None:
+                _default_client = HttpClient()
+    return _default_client
@@ -0,0 +1,117 @@
+import hashlib
+from datetime import date as date_type, datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List
+
+# Venues are all in New York; event times are local to this zone
+TIMEZONE = "America/New_York"
+
+VTIMEZONE = [
+    "BEGIN:VTIMEZONE",
+    f"TZID:{TIMEZONE}",
+    "BEGIN:DAYLIGHT",
+    "TZOFFSETFROM:-0500",
+    "TZOFFSETTO:-0400",
+    "TZNAME:EDT",
+    "DTSTART:19700308T020000",
+    "RRULE:FREQ=YEARLY;BYMONTH=3;BYDAY=2SU",
+    "END:DAYLIGHT",
+    "BEGIN:STANDARD",
+    "TZOFFSETFROM:-0400",
+    "TZOFFSETTO:-0500",
+    "TZNAME:EST",
+    "DTSTART:19701101T020000",
+    "RRULE:FREQ=YEARLY;BYMONTH=11;BYDAY=1SU",
+    "END:STANDARD",
+    "END:VTIMEZONE",
+]
+
+# Listings give a start time only
+SHOW_DURATION = timedelta(minutes=90)
+
+
+def escape_text(value: str) -> str:
+    """Escape a TEXT property value (RFC 5545 section 3.3.11)."""
+    return (
+        value.replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\r\n", "\\n")
+        .replace("\n", "\\n")
+    )
+
+
+def fold_line(line: str) -> str:
+    """Fold a content line into 75-octet pieces joined by CRLF and a space."""
+    encoded = line.encode("utf-8")
+    if len(encoded) <= 75:
+        return line
+
+    pieces = []
+    start = 0
+    limit = 75
+    while start < len(encoded):
+        end = min(start + limit, len(encoded))
+        # Never split a multi-byte character
+        while end < len(encoded) and (encoded[end] & 0xC0) == 0x80:
+            end -= 1
+        pieces.append(encoded[start:end].decode("utf-8"))
+        start = end
+        limit = 74  # continuation lines start with a space
+    return "\r\n ".join(pieces)
+
+
+def event_uid(show: Dict[str, Any]) -> str:
+    """A UID that stays the same for a show across snapshots."""
+    key = "|".join((show["venue"], show["date"], show["label"]))
+    return hashlib.sha1(key.encode("utf-8")).hexdigest() + "@comedy-show-bots"
+
+
+def render_calendar(
+    shows: Iterable[Dict[str, Any]], name: str, generated_at: float
+) -> str:
+    """
+    Render snapshot show entries as an iCalendar feed.
+
+    Shows with a start time become 90-minute events in New York time;
+    shows without one become all-day events.
+    """
+    stamp = datetime.fromtimestamp(generated_at, timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    lines: List[str] = [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        "PRODID:-//comedy-show-bots//lineup feed//EN",
+        "CALSCALE:GREGORIAN",
+        "METHOD:PUBLISH",
+        f"X-WR-CALNAME:{escape_text(name)}",
+        f"X-WR-TIMEZONE:{TIMEZONE}",
+        "REFRESH-INTERVAL;VALUE=DURATION:PT1H",
+        *VTIMEZONE,
+    ]
+
+    for show in shows:
+        day = date_type.fromisoformat(show["date"])
+        lines += ["BEGIN:VEVENT", f"UID:{event_uid(show)}", f"DTSTAMP:{stamp}"]
+        if show["time"]:
+            hour, minute = map(int, show["time"].split(":"))
+            start = datetime(day.year, day.month, day.day, hour, minute)
+            end = start + SHOW_DURATION
+            lines.append(f"DTSTART;TZID={TIMEZONE}:{start:%Y%m%dT%H%M%S}")
+            lines.append(f"DTEND;TZID={TIMEZONE}:{end:%Y%m%dT%H%M%S}")
+        else:
+            lines.append(f"DTSTART;VALUE=DATE:{day:%Y%m%d}")
+            lines.append(f"DTEND;VALUE=DATE:{day + timedelta(days=1):%Y%m%d}")
+
+        location = show["venue"]
+        if show["room"] and show["room"] not in location:
+            location = f"{location} ({show['room']})"
+        summary = f"{', '.join(show['favorites'])} at {show['venue']}"
+        lines.append(f"SUMMARY:{escape_text(summary)}")
+        lines.append(f"LOCATION:{escape_text(location)}")
+        description = f"{show['label']}\n{', '.join(show['comedians'])}"
+        lines.append(f"DESCRIPTION:{escape_text(description)}")
+        if show["url"]:
+            lines.append(f"URL:{show['url']}")
+        lines.append("END:VEVENT")
+
+    lines.append("END:VCALENDAR")
+    return "".join(fold_line(line) + "\r\n" for line in lines)
@@ -0,0 +1,76 @@
+import json
+from typing import Any, Dict, List
+
+
+class JsonArrayStreamParser:
+    """
+    Incrementally parses the objects of a JSON array from streamed text.
+
+    Text before the first "[" (a code fence, a ``{"shows":`` wrapper or
+    prose) is skipped. Each object directly inside the array is returned by
+    ``feed`` as soon as its closing brace arrives, so a truncated stream
+    still yields every object that was completed.
+    """
+
+    def __init__(self):
+        self._started = False
+        self.done = False
+        self._depth = 0  # nesting depth inside the array
+        self._in_string = False
+        self._escaped = False
+        self._current: List[str] = []
+        self.skipped = 0  # objects that were complete but not valid JSON
+
+    def feed(self, text: str) -> List[Dict[str, Any]]:
+        """Consume the next piece of text and return the objects it completed."""
+        completed = []
+        start = None  # where the current object's text begins in this piece
+        for i, ch in enumerate(text):
+            if self.done:
+                break
+            if not self._started:
+                if ch == "[":
+                    self._started = True
+                continue
+
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif ch == "\\":
+                    self._escaped = True
+                elif ch == '"':
+                    self._in_string = False
+                continue
+
+            if ch == '"':
+                self._in_string = True
+            elif ch in "{[":
+                if self._depth == 0:
+                    start = i
+                self._depth += 1
+            elif ch in "}]":
+                if self._depth == 0:
+                    if ch == "]":
+                        self.done = True
+                    continue
+                self._depth -= 1
+                if self._depth == 0:
+                    self._current.append(text[start if start is not None else 0 : i + 1])
+                    start = None
+                    self._emit("".join(self._current), completed)
+                    self._current = []
+
+        if self._depth > 0:
+            self._current.append(text[start if start is not None else 0 :])
+        return completed
+
+    def _emit(self, raw: str, completed: List[Dict[str, Any]]):
+        try:
+            value = json.loads(raw)
+        except ValueError:
+            self.skipped += 1
+            return
+        if isinstance(value, dict):
+            completed.append(value)
+        else:
+            self.skipped += 1
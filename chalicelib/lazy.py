@@ -0,0 +1,30 @@
+import threading
+from typing import Any, Dict, Tuple
+
+from .startup import startup_timer
+
+
+_clients: Dict[Tuple, Any] = {}
+_clients_lock = threading.Lock()
+
+
+def get_boto3_client(service_name: str, **kwargs) -> Any:
+    """
+    Return a boto3 client, creating it on first use.
+
+    boto3 is imported and the client built only when first requested; the
+    same client is then reused for the rest of the container's lifetime,
+    including across warm invocations.
+    """
+    key = (service_name, tuple(sorted(kwargs.items())))
+    client = _clients.get(key)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(key)
+            if client is None:
+                with startup_timer.phase(f"client:{service_name}"):
+                    import boto3
+
+                    client = boto3.client(service_name, **kwargs)
+                _clients[key] = client
+    return client
@@ -1,20 +1,103 @@
 import json
-import boto3
-from typing import List, Dict, Any
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, List, Dict, Any, Optional, Sequence
+from .config import Config
+from .extraction_cache import ExtractionCache, normalize_html
+from .json_stream import JsonArrayStreamParser
+from .lazy import get_boto3_client
+from .metrics import metrics
+from .show_schema import clean_show, validate_show
+
+# Sent as the system prompt of every extraction request. Keep it free of
+# per-request values: Bedrock caches it as a prompt prefix only while it is
+# byte-for-byte identical between requests.
+EXTRACTION_INSTRUCTIONS = """Extract comedy show information from the venue HTML in the user message.
+
+Return a JSON array with this exact structure:
+[{
+  "date": "YYYY-MM-DD",
+  "time": "HH:MM AM/PM",
+  "venue_location": "specific room/stage if mentioned (e.g., 'Upstairs', 'Main room')",
+  "comedians": ["Full Name 1", "Full Name 2", ...],
+  "show_url": "/path/to/show/page"
+}]
+
+Important rules:
+1. Extract FULL comedian names (first and last names)
+2. Parse dates and convert to YYYY-MM-DD format
+3. Extract all individual comedian names - split on commas, "&", "and", etc.
+4. If you see "& More!" or similar, OMIT it - only list named comedians
+5. Include venue location if multiple rooms/stages are mentioned
+6. Return ONLY valid JSON, no markdown or explanation"""
 
 
 class LLMExtractor:
-    """Extracts structured comedy show data from HTML using AWS Bedrock."""
+    """
+    Extracts structured comedy show data from HTML using AWS Bedrock.
 
-    def __init__(self, model_id: str = "global.anthropic.claude-sonnet-4-5-20250929-v1:0"):
+    With ``cascade_model_ids``, each page or chunk is first sent to the
+    first (cheapest) model. Its response is only accepted if it is complete
+    and every show passes the show schema; otherwise the request is retried
+    on the next model. The last model's response is always used, with
+    placeholder names removed and still-invalid shows dropped. Which tier
+    served each request, and each tier's latency and token counts, are kept
+    in ``tier_stats`` until ``reset_tier_stats``.
+
+    The fixed instructions are sent as the system block. With
+    ``prompt_caching`` it is marked for prompt caching, so only the venue
+    HTML is new input on each request once the instructions are long enough
+    for Bedrock to cache.
+    """
+
+    # Anthropic usage fields and the metrics they are emitted as
+    USAGE_FIELDS = {
+        "input_tokens": "BedrockInputTokens",
+        "cache_read_input_tokens": "BedrockCacheReadTokens",
+        "cache_creation_input_tokens": "BedrockCacheWriteTokens",
+        "output_tokens": "BedrockOutputTokens",
+    }
+
+    def __init__(
+        self,
+        model_id: str = "global.anthropic.claude-sonnet-4-5-20250929-v1:0",
+        cache: Optional[ExtractionCache] = None,
+        bedrock_client=None,
+        streaming: bool = Config.LLM_STREAMING,
+        cascade_model_ids: Sequence[str] = Config.LLM_CASCADE_MODEL_IDS,
+        prompt_caching: bool = Config.LLM_PROMPT_CACHING,
+    ):
         """
         Initialize the LLM extractor.
 
         Args:
             model_id: The Bedrock model ID to use for extraction
+            cache: Optional cache of extraction results keyed by prompt content
+            bedrock_client: Optional bedrock-runtime client; by default one is
+                created on first use
+            streaming: Use invoke_model_with_response_stream and parse shows
+                as they are generated
+            cascade_model_ids: Cheaper models to try first, in order, before
+                model_id
+            prompt_caching: Mark the instructions for Bedrock prompt caching
         """
-        self.bedrock = boto3.client("bedrock-runtime")
+        self._bedrock = bedrock_client
         self.model_id = model_id
+        self.cache = cache
+        self.streaming = streaming
+        self.model_ids = [*cascade_model_ids, model_id]
+        self.prompt_caching = prompt_caching
+        self.tier_stats: Dict[str, Dict[str, float]] = {}
+        self._stats_lock = threading.Lock()
+        self.reset_tier_stats()
+
+    @property
+    def bedrock(self):
+        """bedrock-runtime client, created on first use."""
+        if self._bedrock is None:
+            self._bedrock = get_boto3_client("bedrock-runtime")
+        return self._bedrock
 
     def extract_shows(self, html: str, venue_name: str) -> List[Dict[str, Any]]:
         """
@@ -34,61 +117,298 @@ class LLMExtractor:
                 "show_url": "/path/to/show"
             }]
         """
+        return list(self.iter_shows(html, venue_name))
+
+    def iter_shows(self, html: str, venue_name: str) -> Iterator[Dict[str, Any]]:
+        """
+        Yield the shows extract_shows returns, each as soon as it is available.
+
+        When streaming, each show is yielded as soon as its JSON object is
+        complete, so callers can process shows while the rest are still
+        being generated. If the response stops at max_tokens, the complete
+        shows are kept (but not cached) and the cut-off one is dropped.
+        Cheaper cascade tiers are read in full and validated before any of
+        their shows are yielded; only the last tier streams.
+        """
+        html = normalize_html(html)
         prompt = self._build_extraction_prompt(html, venue_name)
 
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self.cache.make_key(*self.model_ids, EXTRACTION_INSTRUCTIONS, prompt)
+            try:
+                cached = self.cache.get(cache_key)
+            except Exception as e:
+                print(f"Error reading extraction cache: {e}")
+                cached = None
+            print(f"Extraction cache stats: {self.cache.stats}")
+            if cached is not None:
+                metrics.count("ExtractionCacheHits")
+                yield from cached
+                return
+            metrics.count("ExtractionCacheMisses")
+
+        shows = []
+        outcome: Dict[str, Any] = {}
         try:
-            response = self.bedrock.invoke_model(
-                modelId=self.model_id,
-                body=json.dumps(
-                    {
-                        "anthropic_version": "bedrock-2023-05-31",
-                        "max_tokens": 4096,
-                        "messages": [{"role": "user", "content": prompt}],
-                        "temperature": 0,
-                    }
-                ),
+            for model_id in self.model_ids[:-1]:
+                accepted = self._try_tier(model_id, prompt, expect_shows=bool(html.strip()))
+                if accepted is not None:
+                    shows = accepted
+                    yield from shows
+                    break
+            else:
+                for show in self._final_tier(self.model_ids[-1], prompt, outcome):
+                    shows.append(show)
+                    yield show
+        except Exception as e:
+            print(f"Error extracting shows with LLM: {e}")
+            return
+
+        if outcome.get("stop_reason") == "max_tokens":
+            print(f"LLM response hit max_tokens, kept {len(shows)} complete shows")
+            metrics.count("TruncatedResponses")
+            return
+
+        if cache_key is not None:
+            try:
+                self.cache.put(cache_key, shows)
+            except Exception as e:
+                print(f"Error writing extraction cache: {e}")
+
+    def extract_shows_chunked(
+        self, chunks: List[str], venue_name: str, max_workers: int = 4
+    ) -> List[Dict[str, Any]]:
+        """
+        Extract shows from several HTML chunks concurrently and merge them.
+
+        Each chunk is a separate, smaller prompt, so one truncated or failed
+        response only loses that chunk's shows.
+
+        Args:
+            chunks: HTML fragments, each holding a batch of show cards
+            venue_name: Name of the venue for context
+            max_workers: Maximum number of concurrent Bedrock calls
+
+        Returns:
+            Shows from all chunks in chunk order, deduplicated by
+            date, time and show URL. A show found in more than one chunk,
+            such as a card split across a chunk boundary, keeps its first
+            occurrence with the comedians of every occurrence.
+        """
+        with ThreadPoolExecutor(max_workers=max(max_workers, 1)) as executor:
+            results = list(
+                executor.map(lambda chunk: self.extract_shows(chunk, venue_name), chunks)
             )
 
-            response_body = json.loads(response["body"].read())
-            content = response_body["content"][0]["text"]
+        merged = []
+        seen = {}
+        for shows in results:
+            for show in shows:
+                key = (show.get("date"), show.get("time"), show.get("show_url"))
+                if key not in seen:
+                    seen[key] = dict(show, comedians=list(show.get("comedians") or []))
+                    merged.append(seen[key])
+                    continue
+                comedians = seen[key]["comedians"]
+                comedians.extend(
+                    name for name in show.get("comedians") or [] if name not in comedians
+                )
 
-            # Extract JSON from potential markdown code blocks
-            if "```json" in content:
-                content = content.split("```json")[1].split("```")[0].strip()
-            elif "```" in content:
-                content = content.split("```")[1].split("```")[0].strip()
+        print(f"Merged {len(merged)} shows from {len(chunks)} chunks")
+        return merged
 
-            shows_data = json.loads(content)
+    def reset_tier_stats(self):
+        """Start a new run's per-tier statistics."""
+        with self._stats_lock:
+            self.tier_stats = {
+                model_id: {
+                    "requests": 0,
+                    "served": 0,
+                    "escalated": 0,
+                    "failed": 0,
+                    "latency_ms": 0.0,
+                    "input_tokens": 0,
+                    "cache_read_input_tokens": 0,
+                    "cache_creation_input_tokens": 0,
+                    "output_tokens": 0,
+                }
+                for model_id in self.model_ids
+            }
 
-            # Handle both {shows: [...]} and [...] formats
-            if isinstance(shows_data, dict) and "shows" in shows_data:
-                return shows_data["shows"]
-            return shows_data
+    def _try_tier(
+        self, model_id: str, prompt: str, expect_shows: bool = True
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        Run the prompt on a cheaper tier and return its shows if acceptable.
 
+        Args:
+            model_id: The tier's model
+            prompt: The extraction prompt
+            expect_shows: Whether the page has content, so that no shows at
+                all more likely means the model missed them than that there
+                are none. Only the last tier may decide a page is empty.
+
+        Returns:
+            The shows, or None if the response failed, was truncated, had no
+            shows when some were expected or had a show that does not match
+            the schema
+        """
+        outcome: Dict[str, Any] = {}
+        problems: List[str] = []
+        shows: List[Dict[str, Any]] = []
+        started = time.perf_counter()
+        try:
+            shows = list(self._invoke(model_id, prompt, outcome))
         except Exception as e:
-            print(f"Error extracting shows with LLM: {e}")
-            return []
+            problems.append(f"request failed: {e}")
+        if outcome.get("stop_reason") == "max_tokens":
+            problems.append("response hit max_tokens")
+        if not shows and expect_shows and not problems:
+            problems.append("no shows")
+        for show in shows:
+            problems.extend(validate_show(show))
 
-    def _build_extraction_prompt(self, html: str, venue_name: str) -> str:
-        """Build the prompt for the LLM to extract show information."""
-        return f"""Extract comedy show information from this {venue_name} HTML.
+        result = "escalated" if problems else "served"
+        self._record_tier(model_id, outcome, time.perf_counter() - started, result)
+        if problems:
+            print(f"Escalating from {model_id}: {'; '.join(problems[:3])}")
+            return None
+        return shows
 
-Return a JSON array with this exact structure:
-[{{
-  "date": "YYYY-MM-DD",
-  "time": "HH:MM AM/PM",
-  "venue_location": "specific room/stage if mentioned (e.g., 'Upstairs', 'Main room')",
-  "comedians": ["Full Name 1", "Full Name 2", ...],
-  "show_url": "/path/to/show/page"
-}}]
+    def _final_tier(
+        self, model_id: str, prompt: str, outcome: Dict[str, Any]
+    ) -> Iterator[Dict[str, Any]]:
+        """Yield the last tier's shows as they arrive, repairing or dropping invalid ones."""
+        dropped = 0
+        started = time.perf_counter()
+        try:
+            for show in self._invoke(model_id, prompt, outcome):
+                if validate_show(show) and isinstance(show, dict):
+                    show = clean_show(show)
+                if validate_show(show):
+                    dropped += 1
+                    continue
+                yield show
+        except Exception:
+            self._record_tier(model_id, outcome, time.perf_counter() - started, "failed")
+            raise
+        self._record_tier(model_id, outcome, time.perf_counter() - started, "served")
+        if dropped:
+            print(f"Dropped {dropped} shows that do not match the show schema")
+            metrics.count("InvalidShows", dropped, Tier=model_id)
 
-Important rules:
-1. Extract FULL comedian names (first and last names)
-2. Parse dates and convert to YYYY-MM-DD format
-3. Extract all individual comedian names - split on commas, "&", "and", etc.
-4. If you see "& More!" or similar, OMIT it - only list named comedians
-5. Include venue location if multiple rooms/stages are mentioned
-6. Return ONLY valid JSON, no markdown or explanation
+    def _invoke(
+        self, model_id: str, prompt: str, outcome: Dict[str, Any]
+    ) -> Iterator[Dict[str, Any]]:
+        with metrics.span("LLMCall"):
+            if self.streaming:
+                yield from self._invoke_streaming(model_id, prompt, outcome)
+            else:
+                yield from self._invoke_and_parse(model_id, prompt, outcome)
+
+    def _record_tier(
+        self, model_id: str, outcome: Dict[str, Any], seconds: float, result: str
+    ):
+        """Count one request to a tier; result is "served", "escalated" or "failed"."""
+        with self._stats_lock:
+            stats = self.tier_stats[model_id]
+            stats["requests"] += 1
+            stats[result] += 1
+            stats["latency_ms"] = round(stats["latency_ms"] + seconds * 1000, 1)
+            for field in self.USAGE_FIELDS:
+                stats[field] += outcome.get(field, 0)
+        for field, metric in self.USAGE_FIELDS.items():
+            metrics.count(metric, outcome.get(field, 0))
+        metrics.count("LLMRequests", Tier=model_id, Outcome=result)
+        metrics.record("LLMTierTime", seconds * 1000, "Milliseconds", Tier=model_id)
+
+    def _request_body(self, prompt: str) -> str:
+        return json.dumps(
+            {
+                "anthropic_version": "bedrock-2023-05-31",
+                "max_tokens": 4096,
+                "system": self._system_blocks(),
+                "messages": [{"role": "user", "content": prompt}],
+                "temperature": 0,
+            }
+        )
+
+    def _system_blocks(self) -> List[Dict[str, Any]]:
+        """The instructions as a system block, with a cache breakpoint after it."""
+        block: Dict[str, Any] = {"type": "text", "text": EXTRACTION_INSTRUCTIONS}
+        if self.prompt_caching:
+            block["cache_control"] = {"type": "ephemeral"}
+        return [block]
+
+    def _record_usage(self, usage: Dict[str, Any], outcome: Dict[str, Any]):
+        """Store the token counts present in a usage object, which are running totals."""
+        for field in self.USAGE_FIELDS:
+            if field in usage:
+                outcome[field] = usage[field] or 0
+
+    def _invoke_streaming(
+        self, model_id: str, prompt: str, outcome: Dict[str, Any]
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Stream the response and yield each show once its JSON object is complete.
+
+        The stop reason and token counts are stored in outcome.
+        """
+        response = self.bedrock.invoke_model_with_response_stream(
+            modelId=model_id, body=self._request_body(prompt)
+        )
+        parser = JsonArrayStreamParser()
+        for event in response["body"]:
+            chunk = event.get("chunk")
+            if chunk is None:
+                continue
+            payload = json.loads(chunk["bytes"])
+            kind = payload.get("type")
+            if kind == "content_block_delta":
+                yield from parser.feed(payload["delta"].get("text", ""))
+            elif kind == "message_start":
+                self._record_usage(payload["message"].get("usage", {}), outcome)
+            elif kind == "message_delta":
+                outcome["stop_reason"] = payload["delta"].get("stop_reason")
+                self._record_usage(payload.get("usage", {}), outcome)
+
+        if parser.skipped:
+            print(f"Skipped {parser.skipped} malformed shows in LLM response")
+
+    def _invoke_and_parse(
+        self, model_id: str, prompt: str, outcome: Dict[str, Any]
+    ) -> List[Dict[str, Any]]:
+        """
+        Send the prompt to Bedrock and parse the JSON list of shows.
+
+        The stop reason and token counts are stored in outcome.
+        """
+        response = self.bedrock.invoke_model(
+            modelId=model_id, body=self._request_body(prompt)
+        )
+
+        response_body = json.loads(response["body"].read())
+        outcome["stop_reason"] = response_body.get("stop_reason")
+        self._record_usage(response_body.get("usage", {}), outcome)
+        content = response_body["content"][0]["text"]
+
+        # Extract JSON from potential markdown code blocks
+        if "```json" in content:
+            content = content.split("```json")[1].split("```")[0].strip()
+        elif "```" in content:
+            content = content.split("```")[1].split("```")[0].strip()
+
+        shows_data = json.loads(content)
+
+        # Handle both {shows: [...]} and [...] formats
+        if isinstance(shows_data, dict) and "shows" in shows_data:
+            return shows_data["shows"]
+        return shows_data
+
+    def _build_extraction_prompt(self, html: str, venue_name: str) -> str:
+        """Build the per-request part of the prompt, which follows the cached instructions."""
+        return f"""Venue: {venue_name}
 
 HTML:
-{html}"""
\ No newline at end of file
+{html}"""
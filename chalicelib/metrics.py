@@ -0,0 +1,172 @@
+import json
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional, Tuple
+
+from .config import Config
+
+
+class MetricsSink(ABC):
+    """Destination for flushed metric documents."""
+
+    @abstractmethod
+    def emit(self, document: Dict[str, Any]):
+        """Write one CloudWatch Embedded Metric Format document."""
+        pass
+
+
+class StdoutSink(MetricsSink):
+    """
+    Print each document as one JSON log line.
+
+    Lambda ships stdout to CloudWatch Logs, which extracts EMF documents into
+    metrics without any PutMetricData calls.
+    """
+
+    def emit(self, document: Dict[str, Any]):
+        print(json.dumps(document, separators=(",", ":")))
+
+
+class MemorySink(MetricsSink):
+    """Keep documents in memory so tests and benchmarks can inspect them."""
+
+    def __init__(self):
+        self.documents: List[Dict[str, Any]] = []
+
+    def emit(self, document: Dict[str, Any]):
+        self.documents.append(document)
+
+    def values(self, name: str, **dimensions: str) -> List[float]:
+        """All values emitted for a metric, optionally filtered by dimension values."""
+        found = []
+        for document in self.documents:
+            if name in document and all(
+                document.get(key) == value for key, value in dimensions.items()
+            ):
+                found.extend(document[name])
+        return found
+
+    def total(self, name: str, **dimensions: str) -> float:
+        """Sum of all values emitted for a metric."""
+        return sum(self.values(name, **dimensions))
+
+
+class Metrics:
+    """
+    Collects timings and counters during a run and flushes them as EMF.
+
+    Values are buffered per metric and dimension set, then written by
+    ``flush`` as one document per dimension set with the values batched into
+    arrays, so a run produces a handful of log lines rather than one per value.
+    """
+
+    # EMF limits per document
+    MAX_METRICS = 100
+    MAX_VALUES = 100
+
+    def __init__(
+        self,
+        namespace: str,
+        sink: Optional[MetricsSink] = None,
+        default_dimensions: Optional[Dict[str, str]] = None,
+    ):
+        """
+        Initialize the metrics collector.
+
+        Args:
+            namespace: CloudWatch namespace for all metrics
+            sink: Where flushed documents go; defaults to stdout
+            default_dimensions: Dimensions added to every metric
+        """
+        self.namespace = namespace
+        self.sink = sink or StdoutSink()
+        self.default_dimensions = default_dimensions or {}
+        self._lock = threading.Lock()
+        # dimension items -> metric name -> (unit, values)
+        self._buffer: Dict[Tuple, Dict[str, Tuple[str, List[float]]]] = {}
+
+    def record(self, name: str, value: float, unit: str = "None", **dimensions: str):
+        """Buffer one value of a metric."""
+        key = tuple(sorted({**self.default_dimensions, **dimensions}.items()))
+        with self._lock:
+            metrics = self._buffer.setdefault(key, {})
+            metrics.setdefault(name, (unit, []))[1].append(value)
+
+    def count(self, name: str, value: float = 1, **dimensions: str):
+        """Buffer a counter increment."""
+        self.record(name, value, "Count", **dimensions)
+
+    @contextmanager
+    def span(self, name: str, **dimensions: str):
+        """
+        Time the enclosed block as ``<name>Time`` in milliseconds.
+
+        An exception escaping the block is also counted as ``Errors`` with a
+        ``Stage`` dimension of name, then re-raised.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.count("Errors", Stage=name, **dimensions)
+            raise
+        finally:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            self.record(f"{name}Time", round(elapsed_ms, 3), "Milliseconds", **dimensions)
+
+    def flush(self):
+        """Emit everything buffered since the last flush and clear the buffer."""
+        with self._lock:
+            buffer, self._buffer = self._buffer, {}
+
+        timestamp = int(time.time() * 1000)
+        for key, metrics in buffer.items():
+            for document in self._documents(dict(key), metrics, timestamp):
+                self.sink.emit(document)
+
+    def _documents(
+        self,
+        dimensions: Dict[str, str],
+        metrics: Dict[str, Tuple[str, List[float]]],
+        timestamp: int,
+    ):
+        """Split one dimension set's metrics into EMF documents within the limits."""
+        names = list(metrics)
+        for start in range(0, len(names), self.MAX_METRICS):
+            batch = names[start : start + self.MAX_METRICS]
+            longest = max(len(metrics[name][1]) for name in batch)
+            for offset in range(0, longest, self.MAX_VALUES):
+                document: Dict[str, Any] = dict(dimensions)
+                definitions = []
+                for name in batch:
+                    unit, values = metrics[name]
+                    chunk = values[offset : offset + self.MAX_VALUES]
+                    if chunk:
+                        definitions.append({"Name": name, "Unit": unit})
+                        document[name] = chunk
+                document["_aws"] = {
+                    "Timestamp": timestamp,
+                    "CloudWatchMetrics": [
+                        {
+                            "Namespace": self.namespace,
+                            "Dimensions": [sorted(dimensions)],
+                            "Metrics": definitions,
+                        }
+                    ],
+                }
+                yield document
+
+    @classmethod
+    def from_config(cls) -> "Metrics":
+        """Build the collector configured by Config."""
+        sink = MemorySink() if Config.METRICS_SINK == "memory" else StdoutSink()
+        return cls(
+            Config.METRICS_NAMESPACE,
+            sink=sink,
+            default_dimensions={"Service": "comedy-show-bots"},
+        )
+
+
+metrics = Metrics.from_config()
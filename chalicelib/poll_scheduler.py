@@ -0,0 +1,207 @@
+import math
+import threading
+import time
+from datetime import date as date_type
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from .config import Config
+from .state_store import StateStore
+
+
+class PollScheduler:
+    """
+    Decides which (venue, date) pairs are due for a check on each tick.
+
+    Each pair's base interval grows with how far out its date is, then is
+    scaled by how often that pair's lineup has changed when checked: from
+    half the base interval for a pair that changes on every check to one and
+    a half times it for one that never changes. Tonight is rechecked about
+    hourly while dates weeks out are checked about once a day or less.
+
+    Every check's fetches are logged per venue, and ``due_dates`` can cap a
+    venue's fetches over a rolling ``BUDGET_WINDOW``. The budget is spread
+    evenly over the ticks in the window, and when more dates are due than a
+    tick may fetch, the most overdue go first. The checks near dates gain are
+    paid for by checking far dates less often rather than by more requests.
+
+    Check results are staged and only written by ``commit``, together with
+    the lineup state.
+    """
+
+    KEY_PREFIX = "poll:"
+
+    # (max days out, base interval in seconds), checked in order
+    DEFAULT_TIERS: Sequence[Tuple[int, float]] = (
+        (0, 3600),
+        (1, 2 * 3600),
+        (3, 6 * 3600),
+        (7, 12 * 3600),
+    )
+    DEFAULT_FAR_INTERVAL = 24 * 3600
+
+    # Weight of the latest check in the change rate moving average
+    CHANGE_RATE_ALPHA = 0.3
+    # Change rate assumed for pairs that have not been checked yet
+    INITIAL_CHANGE_RATE = 0.5
+    # Fetch budgets cover this many seconds, ending now
+    BUDGET_WINDOW = 24 * 3600
+
+    def __init__(
+        self,
+        store: StateStore,
+        tiers: Sequence[Tuple[int, float]] = DEFAULT_TIERS,
+        far_interval: float = DEFAULT_FAR_INTERVAL,
+        tick_seconds: float = 0.0,
+        clock: Callable[[], float] = time.time,
+    ):
+        """
+        Initialize the scheduler.
+
+        Args:
+            store: Where check history is kept between runs
+            tiers: (max days out, base interval seconds) pairs in ascending order
+            far_interval: Base interval for dates beyond the last tier
+            tick_seconds: Period of the polling schedule. A pair is checked
+                on the tick closest to its due time, and never more than
+                once per tick.
+            clock: Wall clock in seconds, replaceable in tests
+        """
+        self.store = store
+        self.tiers = tiers
+        self.far_interval = far_interval
+        self.tick_seconds = tick_seconds
+        self.clock = clock
+        self._staged: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    def base_interval(self, days_out: int) -> float:
+        """Base polling interval for a date days_out days from today."""
+        for max_days, interval in self.tiers:
+            if days_out <= max_days:
+                return interval
+        return self.far_interval
+
+    def interval(self, days_out: int, change_rate: float) -> float:
+        """Polling interval scaled by the pair's change rate (0 to 1)."""
+        scaled = self.base_interval(days_out) * (1.5 - change_rate)
+        return max(scaled, self.tick_seconds)
+
+    def due_dates(
+        self,
+        venue_id: str,
+        dates: List[str],
+        budget: Optional[float] = None,
+        per_date: bool = True,
+    ) -> List[str]:
+        """
+        The dates, in the given order, whose lineup at a venue is due a check.
+
+        Args:
+            venue_id: The venue's identifier
+            dates: Candidate dates
+            budget: Most fetches the venue may make per ``BUDGET_WINDOW``.
+                Each tick may spend its share of the budget, plus whatever
+                dates have never been checked. If fewer fetches are allowed
+                than dates are due, the most overdue dates are kept; None
+                leaves the due dates uncapped.
+            per_date: Whether each date costs a fetch. Venues that load their
+                whole calendar at once cost one fetch however many dates are due.
+        """
+        now = self.clock()
+        today = date_type.fromtimestamp(now)
+        state = self._load(venue_id)
+        history = state["dates"]
+
+        # Date mapped to how many of its intervals have passed since its last check
+        overdue = {}
+        for date in dates:
+            entry = history.get(date)
+            if entry is None:
+                overdue[date] = float("inf")
+                continue
+            days_out = (date_type.fromisoformat(date) - today).days
+            wait = self.interval(days_out, entry["change_rate"])
+            elapsed = now - entry["checked_at"] + self.tick_seconds / 2
+            if elapsed >= wait:
+                overdue[date] = elapsed / wait
+
+        if budget is not None and overdue:
+            left = budget - self._fetches_in_window(state["fetches"], now)
+            if not per_date:
+                allowed = len(overdue) if left >= 1 else 0
+            else:
+                share = budget * self.tick_seconds / self.BUDGET_WINDOW
+                unchecked = sum(1 for rank in overdue.values() if rank == float("inf"))
+                allowed = max(min(int(left), max(math.ceil(share), 1, unchecked)), 0)
+            if allowed < len(overdue):
+                kept = sorted(overdue, key=overdue.get, reverse=True)[:allowed]
+                overdue = {date: overdue[date] for date in kept}
+        return [date for date in dates if date in overdue]
+
+    def record(self, venue_id: str, checks: Dict[str, bool], fetches: Optional[int] = None):
+        """
+        Stage the outcome of checking some of a venue's dates.
+
+        Args:
+            venue_id: The venue's identifier
+            checks: Date mapped to whether its lineup changed since the last check
+            fetches: Requests the check made, counted against the venue's
+                budget; defaults to one per date
+        """
+        now = self.clock()
+        with self._lock:
+            if venue_id not in self._staged:
+                today = date_type.fromtimestamp(now).isoformat()
+                state = self._load(venue_id)
+                self._staged[venue_id] = {
+                    "dates": {
+                        date: entry
+                        for date, entry in state["dates"].items()
+                        if date >= today
+                    },
+                    "fetches": [
+                        entry
+                        for entry in state["fetches"]
+                        if entry[0] > now - self.BUDGET_WINDOW
+                    ],
+                }
+            history = self._staged[venue_id]["dates"]
+            for date, changed in checks.items():
+                rate = history.get(date, {}).get("change_rate", self.INITIAL_CHANGE_RATE)
+                rate += self.CHANGE_RATE_ALPHA * ((1.0 if changed else 0.0) - rate)
+                history[date] = {"checked_at": now, "change_rate": round(rate, 4)}
+            self._staged[venue_id]["fetches"].append(
+                [now, len(checks) if fetches is None else fetches]
+            )
+
+    def discard(self, venue_id: str):
+        """Drop a venue's staged checks, so its dates stay due; its fetches still count."""
+        with self._lock:
+            staged = self._staged.get(venue_id)
+            if staged is not None:
+                staged["dates"] = self._load(venue_id)["dates"]
+
+    def commit(self):
+        """Persist the check history staged by ``record`` since the last commit."""
+        with self._lock:
+            staged, self._staged = self._staged, {}
+        for venue_id, state in staged.items():
+            self.store.put(self.KEY_PREFIX + venue_id, state)
+
+    def _load(self, venue_id: str) -> Dict:
+        """A venue's check history by date and its log of [timestamp, fetches]."""
+        state: Optional[Dict] = self.store.get(self.KEY_PREFIX + venue_id)
+        return {
+            "dates": state["dates"] if state else {},
+            "fetches": state.get("fetches", []) if state else [],
+        }
+
+    def _fetches_in_window(self, fetches: List[List[float]], now: float) -> float:
+        return sum(count for at, count in fetches if at > now - self.BUDGET_WINDOW)
+
+    @classmethod
+    def from_config(cls, store: Optional[StateStore]) -> Optional["PollScheduler"]:
+        """Build the scheduler for a state store, or None without one."""
+        if store is None:
+            return None
+        return cls(store, tick_seconds=Config.POLL_TICK_MINUTES * 60)
@@ -0,0 +1,46 @@
+import threading
+import time
+from typing import Callable
+
+
+class TokenBucket:
+    """
+    Token-bucket rate limiter.
+
+    Tokens refill continuously at ``rate`` per second up to ``capacity``;
+    ``acquire`` blocks until enough tokens are available.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: float = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self._tokens = self.capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1.0):
+        """Take tokens from the bucket, waiting for them to refill if needed."""
+        if tokens > self.capacity:
+            raise ValueError(
+                f"Cannot acquire {tokens} tokens from a bucket of {self.capacity}"
+            )
+
+        while True:
+            with self._lock:
+                now = self._clock()
+                refill = (now - self._updated) * self.rate
+                self._tokens = min(self.capacity, self._tokens + refill)
+                self._updated = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait = (tokens - self._tokens) / self.rate
+            self._sleep(wait)
@@ -0,0 +1,60 @@
+import re
+from datetime import date as date_type
+from typing import Any, Dict, List
+
+# "7:30 PM", the time format the extraction prompt asks for
+SHOW_TIME_PATTERN = re.compile(r"^(1[0-2]|0?[1-9]):[0-5]\d [AP]M$")
+# "& More!", "and more" and similar placeholders, not performer names
+MORE_PATTERN = re.compile(r"(&|and|\+)?\s*more\b", re.IGNORECASE)
+
+
+def validate_show(show: Any) -> List[str]:
+    """
+    Check an extracted show dictionary against the extraction schema.
+
+    Returns:
+        A description of each problem found, empty if the show is valid
+    """
+    if not isinstance(show, dict):
+        return [f"expected an object, got {type(show).__name__}"]
+
+    problems = []
+    show_date = show.get("date")
+    try:
+        date_type.fromisoformat(show_date)
+        if len(show_date) != 10:
+            raise ValueError
+    except (TypeError, ValueError):
+        problems.append(f"date {show_date!r} is not YYYY-MM-DD")
+
+    show_time = show.get("time")
+    if not isinstance(show_time, str) or not SHOW_TIME_PATTERN.match(show_time):
+        problems.append(f"time {show_time!r} is not HH:MM AM/PM")
+
+    comedians = show.get("comedians")
+    if not isinstance(comedians, list) or not comedians:
+        problems.append("no comedians")
+    else:
+        for name in comedians:
+            if not isinstance(name, str) or not name.strip():
+                problems.append(f"comedian name {name!r} is empty")
+            elif MORE_PATTERN.match(name.strip()):
+                problems.append(f"comedian name {name!r} is a placeholder")
+
+    for field in ("venue_location", "show_url"):
+        if not isinstance(show.get(field, ""), str):
+            problems.append(f"{field} is not a string")
+    return problems
+
+
+def clean_show(show: Dict[str, Any]) -> Dict[str, Any]:
+    """Drop empty and "& More" comedian entries, the problems that can be repaired."""
+    comedians = show.get("comedians")
+    if not isinstance(comedians, list):
+        return show
+    kept = [
+        name
+        for name in comedians
+        if isinstance(name, str) and name.strip() and not MORE_PATTERN.match(name.strip())
+    ]
+    return dict(show, comedians=kept)
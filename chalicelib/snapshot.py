@@ -0,0 +1,247 @@
+import base64
+import hashlib
+import json
+import threading
+import time
+import uuid
+import zlib
+from datetime import date as date_type, datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .config import Config
+from .ical import render_calendar
+from .state_store import StateStore
+from .venues import Show
+
+
+class LineupSnapshot:
+    """
+    The upcoming shows with favorite comedians, precomputed for the read API.
+
+    Each check stages the matched shows for the dates it fetched, and
+    ``commit`` merges them into the stored snapshot: fetched dates are
+    replaced, dates the check did not fetch are kept, and past dates are
+    dropped. The JSON and iCalendar documents and their ETags are rendered
+    once at commit, so serving them is a lookup. A commit that leaves the
+    shows as they were writes nothing, so the documents and ETags stay the
+    same across runs until a lineup changes.
+
+    A snapshot can outgrow one DynamoDB item (400 KB), so each commit writes
+    a new version: the merged lineups and each document are compressed and
+    split across part items of at most ``part_chars`` characters, then a
+    small head item under ``KEY`` is switched to the new version. The
+    previous version is kept for readers that loaded the old head, and the
+    one before it is deleted.
+
+    Readers keep the last head in memory for ``refresh_seconds``, and the
+    documents of its version until the version changes, so a warm API
+    container reads the store at most once per interval however often the
+    feed is polled.
+    """
+
+    KEY = "snapshot:lineups"
+    CONTENT_TYPES = {"json": "application/json", "ics": "text/calendar; charset=utf-8"}
+    # Characters of compressed, base64 encoded data per part item
+    PART_CHARS = 300_000
+
+    def __init__(
+        self,
+        store: StateStore,
+        refresh_seconds: float = 60.0,
+        clock: Callable[[], float] = time.time,
+        part_chars: int = PART_CHARS,
+    ):
+        """
+        Initialize the snapshot.
+
+        Args:
+            store: Where the snapshot is kept, shared with the API
+            refresh_seconds: How long readers reuse a loaded snapshot
+            clock: Wall clock in seconds, replaceable in tests
+            part_chars: Most characters of stored data per part item
+        """
+        self.store = store
+        self.refresh_seconds = refresh_seconds
+        self.clock = clock
+        self.part_chars = part_chars
+        self._staged: Dict[str, Dict[str, List[Dict[str, Any]]]] = {}
+        self._lock = threading.Lock()
+        self._head: Optional[Dict[str, Any]] = None
+        self._head_at = 0.0
+        # (version, kind) -> rendered document of a loaded version
+        self._documents: Dict[Tuple[str, str], str] = {}
+
+    @staticmethod
+    def entry(show: Show, favorites: List[str], url: str = "") -> Dict[str, Any]:
+        """The snapshot entry for a show and the favorites it features."""
+        return {
+            "venue": show.venue,
+            "date": show.date,
+            "time": show.time.strftime("%H:%M") if show.time is not None else None,
+            "label": show.time_and_venue,
+            "room": show.room,
+            "url": url,
+            "favorites": favorites,
+            "comedians": list(show.comedians),
+        }
+
+    def stage(self, venue_id: str, entries_by_date: Dict[str, List[Dict[str, Any]]]):
+        """
+        Stage a venue's matched shows for the dates it fetched.
+
+        Every fetched date should be present, with an empty list when it
+        has no matches, so shows that lost their favorites are removed.
+        """
+        with self._lock:
+            self._staged.setdefault(venue_id, {}).update(entries_by_date)
+
+    def unstage(self, venue_id: str) -> Dict[str, List[Dict[str, Any]]]:
+        """Remove a venue's staged entries and return them, for another instance to stage."""
+        with self._lock:
+            return self._staged.pop(venue_id, {})
+
+    def commit(self):
+        """Merge the staged entries into the stored snapshot and render its documents."""
+        with self._lock:
+            staged, self._staged = self._staged, {}
+        if not staged:
+            return
+
+        now = self.clock()
+        today = date_type.fromtimestamp(now).isoformat()
+        head = self.store.get(self.KEY)
+        stored = self._read_section(head, "venues") if head is not None else None
+        venues: Dict[str, Dict[str, List[Dict[str, Any]]]] = json.loads(stored or "{}")
+        for venue_id, entries_by_date in staged.items():
+            venues.setdefault(venue_id, {}).update(entries_by_date)
+        venues = {
+            venue_id: {
+                date: entries
+                for date, entries in sorted(dates.items())
+                if date >= today and entries
+            }
+            for venue_id, dates in venues.items()
+        }
+        merged = json.dumps(venues, separators=(",", ":"), sort_keys=True)
+        if merged == stored:
+            # Rewriting would only change the timestamps in the documents,
+            # and with them the ETags clients revalidate against
+            print("Snapshot unchanged")
+            return
+
+        shows = sorted(
+            (entry for dates in venues.values() for entries in dates.values() for entry in entries),
+            key=lambda entry: (entry["date"], entry["time"] or "", entry["venue"], entry["label"]),
+        )
+        generated = datetime.fromtimestamp(now, timezone.utc).isoformat(timespec="seconds")
+        bodies = {
+            "json": json.dumps(
+                {"generated_at": generated, "shows": shows}, separators=(",", ":")
+            ),
+            "ics": render_calendar(shows, "Favorite comedians", now),
+        }
+        sections = dict(bodies, venues=merged)
+
+        version = uuid.uuid4().hex
+        parts = {
+            section: self._write_section(version, section, text)
+            for section, text in sections.items()
+        }
+        self.store.put(
+            self.KEY,
+            {
+                "generated_at": now,
+                "version": version,
+                "parts": parts,
+                "etags": {kind: self._etag(body) for kind, body in bodies.items()},
+                "previous": (
+                    {"version": head["version"], "parts": head["parts"]} if head else None
+                ),
+            },
+        )
+        # Readers may still hold the head just replaced, so only the version
+        # before it is removed
+        if head is not None and head.get("previous"):
+            self._delete_version(head["previous"])
+        print(f"Snapshot updated with {len(shows)} upcoming shows")
+
+    def document(self, kind: str) -> Optional[Tuple[str, str]]:
+        """
+        The rendered "json" or "ics" document and its ETag, or None without a snapshot.
+
+        Served from memory while the loaded head is fresh and its version
+        has not changed.
+        """
+        now = self.clock()
+        with self._lock:
+            head, head_at = self._head, self._head_at
+        if head is None or now - head_at >= self.refresh_seconds:
+            head = self.store.get(self.KEY)
+            with self._lock:
+                self._head, self._head_at = head, now
+        if head is None:
+            return None
+
+        key = (head["version"], kind)
+        with self._lock:
+            body = self._documents.get(key)
+        if body is None:
+            body = self._read_section(head, kind)
+            with self._lock:
+                # Only the current version's documents are worth keeping
+                self._documents = {
+                    k: v for k, v in self._documents.items() if k[0] == head["version"]
+                }
+                self._documents[key] = body
+        return body, head["etags"][kind]
+
+    def _part_key(self, version: str, section: str, index: int) -> str:
+        return f"{self.KEY}:{version}:{section}:{index}"
+
+    def _write_section(self, version: str, section: str, text: str) -> int:
+        """Compress a section into part items of the version; return the part count."""
+        data = base64.b64encode(zlib.compress(text.encode("utf-8"))).decode("ascii")
+        chunks = [
+            data[start : start + self.part_chars]
+            for start in range(0, len(data), self.part_chars)
+        ] or [""]
+        for index, chunk in enumerate(chunks):
+            self.store.put(self._part_key(version, section, index), {"data": chunk})
+        return len(chunks)
+
+    def _read_section(self, head: Dict[str, Any], section: str) -> str:
+        """Reassemble a section of the version a head points at."""
+        chunks = []
+        for index in range(head["parts"][section]):
+            part = self.store.get(self._part_key(head["version"], section, index))
+            if part is None:
+                raise KeyError(f"Snapshot {head['version']} is missing {section} part {index}")
+            chunks.append(part["data"])
+        return zlib.decompress(base64.b64decode("".join(chunks))).decode("utf-8")
+
+    def _delete_version(self, version: Dict[str, Any]):
+        for section, count in version["parts"].items():
+            for index in range(count):
+                self.store.delete(self._part_key(version["version"], section, index))
+
+    @staticmethod
+    def _etag(body: str) -> str:
+        return '"' + hashlib.sha256(body.encode("utf-8")).hexdigest()[:32] + '"'
+
+    @staticmethod
+    def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+        """Whether an If-None-Match header value matches the current ETag."""
+        if not if_none_match:
+            return False
+        candidates = [value.strip() for value in if_none_match.split(",")]
+        # Weak comparison, as required for If-None-Match
+        return "*" in candidates or etag in (
+            value[2:] if value.startswith("W/") else value for value in candidates
+        )
+
+    @classmethod
+    def from_config(cls, store: Optional[StateStore]) -> Optional["LineupSnapshot"]:
+        """Build the snapshot for a state store, or None without one."""
+        if store is None:
+            return None
+        return cls(store, refresh_seconds=Config.SNAPSHOT_REFRESH_SECONDS)
@@ -0,0 +1,33 @@
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Tuple
+
+
+class StartupTimer:
+    """Records how long each import and initialization step of a cold start takes."""
+
+    def __init__(self):
+        self.phases: List[Tuple[str, float]] = []
+        self._reported = False
+
+    @contextmanager
+    def phase(self, name: str):
+        """Time the enclosed block as a named startup phase."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, time.perf_counter() - start))
+
+    def report(self) -> Dict[str, float]:
+        """Return each phase's duration in milliseconds, in the order recorded."""
+        return {name: round(elapsed * 1000, 1) for name, elapsed in self.phases}
+
+    def report_once(self):
+        """Print the startup report on the first call only (the cold start)."""
+        if not self._reported:
+            self._reported = True
+            print(f"Cold start report (ms): {self.report()}")
+
+
+startup_timer = StartupTimer()
@@ -0,0 +1,120 @@
+import json
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional
+
+from .config import Config
+from .lazy import get_boto3_client
+
+
+class StateStore(ABC):
+    """Persistent key/value store for JSON-serializable state kept between runs."""
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the value stored under key, or None."""
+        pass
+
+    @abstractmethod
+    def put(self, key: str, value: Dict[str, Any]):
+        """Store a value under key, replacing any previous value."""
+        pass
+
+    @abstractmethod
+    def delete(self, key: str):
+        """Remove the value stored under key, if any."""
+        pass
+
+    @abstractmethod
+    def pop(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Atomically remove and return the value stored under key.
+
+        When several callers pop the same key, only one gets the value; the
+        others get None, so a pop can claim work exactly once.
+        """
+        pass
+
+    @classmethod
+    def from_config(cls) -> Optional["StateStore"]:
+        """Build the store configured by Config, or None if state is disabled."""
+        backend_name = Config.STATE_STORE_BACKEND
+        if backend_name == "sqlite":
+            return SQLiteStateStore(Config.STATE_STORE_PATH)
+        if backend_name == "dynamodb":
+            return DynamoDBStateStore(Config.STATE_STORE_TABLE)
+        return None
+
+
+class SQLiteStateStore(StateStore):
+    """Local SQLite state store."""
+
+    def __init__(self, path: str):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS state (key TEXT PRIMARY KEY, value TEXT NOT NULL)"
+            )
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM state WHERE key = ?", (key,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, key: str, value: Dict[str, Any]):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO state VALUES (?, ?)", (key, json.dumps(value))
+            )
+
+    def delete(self, key: str):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM state WHERE key = ?", (key,))
+
+    def pop(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "DELETE FROM state WHERE key = ? RETURNING value", (key,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+
+class DynamoDBStateStore(StateStore):
+    """
+    DynamoDB state store with one item per key.
+
+    The table needs a string partition key named ``pk``. Tests and benchmarks
+    pass the in-memory client from benchmarks/fake_aws.py as ``dynamodb_client``.
+    """
+
+    def __init__(self, table_name: str, dynamodb_client=None):
+        self.dynamodb = dynamodb_client or get_boto3_client("dynamodb")
+        self.table_name = table_name
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        response = self.dynamodb.get_item(
+            TableName=self.table_name, Key={"pk": {"S": key}}, ConsistentRead=True
+        )
+        item = response.get("Item")
+        return json.loads(item["value"]["S"]) if item else None
+
+    def put(self, key: str, value: Dict[str, Any]):
+        self.dynamodb.put_item(
+            TableName=self.table_name,
+            Item={"pk": {"S": key}, "value": {"S": json.dumps(value)}},
+        )
+
+    def delete(self, key: str):
+        self.dynamodb.delete_item(TableName=self.table_name, Key={"pk": {"S": key}})
+
+    def pop(self, key: str) -> Optional[Dict[str, Any]]:
+        # DeleteItem is atomic, so only the caller that removed the item gets it back
+        response = self.dynamodb.delete_item(
+            TableName=self.table_name, Key={"pk": {"S": key}}, ReturnValues="ALL_OLD"
+        )
+        item = response.get("Attributes")
+        return json.loads(item["value"]["S"]) if item else None
@@ -0,0 +1,127 @@
+import json
+from typing import Dict, Iterable, List, Optional, Set
+
+from .comedian_matcher import ComedianMatcher, normalize_name
+from .config import Config
+
+
+# venue name -> date -> show -> matched comedians
+Results = Dict[str, Dict[str, Dict[str, List[str]]]]
+
+
+def merge_results(into: Results, other: Results) -> Results:
+    """Merge other's matches into into, keeping each show's comedians unique."""
+    for venue_name, venue_results in other.items():
+        for date, shows in venue_results.items():
+            for show, comedians in shows.items():
+                matches = into.setdefault(venue_name, {}).setdefault(date, {}).setdefault(show, [])
+                matches.extend(name for name in comedians if name not in matches)
+    return into
+
+
+class Subscriber:
+    def __init__(self, subscriber_id: str, email: str, favorite_comedians: List[str]):
+        self.subscriber_id = subscriber_id
+        self.email = email
+        self.favorite_comedians = favorite_comedians
+
+    def __repr__(self):
+        return (
+            f"Subscriber(id={self.subscriber_id}, email={self.email}, "
+            f"favorites={len(self.favorite_comedians)})"
+        )
+
+
+class SubscriberRegistry:
+    """
+    Subscribers with an inverted index from comedian to subscribers.
+
+    Every scraped lineup is matched once against the union of all favorites
+    through ``matcher``; ``build_digests`` then fans each match out to the
+    subscribers who follow that comedian.
+    """
+
+    def __init__(
+        self,
+        subscribers: Iterable[Subscriber],
+        aliases: Optional[Dict[str, str]] = None,
+        fuzzy_cutoff: Optional[float] = None,
+    ):
+        self.subscribers: Dict[str, Subscriber] = {
+            subscriber.subscriber_id: subscriber for subscriber in subscribers
+        }
+
+        self._index: Dict[str, Set[str]] = {}
+        all_favorites = []
+        for subscriber in self.subscribers.values():
+            for name in subscriber.favorite_comedians:
+                key = normalize_name(name)
+                if key not in self._index:
+                    all_favorites.append(name)
+                self._index.setdefault(key, set()).add(subscriber.subscriber_id)
+
+        self.matcher = ComedianMatcher(
+            all_favorites, aliases=aliases, fuzzy_cutoff=fuzzy_cutoff
+        )
+
+    def __len__(self):
+        return len(self.subscribers)
+
+    def subscribers_for(self, comedian: str) -> Set[str]:
+        """IDs of subscribers following a (canonical) favorite comedian."""
+        return self._index.get(normalize_name(comedian), set())
+
+    def build_digests(self, results: Results) -> Dict[str, Results]:
+        """
+        Split matched results into one digest per subscriber.
+
+        Args:
+            results: Matches against the union of all favorites, as returned by
+                ComedyBotService.check_all_venues
+
+        Returns:
+            Dict mapping subscriber ID to results containing only that
+            subscriber's favorites; subscribers without matches are omitted
+        """
+        digests: Dict[str, Results] = {}
+        for venue_name, venue_results in results.items():
+            for date, shows in venue_results.items():
+                for show, comedians in shows.items():
+                    for comedian in comedians:
+                        for subscriber_id in sorted(self.subscribers_for(comedian)):
+                            digest = digests.setdefault(subscriber_id, {})
+                            show_matches = (
+                                digest.setdefault(venue_name, {})
+                                .setdefault(date, {})
+                                .setdefault(show, [])
+                            )
+                            show_matches.append(comedian)
+        return digests
+
+    @classmethod
+    def from_config(cls) -> Optional["SubscriberRegistry"]:
+        """
+        Load subscribers from SUBSCRIBERS_FILE or SUBSCRIBERS_JSON.
+
+        Both hold a JSON list of {"id", "email", "favorites"} objects. Returns
+        None when neither is set, in which case the single EMAIL_TO recipient
+        is used.
+        """
+        if Config.SUBSCRIBERS_FILE:
+            with open(Config.SUBSCRIBERS_FILE) as f:
+                data = json.load(f)
+        elif Config.SUBSCRIBERS_JSON:
+            data = json.loads(Config.SUBSCRIBERS_JSON)
+        else:
+            return None
+
+        return cls(
+            (
+                Subscriber(
+                    entry.get("id", entry["email"]), entry["email"], entry["favorites"]
+                )
+                for entry in data
+            ),
+            aliases=Config.COMEDIAN_ALIASES,
+            fuzzy_cutoff=Config.FUZZY_MATCH_CUTOFF,
+        )
@@ -1,5 +1,10 @@
+import time
 from datetime import datetime, timedelta
-from typing import List
+from typing import Any, List, Optional
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when a run's deadline passes before or during a request."""
 
 
 def get_next_days(days: int = 7) -> List[str]:
@@ -14,3 +19,28 @@ def get_next_days(days: int = 7) -> List[str]:
     """
     today = datetime.today()
     return [(today + timedelta(days=i)).strftime("%Y-%m-%d") for i in range(days)]
+
+
+def deadline_from_context(context: Any, safety_margin: float = 0.0) -> Optional[float]:
+    """
+    Convert a Lambda context's remaining time into a monotonic deadline.
+
+    Args:
+        context: The Lambda context object, or None when running locally.
+        safety_margin (float): Seconds to reserve for work after the deadline.
+
+    Returns:
+        Optional[float]: A ``time.monotonic()`` deadline, or None if there is
+        no context to take the remaining time from.
+    """
+    if context is None or not hasattr(context, "get_remaining_time_in_millis"):
+        return None
+    remaining = context.get_remaining_time_in_millis() / 1000.0
+    return time.monotonic() + max(remaining - safety_margin, 0.0)
+
+
+def seconds_until(deadline: Optional[float]) -> Optional[float]:
+    """Return the seconds left before a monotonic deadline (None if unbounded)."""
+    if deadline is None:
+        return None
+    return max(deadline - time.monotonic(), 0.0)
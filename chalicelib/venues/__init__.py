@@ -1,5 +1,6 @@
 from .base import VenueBot, Show
+from .lineup_table import LineupTable
 from .comedy_cellar import ComedyCellarBot
 from .the_stand import TheStandBot
 
-__all__ = ["VenueBot", "Show", "ComedyCellarBot", "TheStandBot"]
+__all__ = ["VenueBot", "Show", "LineupTable", "ComedyCellarBot", "TheStandBot"]
@@ -1,45 +1,229 @@
+import re
+import sys
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import date as date_type, time as time_type
+from functools import lru_cache
+from typing import Any, Callable, Iterable, List, Dict, Optional, Tuple, Union
+from ..circuit_breaker import CircuitBreaker, CircuitOpenError
+from ..comedian_matcher import ComedianMatcher
+from ..http_client import HttpClient, get_http_client
+from ..utils import seconds_until
+
+
+TIME_PATTERN = re.compile(r"\b(\d{1,2}):(\d{2})\s*([ap])\.?m\.?", re.IGNORECASE)
+
+
+@lru_cache(maxsize=512)
+def parse_show_time(text: str) -> Optional[time_type]:
+    """
+    Parse the first "7:30 PM"-style time in text.
+
+    Results are cached, so shows at the same time of day share one object.
+    """
+    match = TIME_PATTERN.search(text)
+    if match is None:
+        return None
+    hour, minute, meridiem = match.groups()
+    hour = int(hour) % 12 + (12 if meridiem.lower() == "p" else 0)
+    try:
+        return time_type(hour, int(minute))
+    except ValueError:
+        return None
 
 
 class Show:
+    """
+    One show in a venue's lineup.
+
+    Shows are immutable and slotted. Dates, labels, venue, room and comedian
+    names are interned, so the strings that repeat across a calendar are
+    stored once rather than per show.
+    """
+
+    __slots__ = (
+        "date",
+        "time",
+        "venue",
+        "room",
+        "comedians",
+        "show_url",
+        "time_and_venue",
+    )
+
     def __init__(
         self,
         time_and_venue: str,
-        comedians: List[str],
+        comedians: Iterable[str],
         date: str,
-        raw_data: Dict[str, Any] = None,
+        venue: str = "",
+        room: str = "",
+        show_url: str = "",
+        time: Optional[time_type] = None,
     ):
-        self.time_and_venue = time_and_venue
-        self.comedians = comedians
-        self.date = date
-        self.raw_data = raw_data or {}
+        """
+        Initialize the show.
+
+        Args:
+            time_and_venue: Display label, also the show's key within a date
+            comedians: Performer names in billing order
+            date: Date in YYYY-MM-DD format
+            venue: Venue name
+            room: Room or stage within the venue, if any
+            show_url: Path of the show's page, if any
+            time: Start time; parsed from time_and_venue when not given
+        """
+        setattr_ = object.__setattr__
+        setattr_(self, "time_and_venue", sys.intern(time_and_venue))
+        setattr_(self, "comedians", tuple(sys.intern(name) for name in comedians))
+        setattr_(self, "date", sys.intern(date))
+        setattr_(self, "venue", sys.intern(venue))
+        setattr_(self, "room", sys.intern(room))
+        setattr_(self, "show_url", show_url)
+        setattr_(self, "time", time if time is not None else parse_show_time(time_and_venue))
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"Show is immutable, cannot set {name!r}")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"Show is immutable, cannot delete {name!r}")
+
+    @property
+    def day(self) -> Optional[date_type]:
+        """The show's date as a date object, or None if it is not YYYY-MM-DD."""
+        try:
+            return date_type.fromisoformat(self.date)
+        except ValueError:
+            return None
+
+    def _key(self) -> Tuple:
+        return (
+            self.date,
+            self.time_and_venue,
+            self.comedians,
+            self.venue,
+            self.room,
+            self.show_url,
+        )
+
+    def __eq__(self, other):
+        if not isinstance(other, Show):
+            return NotImplemented
+        return self._key() == other._key()
+
+    def __hash__(self):
+        return hash(self._key())
 
     def __repr__(self):
-        return f"Show(date={self.date}, venue={self.time_and_venue}, comedians={self.comedians})"
+        return f"Show(date={self.date}, venue={self.time_and_venue}, comedians={list(self.comedians)})"
 
 
 class VenueBot(ABC):
-    def __init__(self, name: str):
+    # Maximum number of dates fetched concurrently by fetch_lineup_range
+    max_concurrency = 4
+    # Whether a check can be split into date slices handled separately; off
+    # for venues that load their whole calendar in one request
+    splits_by_date = True
+
+    def __init__(self, name: str, http_client: Optional[HttpClient] = None):
         self.name = name
+        self.http = http_client or get_http_client()
+        # Set by the service; venue requests go through it when present
+        self.breaker: Optional[CircuitBreaker] = None
 
     @abstractmethod
-    def fetch_lineup(self, date: str) -> List[Show]:
-        """Fetch lineup for a specific date."""
+    def fetch_lineup(self, date: str, deadline: Optional[float] = None) -> List[Show]:
+        """
+        Fetch lineup for a specific date.
+
+        Requests should be made with the deadline, so their retries stop at it.
+        """
         pass
 
+    def fetch_lineup_range(
+        self, dates: List[str], deadline: Optional[float] = None
+    ) -> Dict[str, List[Show]]:
+        """
+        Fetch lineups for several dates at once.
+
+        The default implementation calls ``fetch_lineup`` for each date using up
+        to ``max_concurrency`` workers. Venues that load their whole calendar in
+        one request cache it and serve each date from the cache, as The Stand does.
+        Once the venue's circuit opens, the remaining dates are skipped.
+
+        Args:
+            dates: Date strings in YYYY-MM-DD format
+            deadline: Optional ``time.monotonic()`` timestamp after which
+                unfinished dates are abandoned
+
+        Returns:
+            Dict mapping each successfully fetched date to its shows, in the
+            order the dates were given
+        """
+        executor = ThreadPoolExecutor(
+            max_workers=max(self.max_concurrency, 1),
+            thread_name_prefix=self.get_venue_identifier(),
+        )
+        futures = {
+            executor.submit(self._call, self.fetch_lineup, date, deadline): date
+            for date in dates
+        }
+        done, not_done = wait(futures, timeout=seconds_until(deadline))
+        executor.shutdown(wait=False, cancel_futures=True)
+
+        if not_done:
+            print(f"Deadline reached, skipped {len(not_done)} {self.name} dates")
+
+        shows_by_date = {}
+        short_circuited = 0
+        for future in done:
+            try:
+                shows_by_date[futures[future]] = future.result()
+            except CircuitOpenError:
+                short_circuited += 1
+            except Exception as e:
+                print(f"Error fetching {self.name} lineup for {futures[future]}: {e}")
+
+        if short_circuited:
+            print(f"Circuit open, skipped {short_circuited} {self.name} dates")
+
+        return {date: shows_by_date[date] for date in dates if date in shows_by_date}
+
+    def _call(self, fn: Callable[..., Any], *args) -> Any:
+        """Make a venue request through the circuit breaker, if there is one."""
+        if self.breaker is None:
+            return fn(*args)
+        return self.breaker.call(fn, *args)
+
     @abstractmethod
     def get_venue_identifier(self) -> str:
         """Return a unique identifier for this venue."""
         pass
 
+    def show_link(self, show: Show) -> str:
+        """Absolute URL of a show's page, or "" if it has none."""
+        return show.show_url
+
     def find_favorite_comedians(
-        self, shows: List[Show], favorite_comedians: List[str]
+        self,
+        shows: List[Show],
+        favorite_comedians: Union[ComedianMatcher, List[str]],
     ) -> Dict[str, List[str]]:
-        """Find shows with favorite comedians."""
+        """
+        Find shows with favorite comedians.
+
+        Pass a prebuilt ComedianMatcher when matching many shows; a plain list
+        of names is compiled into one on each call.
+        """
+        if not isinstance(favorite_comedians, ComedianMatcher):
+            favorite_comedians = ComedianMatcher(favorite_comedians)
+
         results = {}
         for show in shows:
             for comedian in show.comedians:
-                if comedian in favorite_comedians:
-                    results.setdefault(show.time_and_venue, []).append(comedian)
+                favorite = favorite_comedians.match(comedian)
+                if favorite is not None:
+                    matches = results.setdefault(show.time_and_venue, [])
+                    if favorite not in matches:
+                        matches.append(favorite)
         return results
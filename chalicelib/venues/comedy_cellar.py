@@ -1,12 +1,18 @@
-import requests
-from bs4 import BeautifulSoup
-from typing import List
+from typing import List, Optional
 from .base import VenueBot, Show
+from ..html_parser import make_strainer, parse_html
+from ..http_client import HttpClient
+from ..metrics import metrics
 
 
 class ComedyCellarBot(VenueBot):
-    def __init__(self):
-        super().__init__("Comedy Cellar")
+    max_concurrency = 6
+
+    # Only the show headers and lineup entries are needed from the API's HTML
+    LINEUP_CLASSES = ["set-header", "set-content"]
+
+    def __init__(self, http_client: Optional[HttpClient] = None):
+        super().__init__("Comedy Cellar", http_client=http_client)
         self.base_url = "https://www.comedycellar.com/lineup/api/"
         self.headers = {
             "content-type": "application/x-www-form-urlencoded; charset=UTF-8",
@@ -18,37 +24,48 @@ class ComedyCellarBot(VenueBot):
     def get_venue_identifier(self) -> str:
         return "comedy_cellar"
 
-    def fetch_lineup(self, date: str = "today") -> List[Show]:
+    def fetch_lineup(
+        self, date: str = "today", deadline: Optional[float] = None
+    ) -> List[Show]:
         """Fetch the Comedy Cellar lineup for a given date."""
         data = {
             "action": "cc_get_shows",
             "json": f'{{"date":"{date}","venue":"newyork","type":"lineup"}}',
         }
 
-        response = requests.post(self.base_url, headers=self.headers, data=data)
-        response.raise_for_status()
-        html = response.json()["show"]["html"]
-
-        soup = BeautifulSoup(html, "html.parser")
-        shows = []
-
-        for show_section in soup.select(".set-header"):
-            show_info = show_section.find("h2")
-            time_and_venue = show_info.get_text(strip=True).replace("show", "").strip()
+        with metrics.span("Fetch", Venue=self.get_venue_identifier()):
+            response = self.http.post(
+                self.base_url, headers=self.headers, data=data, deadline=deadline
+            )
+            response.raise_for_status()
+            html = response.json()["show"]["html"]
 
-            comedians = []
-            for lineup in show_section.find_next_sibling("div").select(".set-content"):
-                name_tag = lineup.find("span", class_="name")
-                name = name_tag.get_text(strip=True) if name_tag else "Unknown"
-                comedians.append(name)
+        with metrics.span("Parse", Venue=self.get_venue_identifier()):
+            soup = parse_html(
+                html, parse_only=make_strainer(class_=self.LINEUP_CLASSES)
+            )
+            # (label, comedians) per show; lineup entries follow the header
+            # of the show they belong to
+            lineups = []
+            for element in soup.select(".set-header, .set-content"):
+                if "set-header" in element.get("class", []):
+                    show_info = element.find("h2").get_text(strip=True)
+                    lineups.append((show_info.replace("show", "").strip(), []))
+                elif lineups:
+                    name_tag = element.find("span", class_="name")
+                    name = name_tag.get_text(strip=True) if name_tag else "Unknown"
+                    lineups[-1][1].append(name)
 
-            shows.append(
+            shows = [
                 Show(
                     time_and_venue=time_and_venue,
                     comedians=comedians,
                     date=date,
-                    raw_data={"venue": self.name},
+                    venue=self.name,
+                    room=time_and_venue.partition(" - ")[2],
                 )
-            )
+                for time_and_venue, comedians in lineups
+            ]
 
+        metrics.count("Shows", len(shows), Venue=self.get_venue_identifier())
         return shows
@@ -0,0 +1,257 @@
+import json
+import struct
+import sys
+import zlib
+from array import array
+from datetime import time as time_type
+from typing import Dict, Iterable, List, Optional
+
+from ..comedian_matcher import normalize_name
+from .base import Show
+
+
+class LineupTable:
+    """
+    Columnar store for many shows.
+
+    Each show is one row. Strings are stored once in a shared pool and the
+    columns hold integer codes in compact arrays. Performers are kept as one
+    flat array of codes plus row offsets. Rows are indexed by date and by
+    normalized performer name, so a date or comedian filter reads only the
+    matching rows instead of scanning every show.
+
+    Tables are built once and then only read, so they need no locking.
+    ``to_bytes`` and ``from_bytes`` store a table as its string pool and raw
+    columns, compressed.
+    """
+
+    NO_TIME = -1
+
+    # Serialized columns in order; every column is stored little-endian
+    COLUMNS = (
+        "dates",
+        "times",
+        "labels",
+        "venues",
+        "rooms",
+        "urls",
+        "performer_offsets",
+        "performers",
+    )
+    FORMAT_MAGIC = b"LUT1"
+
+    def __init__(self, shows: Iterable[Show] = ()):
+        self._strings: List[str] = []
+        self._codes: Dict[str, int] = {}
+
+        self.dates = array("I")
+        self.times = array("h")  # minutes after midnight, or NO_TIME
+        self.labels = array("I")
+        self.venues = array("I")
+        self.rooms = array("I")
+        self.urls = array("I")
+        self.performer_offsets = array("I", [0])
+        self.performers = array("I")
+
+        # date code -> rows, normalized performer code -> rows
+        self._by_date: Dict[int, array] = {}
+        self._by_performer: Dict[int, array] = {}
+
+        self.extend(shows)
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    def _code(self, value: str) -> int:
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self._strings)
+            self._strings.append(value)
+        return code
+
+    def append(self, show: Show) -> int:
+        """Add a show and return its row number."""
+        row = len(self.dates)
+        date_code = self._code(show.date)
+        self.dates.append(date_code)
+        if show.time is None:
+            self.times.append(self.NO_TIME)
+        else:
+            self.times.append(show.time.hour * 60 + show.time.minute)
+        self.labels.append(self._code(show.time_and_venue))
+        self.venues.append(self._code(show.venue))
+        self.rooms.append(self._code(show.room))
+        self.urls.append(self._code(show.show_url))
+
+        self._by_date.setdefault(date_code, array("I")).append(row)
+        for name in show.comedians:
+            self.performers.append(self._code(name))
+            key = self._code(normalize_name(name))
+            rows = self._by_performer.setdefault(key, array("I"))
+            if not rows or rows[-1] != row:
+                rows.append(row)
+        self.performer_offsets.append(len(self.performers))
+        return row
+
+    def extend(self, shows: Iterable[Show]):
+        """Add several shows."""
+        for show in shows:
+            self.append(show)
+
+    def show(self, row: int) -> Show:
+        """Materialize one row as a Show."""
+        strings = self._strings
+        minutes = self.times[row]
+        performers = self.performers[
+            self.performer_offsets[row] : self.performer_offsets[row + 1]
+        ]
+        return Show(
+            time_and_venue=strings[self.labels[row]],
+            comedians=[strings[code] for code in performers],
+            date=strings[self.dates[row]],
+            venue=strings[self.venues[row]],
+            room=strings[self.rooms[row]],
+            show_url=strings[self.urls[row]],
+            time=None if minutes == self.NO_TIME else time_type(*divmod(minutes, 60)),
+        )
+
+    def date(self, row: int) -> str:
+        """The YYYY-MM-DD date of a row, without materializing the show."""
+        return self._strings[self.dates[row]]
+
+    def venue(self, row: int) -> str:
+        """The venue name of a row, without materializing the show."""
+        return self._strings[self.venues[row]]
+
+    def shows(self, rows: Optional[Iterable[int]] = None) -> List[Show]:
+        """Materialize the given rows, or every row, in row order."""
+        if rows is None:
+            rows = range(len(self))
+        return [self.show(row) for row in rows]
+
+    def rows_for_dates(self, dates: Iterable[str]) -> List[int]:
+        """Rows on any of the given YYYY-MM-DD dates, in row order."""
+        rows = []
+        for date in set(dates):
+            code = self._codes.get(date)
+            if code is not None and code in self._by_date:
+                rows.extend(self._by_date[code])
+        return sorted(rows)
+
+    def rows_between(self, start: str, end: str) -> List[int]:
+        """Rows dated from start to end inclusive, in row order."""
+        return self.rows_for_dates(
+            self._strings[code]
+            for code in self._by_date
+            if start <= self._strings[code] <= end
+        )
+
+    def rows_with_comedians(self, names: Iterable[str]) -> List[int]:
+        """Rows featuring any of the given comedians (compared normalized)."""
+        rows = set()
+        for name in names:
+            code = self._codes.get(normalize_name(name))
+            if code is not None and code in self._by_performer:
+                rows.update(self._by_performer[code])
+        return sorted(rows)
+
+    def filter(
+        self,
+        dates: Optional[Iterable[str]] = None,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        comedians: Optional[Iterable[str]] = None,
+    ) -> List[Show]:
+        """
+        Shows matching every given condition, in row order.
+
+        Args:
+            dates: Only these YYYY-MM-DD dates
+            start: Only dates on or after this one
+            end: Only dates on or before this one
+            comedians: Only shows featuring at least one of these comedians
+        """
+        selected: Optional[set] = None
+        if dates is not None:
+            selected = set(self.rows_for_dates(dates))
+        if start is not None or end is not None:
+            in_range = set(self.rows_between(start or "", end or "\uffff"))
+            selected = in_range if selected is None else selected & in_range
+        if comedians is not None:
+            featuring = set(self.rows_with_comedians(comedians))
+            selected = featuring if selected is None else selected & featuring
+
+        if selected is None:
+            return self.shows()
+        return self.shows(sorted(selected))
+
+    def shows_by_date(self, dates: Iterable[str]) -> Dict[str, List[Show]]:
+        """Each given date mapped to its shows in row order, empty if none."""
+        by_date = {}
+        for date in dates:
+            code = self._codes.get(date)
+            rows = self._by_date.get(code, ()) if code is not None else ()
+            by_date[date] = self.shows(rows)
+        return by_date
+
+    def to_bytes(self) -> bytes:
+        """Serialize the table as a compressed string pool plus raw columns."""
+        columns = [getattr(self, name) for name in self.COLUMNS]
+        if sys.byteorder == "big":
+            columns = [array(column.typecode, column) for column in columns]
+            for column in columns:
+                column.byteswap()
+        header = json.dumps(
+            {
+                "strings": self._strings,
+                "columns": [[column.typecode, len(column)] for column in columns],
+            },
+            separators=(",", ":"),
+        ).encode("utf-8")
+        body = b"".join(
+            [struct.pack("<I", len(header)), header]
+            + [column.tobytes() for column in columns]
+        )
+        return self.FORMAT_MAGIC + zlib.compress(body)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "LineupTable":
+        """Load a table written by ``to_bytes`` and rebuild its indexes."""
+        if not data.startswith(cls.FORMAT_MAGIC):
+            raise ValueError("Not a serialized LineupTable")
+        body = zlib.decompress(data[len(cls.FORMAT_MAGIC) :])
+        (header_length,) = struct.unpack_from("<I", body)
+        offset = 4 + header_length
+        header = json.loads(body[4:offset])
+
+        table = cls()
+        table._strings = header["strings"]
+        table._codes = {value: code for code, value in enumerate(table._strings)}
+        for name, (typecode, length) in zip(cls.COLUMNS, header["columns"]):
+            column = array(typecode)
+            size = column.itemsize * length
+            column.frombytes(body[offset : offset + size])
+            if sys.byteorder == "big":
+                column.byteswap()
+            setattr(table, name, column)
+            offset += size
+
+        for row, date_code in enumerate(table.dates):
+            table._by_date.setdefault(date_code, array("I")).append(row)
+            start, end = table.performer_offsets[row], table.performer_offsets[row + 1]
+            for code in table.performers[start:end]:
+                key = table._code(normalize_name(table._strings[code]))
+                rows = table._by_performer.setdefault(key, array("I"))
+                if not rows or rows[-1] != row:
+                    rows.append(row)
+        return table
+
+    def performer_names(self) -> List[str]:
+        """Distinct performer names as first seen, for matching each name once."""
+        seen = set()
+        names = []
+        for code in self.performers:
+            if code not in seen:
+                seen.add(code)
+                names.append(self._strings[code])
+        return names
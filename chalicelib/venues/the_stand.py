@@ -1,19 +1,63 @@
-import requests
-from bs4 import BeautifulSoup
-from typing import List, Dict, Optional
-from datetime import datetime
-from .base import VenueBot, Show
+import re
+import threading
+import time
+from typing import TYPE_CHECKING, List, Dict, Any, Optional
+from datetime import datetime, date as date_type, timedelta
+from urllib.parse import urljoin
+from .base import TIME_PATTERN, VenueBot, Show
+from .lineup_table import LineupTable
+from ..config import Config
+from ..extraction_cache import ExtractionCache
+from ..html_compactor import HtmlCompactor
+from ..html_parser import make_strainer, parse_html
+from ..http_client import HttpClient
 from ..llm_extractor import LLMExtractor
+from ..metrics import metrics
+from ..show_schema import MORE_PATTERN
+
+if TYPE_CHECKING:
+    from bs4 import Tag
 
 
 class TheStandBot(VenueBot):
-    """Venue bot for The Stand NYC using LLM-based extraction."""
+    """
+    Venue bot for The Stand NYC.
+
+    Show cards are parsed with CSS selectors where possible; cards the
+    structural parser cannot confidently read are extracted with the LLM.
+    """
+
+    # Links to individual show pages, used to find the show cards
+    SHOW_LINK_PATTERN = re.compile(r"/shows?/[^/?#]+")
+
+    # Selectors for the structural card parser
+    COMEDIAN_SELECTOR = ".comedian, .comedians li, .performer, .lineup li, .talent"
+    ROOM_SELECTOR = ".room, .venue-room, .location"
+
+    DATE_PATTERN = re.compile(
+        r"\b(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\.?\s+(\d{1,2})"
+        r"(?:st|nd|rd|th)?(?:,?\s+(\d{4}))?\b",
+        re.IGNORECASE,
+    )
+
+    # Every date is served from one cached calendar, so extra workers only wait
+    max_concurrency = 1
+    splits_by_date = False
+
+    # Reload the calendar after this long, so warm containers polling
+    # frequently still see lineup changes
+    CALENDAR_TTL_SECONDS = 15 * 60
 
-    def __init__(self):
-        super().__init__("The Stand NYC")
+    def __init__(self, http_client: Optional[HttpClient] = None):
+        super().__init__("The Stand NYC", http_client=http_client)
         self.shows_url = "https://thestandnyc.com/shows"
-        self.llm_extractor = LLMExtractor()
+        self.llm_extractor = LLMExtractor(cache=ExtractionCache.from_config())
+        self.compactor = HtmlCompactor(text_mode=Config.HTML_COMPACT_TEXT_MODE)
         self._cache: Optional[List[Dict]] = None
+        self._table: Optional[LineupTable] = None
+        self._loaded_at = 0.0
+        self._cache_lock = threading.Lock()
+        self.extraction_stats: Dict[str, Optional[int]] = {}
         self.headers = {
             "user-agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36"
         }
@@ -21,49 +65,126 @@ class TheStandBot(VenueBot):
     def get_venue_identifier(self) -> str:
         return "the_stand_nyc"
 
-    def fetch_lineup(self, date: str = "today") -> List[Show]:
+    def show_link(self, show: Show) -> str:
+        return urljoin(self.shows_url, show.show_url) if show.show_url else ""
+
+    def fetch_lineup(
+        self, date: str = "today", deadline: Optional[float] = None
+    ) -> List[Show]:
         """
         Fetch The Stand NYC lineup for a given date.
 
         Args:
             date: Date string in format used by the service (e.g., "2025-09-29")
+            deadline: Optional ``time.monotonic()`` timestamp for loading the calendar
 
         Returns:
             List of Show objects for the specified date
         """
-        # Lazy load and cache all shows on first call
-        if self._cache is None:
-            self._load_and_cache_shows()
+        # Handle "today" date
+        if date == "today":
+            date = datetime.now().strftime("%Y-%m-%d")
+
+        return self._get_table(deadline).shows_by_date([date])[date]
+
+    def fetch_lineup_range(
+        self, dates: List[str], deadline: Optional[float] = None
+    ) -> Dict[str, List[Show]]:
+        """
+        Fetch The Stand NYC lineups for several dates from the cached calendar.
+
+        The calendar is loaded into a LineupTable once, so each date is an
+        index lookup rather than a scan of every cached show.
+        """
+        return self._get_table(deadline).shows_by_date(dates)
 
-        # Filter cached shows by date
-        return self._filter_shows_by_date(date)
+    def _get_table(self, deadline: Optional[float] = None) -> LineupTable:
+        """Load the calendar on first call or once stale, and return it as a table."""
+        if self._table is None or self._is_stale():
+            with self._cache_lock:
+                if self._table is None or self._is_stale():
+                    if self._cache is None or self._is_stale():
+                        self._call(self._load_and_cache_shows, deadline)
+                        self._loaded_at = time.monotonic()
+                    self._table = LineupTable(
+                        self._build_show(show_data) for show_data in self._cache
+                    )
+        return self._table
+
+    def _is_stale(self) -> bool:
+        return time.monotonic() - self._loaded_at > self.CALENDAR_TTL_SECONDS
+
+    def _load_and_cache_shows(self, deadline: Optional[float] = None):
+        """
+        Fetch HTML, parse or LLM-extract the show cards, and cache results.
 
-    def _load_and_cache_shows(self):
-        """Fetch HTML, preprocess it, extract shows with LLM, and cache results."""
+        Errors are raised rather than cached as an empty calendar, so a
+        failed load is not mistaken for a week without shows.
+        """
+        venue_id = self.get_venue_identifier()
+        self.llm_extractor.reset_tier_stats()
         try:
             # Fetch the shows page
-            response = requests.get(self.shows_url, headers=self.headers, timeout=10)
-            response.raise_for_status()
+            with metrics.span("Fetch", Venue=venue_id):
+                response = self.http.get(
+                    self.shows_url, headers=self.headers, deadline=deadline
+                )
+                response.raise_for_status()
+
+            with metrics.span("Parse", Venue=venue_id):
+                # Preprocess HTML with BeautifulSoup and find the show cards
+                main_content = self._extract_main_content(response.text)
+                cards = self._find_show_cards(main_content)
+
+                # Parse recognizable cards directly and leave the rest to the LLM
+                parsed, unparsed = [], []
+                for card in cards:
+                    show_data = self._parse_card(card)
+                    if show_data is not None:
+                        parsed.append(show_data)
+                    else:
+                        unparsed.append(card)
+
+            if not cards:
+                llm_shows = self._extract_with_llm([str(main_content)])
+            elif unparsed:
+                llm_shows = self._extract_with_llm(
+                    self._chunk_cards(unparsed, Config.STAND_CARDS_PER_CHUNK)
+                )
+            else:
+                llm_shows = []
 
-            # Preprocess HTML with BeautifulSoup
-            cleaned_html = self._preprocess_html(response.text)
+            self.extraction_stats = {
+                "cards": len(cards),
+                "structural": len(parsed),
+                "llm": len(unparsed) if cards else None,
+            }
+            print(f"{self.name} extraction stats: {self.extraction_stats}")
+            if llm_shows or unparsed or not cards:
+                print(f"{self.name} LLM tier stats: {self.llm_extractor.tier_stats}")
 
-            # Extract shows using LLM
-            self._cache = self.llm_extractor.extract_shows(cleaned_html, self.name)
+            if self.llm_extractor.cache is not None:
+                # Once per load, since eviction lists every entry
+                try:
+                    self.llm_extractor.cache.evict()
+                except Exception as e:
+                    print(f"Error evicting extraction cache entries: {e}")
+
+            self._cache = parsed + llm_shows
+            metrics.count("Shows", len(self._cache), Venue=venue_id)
 
             print(f"Cached {len(self._cache)} shows from {self.name}")
 
         except Exception as e:
             print(f"Error loading shows from {self.name}: {e}")
-            self._cache = []
-
-    def _preprocess_html(self, html: str) -> str:
-        """
-        Clean HTML to keep only relevant show information.
+            raise
 
-        Removes navigation, footer, scripts, styles while preserving show cards.
-        """
-        soup = BeautifulSoup(html, "html.parser")
+    def _extract_main_content(self, html: str) -> "Tag":
+        """Parse the page, drop boilerplate tags and return the main content."""
+        # Only build the <main> subtree when the page has one
+        soup = parse_html(html, parse_only=make_strainer("main"))
+        if soup.find("main") is None:
+            soup = parse_html(html)
 
         # Remove unnecessary elements
         for tag in soup(["script", "style", "nav", "footer", "header"]):
@@ -71,49 +192,135 @@ class TheStandBot(VenueBot):
 
         # Try to find main content area (adjust selectors based on actual HTML structure)
         # If specific container exists, extract only that
-        main_content = soup.find("main") or soup.find("div", class_="shows") or soup
+        return soup.find("main") or soup.find("div", class_="shows") or soup
 
-        return str(main_content)
+    def _find_show_cards(self, content: "Tag") -> List["Tag"]:
+        """
+        Find the show card elements in document order.
 
-    def _filter_shows_by_date(self, date: str) -> List[Show]:
+        A card is the largest element around a show link that does not also
+        contain links to other shows.
         """
-        Filter cached shows by date and convert to Show objects.
+        links = []
+        # id(element) -> distinct show paths linked from within it
+        hrefs_within: Dict[int, set] = {}
+        for link in content.find_all("a", href=self.SHOW_LINK_PATTERN):
+            show_href = self.SHOW_LINK_PATTERN.search(link["href"]).group(0)
+            links.append((link, show_href))
+            for ancestor in link.parents:
+                if ancestor is content:
+                    break
+                hrefs_within.setdefault(id(ancestor), set()).add(show_href)
 
-        Args:
-            date: Date string to filter by (YYYY-MM-DD format or "today")
+        cards = []
+        seen = set()
+        for link, show_href in links:
+            card = link
+            while card.parent is not None and card.parent is not content:
+                if hrefs_within[id(card.parent)] != {show_href}:
+                    break
+                card = card.parent
+
+            if id(card) not in seen:
+                seen.add(id(card))
+                cards.append(card)
+        return cards
+
+    def _chunk_cards(self, cards: List["Tag"], cards_per_chunk: int) -> List[str]:
+        """Join cards into HTML batches of at most cards_per_chunk cards."""
+        return [
+            "".join(str(card) for card in cards[i : i + cards_per_chunk])
+            for i in range(0, len(cards), cards_per_chunk)
+        ]
+
+    def _extract_with_llm(self, chunks: List[str]) -> List[Dict[str, Any]]:
+        """Compact HTML batches and extract their shows with the LLM."""
+        chunks = [result.html for result in self.compactor.compact_all(chunks)]
+
+        # One call per batch when the page is split
+        if len(chunks) > 1:
+            return self.llm_extractor.extract_shows_chunked(
+                chunks, self.name, max_workers=Config.LLM_MAX_WORKERS
+            )
+        return self.llm_extractor.extract_shows(chunks[0], self.name)
+
+    def _parse_card(self, card: "Tag") -> Optional[Dict[str, Any]]:
+        """
+        Parse a show card with selectors and patterns.
 
         Returns:
-            List of Show objects for the specified date
+            A show dictionary in the same shape LLMExtractor produces, or None
+            unless the card has exactly one date, one time and at least one
+            named comedian
         """
-        if not self._cache:
-            return []
+        text = card.get_text(" ", strip=True)
+        dates = {match.groups() for match in self.DATE_PATTERN.finditer(text)}
+        times = {match.groups() for match in TIME_PATTERN.finditer(text)}
+        if len(dates) != 1 or len(times) != 1:
+            return None
 
-        # Handle "today" date
-        if date == "today":
-            date = datetime.now().strftime("%Y-%m-%d")
+        comedians = []
+        for element in card.select(self.COMEDIAN_SELECTOR):
+            name = element.get_text(" ", strip=True)
+            if name and not MORE_PATTERN.match(name):
+                comedians.append(name)
+        if not comedians:
+            return None
 
-        shows = []
-        for show_data in self._cache:
-            if show_data.get("date") == date:
-                # Build time_and_venue string
-                time = show_data.get("time", "")
-                venue_location = show_data.get("venue_location", "")
-
-                if venue_location:
-                    time_and_venue = f"{time} - {self.name} ({venue_location})"
-                else:
-                    time_and_venue = f"{time} - {self.name}"
-
-                shows.append(
-                    Show(
-                        time_and_venue=time_and_venue,
-                        comedians=show_data.get("comedians", []),
-                        date=date,
-                        raw_data={
-                            "venue": self.name,
-                            "show_url": show_data.get("show_url", ""),
-                        },
-                    )
-                )
+        show_date = self._resolve_date(*dates.pop())
+        if show_date is None:
+            return None
+
+        hour, minute, meridiem = times.pop()
+        # Sibling show links make each <a> its own card
+        if card.name == "a":
+            link = card
+        else:
+            link = card.find("a", href=self.SHOW_LINK_PATTERN)
+        room = card.select_one(self.ROOM_SELECTOR)
+        show_url = ""
+        if link is not None:
+            show_url = self.SHOW_LINK_PATTERN.search(link["href"]).group(0)
+
+        return {
+            "date": show_date,
+            "time": f"{int(hour)}:{minute} {meridiem.upper()}M",
+            "venue_location": room.get_text(" ", strip=True) if room else "",
+            "comedians": comedians,
+            "show_url": show_url,
+        }
+
+    def _resolve_date(self, month: str, day: str, year: Optional[str]) -> Optional[str]:
+        """Turn a matched month/day/year into YYYY-MM-DD, inferring a missing year."""
+        month_number = datetime.strptime(month[:3].title(), "%b").month
+        today = datetime.now().date()
+        try:
+            if year:
+                return date_type(int(year), month_number, int(day)).isoformat()
+
+            # Listings only show upcoming dates, so one well in the past is next year's
+            candidate = date_type(today.year, month_number, int(day))
+            if candidate < today - timedelta(days=7):
+                candidate = date_type(today.year + 1, month_number, int(day))
+            return candidate.isoformat()
+        except ValueError:
+            return None
+
+    def _build_show(self, show_data: Dict[str, Any]) -> Show:
+        """Convert an extracted show dictionary into a Show object."""
+        time = show_data.get("time", "")
+        venue_location = show_data.get("venue_location", "")
+
+        if venue_location:
+            time_and_venue = f"{time} - {self.name} ({venue_location})"
+        else:
+            time_and_venue = f"{time} - {self.name}"
 
-        return shows
\ No newline at end of file
+        return Show(
+            time_and_venue=time_and_venue,
+            comedians=show_data.get("comedians", []),
+            date=show_data.get("date", ""),
+            venue=self.name,
+            room=venue_location,
+            show_url=show_data.get("show_url", ""),
+        )
@@ -0,0 +1,49 @@
+from typing import List, Optional
+
+import pytest
+
+from chalicelib.config import Config
+from chalicelib.email_service import EmailService
+from chalicelib.venues.base import Show, VenueBot
+
+
+class StaticVenue(VenueBot):
+    """Venue with a fixed lineup on every date."""
+
+    def __init__(self, name: str, comedians: List[str]):
+        super().__init__(name, http_client=object())
+        self.comedians = comedians
+
+    def fetch_lineup(self, date: str, deadline: Optional[float] = None) -> List[Show]:
+        return [Show("8:00 PM", self.comedians, date, venue=self.name)]
+
+    def get_venue_identifier(self) -> str:
+        return self.name.lower().replace(" ", "_")
+
+
+class FlakyEmailService(EmailService):
+    """Records sends; fails every send while ``failing`` is set."""
+
+    def __init__(self):
+        super().__init__(ses_client=object())
+        self.failing = False
+        self.sent = []
+
+    def send_email(self, subject, body, to_address, from_address, html_body=None):
+        if self.failing:
+            raise RuntimeError("SES is down")
+        self.sent.append(subject)
+        return {"MessageId": "id"}
+
+    def send_bulk_digests(self, messages, from_address, rate_limiter=None):
+        if not self.failing:
+            self.sent.extend(message["to"] for message in messages)
+        status = "Failed" if self.failing else "Success"
+        return [{"Status": status} for _ in messages]
+
+
+@pytest.fixture
+def delta_config(monkeypatch):
+    monkeypatch.setattr(Config, "ALERT_MODE", "delta")
+    monkeypatch.setattr(Config, "FAVORITE_COMEDIANS", ["Mark Normand"])
+    monkeypatch.setattr(Config, "LOOKAHEAD_DAYS", 2)
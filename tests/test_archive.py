@@ -0,0 +1,103 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from benchmarks.fake_aws import InMemoryS3Client
+from chalicelib.archive import LocalArchiveBackend, S3ArchiveBackend, ShowArchive
+from chalicelib.venues import Show
+
+
+class Clock:
+    def __init__(self):
+        self.now = datetime(2025, 10, 17, 13, tzinfo=timezone.utc).timestamp()
+
+    def __call__(self):
+        return self.now
+
+
+def show(date, comedians, venue="Comedy Cellar", label="8:00 PM MacDougal Street"):
+    return Show(label, comedians, date, venue=venue)
+
+
+@pytest.fixture(params=["local", "s3"])
+def archive(request, tmp_path):
+    if request.param == "local":
+        backend = LocalArchiveBackend(str(tmp_path))
+    else:
+        backend = S3ArchiveBackend("archive", s3_client=InMemoryS3Client())
+    return ShowArchive(backend, clock=Clock())
+
+
+def append_runs(archive):
+    """Three runs over two months; the second changes a lineup, the third adds one."""
+    archive.append(
+        [show("2025-10-20", ["Mark Normand"]), show("2025-11-02", ["Sam Morril"])],
+        source="comedy_cellar",
+    )
+    archive.clock.now += 86400
+    archive.append(
+        [
+            show("2025-10-20", ["Mark Normand", "Jessica Kirson"]),
+            show("2025-11-02", ["Sam Morril"]),
+        ],
+        source="comedy_cellar",
+    )
+    archive.clock.now += 86400
+    archive.append([show("2025-10-21", ["Mark Normand"], venue="The Stand")], source="the_stand")
+
+
+def test_round_trip_and_latest_lineups(archive):
+    append_runs(archive)
+
+    assert archive.months() == ["2025-10", "2025-11"]
+    latest = list(archive.scan("2025-10-01", "2025-10-31"))
+    assert [(s.date, s.venue, s.comedians) for s in latest] == [
+        ("2025-10-20", "Comedy Cellar", ("Mark Normand", "Jessica Kirson")),
+        ("2025-10-21", "The Stand", ("Mark Normand",)),
+    ]
+    assert len(list(archive.scan(latest_only=False))) == 5
+    assert [s.date for s in archive.scan(comedians=["sam morril"])] == ["2025-11-02"]
+    assert [s.venue for s in archive.scan(venue="The Stand")] == ["The Stand"]
+
+
+def test_comedian_index_queries(archive):
+    append_runs(archive)
+
+    assert archive.appearances("Mark Normand") == [
+        ("Comedy Cellar", "2025-10-20"),
+        ("The Stand", "2025-10-21"),
+    ]
+    assert archive.last_appearance("Mark Normand", venue="Comedy Cellar") == (
+        "Comedy Cellar",
+        "2025-10-20",
+    )
+    assert archive.last_appearance("Nobody") is None
+
+
+def test_compaction_keeps_every_runs_lineups(archive):
+    append_runs(archive)
+    history = [repr(s) for s in archive.scan(latest_only=False)]
+    latest = [repr(s) for s in archive.scan()]
+    appearances = archive.appearances("Mark Normand")
+
+    assert archive.compact(before="2025-12") == 2
+    keys = archive.backend.list(f"{ShowArchive.SEGMENTS}2025-10/")
+    assert len(keys) == 1 and keys[0].endswith("-compacted.seg")
+    assert [repr(s) for s in archive.scan(latest_only=False)] == history
+    assert [repr(s) for s in archive.scan()] == latest
+    assert archive.appearances("Mark Normand") == appearances
+
+    # Runs appended after compaction still win, and a second compaction
+    # folds them into the pack
+    archive.clock.now += 86400
+    archive.append([show("2025-10-20", ["Sam Morril"])], source="comedy_cellar")
+    only_date = ("2025-10-20", "2025-10-20")
+    assert [s.comedians for s in archive.scan(*only_date)] == [("Sam Morril",)]
+    assert archive.compact(before="2025-12") == 1
+    assert [s.comedians for s in archive.scan(*only_date)] == [("Sam Morril",)]
+    assert len(list(archive.scan(*only_date, latest_only=False))) == 3
+
+
+def test_current_month_is_not_compacted(archive):
+    append_runs(archive)
+    assert archive.compact() == 0
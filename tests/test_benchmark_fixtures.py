@@ -0,0 +1,30 @@
+import json
+import os
+from datetime import date
+
+from benchmarks import synthetic
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "..", "benchmarks", "fixtures")
+
+
+def load(name):
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as f:
+        return f.read()
+
+
+def test_fixtures_match_their_generators():
+    manifest = json.loads(load("manifest.json"))
+    assert manifest["synthetic"] is True
+    start = date.fromisoformat(manifest["start_date"])
+
+    cellar = json.loads(load(manifest["cellar"]))
+    assert cellar["show"]["date"] == manifest["start_date"]
+    assert cellar["show"]["html"] == synthetic.cellar_lineup_html(shows=8, seed=0)
+    assert load(manifest["stand"]) == synthetic.stand_shows_html(cards=63, seed=0, start=start)
+
+    shows = json.loads(load(manifest["bedrock_stand"]))
+    assert [show["show_url"] for show in shows] == [f"/shows/show-{i}" for i in range(4, 63, 5)]
+
+    events = json.loads(load(manifest["bedrock_stand_stream"]))
+    text = "".join(e["delta"]["text"] for e in events if e["type"] == "content_block_delta")
+    assert json.loads(text.strip().strip("`").removeprefix("json")) == shows
@@ -0,0 +1,97 @@
+import threading
+import time
+
+from chalicelib.bot_service import ComedyBotService
+from chalicelib.state_store import SQLiteStateStore
+from chalicelib.subscribers import Subscriber, SubscriberRegistry
+from chalicelib.utils import get_next_days
+from tests.conftest import FlakyEmailService, StaticVenue
+
+
+def run(service):
+    service.send_comedy_alerts(service.check_all_venues())
+
+
+def test_failed_venue_alert_is_not_committed(delta_config):
+    store = SQLiteStateStore(":memory:")
+    email = FlakyEmailService()
+    venue = StaticVenue("Test Club", ["Mark Normand"])
+
+    email.failing = True
+    run(ComedyBotService([venue], email, state_store=store))
+    assert email.sent == []
+    assert store.get("lineup:test_club") is None
+
+    email.failing = False
+    run(ComedyBotService([venue], email, state_store=store))
+    assert len(email.sent) == 1
+    assert store.get("lineup:test_club") is not None
+
+    # Nothing changed since the alert went out
+    run(ComedyBotService([venue], email, state_store=store))
+    assert len(email.sent) == 1
+
+
+def test_failed_digest_is_retried_next_run(delta_config):
+    store = SQLiteStateStore(":memory:")
+    email = FlakyEmailService()
+    registry = SubscriberRegistry(
+        [Subscriber("a", "a@example.com", ["Mark Normand"])]
+    )
+    venue = StaticVenue("Test Club", ["Mark Normand"])
+
+    email.failing = True
+    service = ComedyBotService([venue], email, state_store=store, subscribers=registry)
+    run(service)
+    outbox = store.get(ComedyBotService.OUTBOX_KEY)
+    assert set(outbox["digests"]["a"]["Test Club"]) == set(get_next_days(2))
+
+    # The lineup is unchanged, so only the outbox has anything to send
+    email.failing = False
+    run(ComedyBotService([venue], email, state_store=store, subscribers=registry))
+    assert email.sent == ["a@example.com"]
+    assert store.get(ComedyBotService.OUTBOX_KEY) is None
+
+
+class StuckVenue(StaticVenue):
+    """Loads its calendar in one request that ignores the deadline until released."""
+
+    def __init__(self, name, comedians):
+        super().__init__(name, comedians)
+        self.release = threading.Event()
+        self.thread = None
+
+    def fetch_lineup_range(self, dates, deadline=None):
+        self.thread = threading.current_thread()
+        self.release.wait(timeout=5)
+        return super().fetch_lineup_range(dates)
+
+
+def test_venue_past_the_deadline_is_dropped_and_stages_nothing(delta_config):
+    store = SQLiteStateStore(":memory:")
+    email = FlakyEmailService()
+    stuck = StuckVenue("Stuck Club", ["Mark Normand"])
+    service = ComedyBotService(
+        [StaticVenue("Test Club", ["Mark Normand"]), stuck], email, state_store=store
+    )
+    service.COLLECT_GRACE_SECONDS = 0
+
+    results = service.check_all_venues(deadline=time.monotonic() + 0.2)
+    assert set(results) == {"Test Club"}
+    assert service.degraded_venues == {"Stuck Club": "timed out"}
+    assert service.pending_work == {"stuck_club": get_next_days(2)}
+    service.send_comedy_alerts(results)
+
+    # The venue's thread finishes after the run and must not leave state
+    # behind for the next warm invocation to commit
+    stuck.release.set()
+    stuck.thread.join(timeout=5)
+    service.send_comedy_alerts({})
+    assert store.get("lineup:test_club") is not None
+    assert store.get("lineup:stuck_club") is None
+    assert store.get("poll:stuck_club") is None
+
+    # The next run checks the venue from scratch and alerts on it
+    run(service)
+    assert store.get("lineup:stuck_club") is not None
+    assert email.sent[-1] == "Stuck Club Comedy Alert - Your Favorite Comedians!"
@@ -0,0 +1,98 @@
+from chalicelib.change_detection import LineupTracker
+from chalicelib.state_store import SQLiteStateStore
+from chalicelib.utils import get_next_days
+from chalicelib.venues import Show
+
+DAY, OTHER_DAY = get_next_days(2)
+
+
+def lineup(*shows, date=DAY):
+    return {date: [Show(label, comedians, date) for label, comedians in shows]}
+
+
+def tracker_with(*shows):
+    """A tracker whose committed state is the given shows on DAY."""
+    tracker = LineupTracker(SQLiteStateStore(":memory:"))
+    tracker.diff("club", lineup(*shows))
+    tracker.commit()
+    return tracker
+
+
+def test_first_run_reports_every_show_as_new():
+    tracker = LineupTracker(SQLiteStateStore(":memory:"))
+    diff = tracker.diff("club", lineup(("8:00 PM", ["Mark Normand"])))
+
+    assert [show.comedians for show in diff.added[DAY]] == [("Mark Normand",)]
+    assert diff.summary() == {
+        "added_shows": 1,
+        "removed_shows": 0,
+        "changed_shows": 0,
+        "unchanged_dates": 0,
+    }
+
+
+def test_unchanged_lineup_has_no_changes():
+    tracker = tracker_with(("8:00 PM", ["Mark Normand", "Sam Morril"]))
+    diff = tracker.diff("club", lineup(("8:00 PM", ["Mark Normand", "Sam Morril"])))
+
+    assert diff.unchanged_dates == [DAY]
+    assert diff.changed_shows(DAY) == []
+
+
+def test_new_and_removed_shows():
+    tracker = tracker_with(("8:00 PM", ["Mark Normand"]), ("10:00 PM", ["Sam Morril"]))
+    diff = tracker.diff(
+        "club", lineup(("8:00 PM", ["Mark Normand"]), ("11:30 PM", ["Joe List"]))
+    )
+
+    assert [show.time_and_venue for show in diff.added[DAY]] == ["11:30 PM"]
+    assert diff.removed == {DAY: ["10:00 PM"]}
+    assert [show.comedians for show in diff.changed_shows(DAY)] == [("Joe List",)]
+
+
+def test_changed_lineup_reports_added_and_removed_performers():
+    tracker = tracker_with(("8:00 PM", ["Mark Normand", "Sam Morril"]))
+    diff = tracker.diff("club", lineup(("8:00 PM", ["Mark Normand", "Joe List"])))
+
+    assert diff.added_performers == {DAY: {"8:00 PM": ["Joe List"]}}
+    assert diff.removed_performers == {DAY: {"8:00 PM": ["Sam Morril"]}}
+    assert diff.summary()["changed_shows"] == 1
+    # Only the newly added performer is matched again
+    changed = diff.changed_shows(DAY)
+    assert [(show.time_and_venue, show.comedians) for show in changed] == [
+        ("8:00 PM", ("Joe List",))
+    ]
+
+
+def test_performer_names_are_compared_normalized():
+    tracker = tracker_with(("8:00 PM", ["Mark Normand"]))
+    diff = tracker.diff("club", lineup(("8:00 PM", ["mark  NORMAND"])))
+
+    assert diff.added_performers == {}
+    assert diff.removed_performers == {}
+
+
+def test_dates_missing_from_a_fetch_keep_their_state():
+    tracker = LineupTracker(SQLiteStateStore(":memory:"))
+    shows = lineup(("8:00 PM", ["Mark Normand"]))
+    shows.update(lineup(("9:00 PM", ["Sam Morril"]), date=OTHER_DAY))
+    tracker.diff("club", shows)
+    tracker.commit()
+
+    # The second date failed to fetch, so it is neither diffed nor forgotten
+    diff = tracker.diff("club", lineup(("8:00 PM", ["Mark Normand"])))
+    tracker.commit()
+    assert diff.removed == {}
+    diff = tracker.diff("club", lineup(("9:00 PM", ["Sam Morril"]), date=OTHER_DAY))
+    assert diff.unchanged_dates == [OTHER_DAY]
+
+
+def test_state_is_only_saved_by_commit():
+    tracker = LineupTracker(SQLiteStateStore(":memory:"))
+    tracker.diff("club", lineup(("8:00 PM", ["Mark Normand"])))
+    tracker.discard("club")
+    tracker.commit()
+
+    diff = tracker.diff("club", lineup(("8:00 PM", ["Mark Normand"])))
+    assert diff.unchanged_dates == []
+    assert len(diff.added[DAY]) == 1
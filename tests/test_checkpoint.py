@@ -0,0 +1,145 @@
+import time
+
+import pytest
+
+from benchmarks.fake_aws import InMemoryDynamoDBClient
+from chalicelib.bot_service import ComedyBotService
+from chalicelib.checkpoint import RunCheckpoint
+from chalicelib.circuit_breaker import CircuitBreaker
+from chalicelib.config import Config
+from chalicelib.state_store import DynamoDBStateStore
+from chalicelib.utils import get_next_days
+from tests.conftest import FlakyEmailService, StaticVenue
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+class RecordingVenue(StaticVenue):
+    """Records the dates each check asks for, fetching one date at a time."""
+
+    max_concurrency = 1
+
+    def __init__(self, name, comedians, delay=0.0):
+        super().__init__(name, comedians)
+        self.delay = delay
+        self.requested = []
+
+    def fetch_lineup(self, date, deadline=None):
+        time.sleep(self.delay)
+        return super().fetch_lineup(date, deadline)
+
+    def fetch_lineup_range(self, dates, deadline=None):
+        self.requested.append(list(dates))
+        return super().fetch_lineup_range(dates, deadline=deadline)
+
+
+class BrokenVenue(RecordingVenue):
+    def fetch_lineup_range(self, dates, deadline=None):
+        self.requested.append(list(dates))
+        raise RuntimeError("venue is down")
+
+
+@pytest.fixture
+def store(monkeypatch):
+    monkeypatch.setattr(Config, "STATE_STORE_BACKEND", "dynamodb")
+    monkeypatch.setattr(Config, "FAVORITE_COMEDIANS", ["Mark Normand"])
+    monkeypatch.setattr(Config, "LOOKAHEAD_DAYS", 3)
+    return DynamoDBStateStore("state", dynamodb_client=InMemoryDynamoDBClient())
+
+
+def test_save_and_load_round_trip(store):
+    clock = Clock()
+    checkpoint = RunCheckpoint(store, clock=clock)
+    checkpoint.save({"test_club": ["2025-10-18"]})
+
+    saved = checkpoint.load()
+    assert saved == {
+        "pending": {"test_club": ["2025-10-18"]},
+        "resumes": 0,
+        "created_at": clock.now,
+    }
+
+    clock.now += 60
+    checkpoint.save({"test_club": ["2025-10-19"]}, saved)
+    assert checkpoint.load()["resumes"] == 1
+    assert checkpoint.load()["created_at"] == saved["created_at"]
+
+
+def test_stale_checkpoint_is_ignored_and_cleared(store):
+    clock = Clock()
+    checkpoint = RunCheckpoint(store, max_age_seconds=3600, clock=clock)
+    checkpoint.save({"test_club": ["2025-10-18"]})
+
+    clock.now += 3601
+    assert checkpoint.load() is None
+    assert store.get(RunCheckpoint.KEY) is None
+
+
+def test_work_still_pending_after_max_resumes_is_dropped(store):
+    checkpoint = RunCheckpoint(store, max_resumes=1)
+    checkpoint.save({"test_club": ["2025-10-18"]})
+    checkpoint.save({"test_club": ["2025-10-18"]}, checkpoint.load())
+    assert checkpoint.load()["resumes"] == 1
+
+    checkpoint.save({"test_club": ["2025-10-18"]}, checkpoint.load())
+    assert checkpoint.load() is None
+
+
+def test_checkpoint_needs_a_shared_store(store, monkeypatch):
+    monkeypatch.setattr(Config, "STATE_STORE_BACKEND", "sqlite")
+    assert RunCheckpoint.from_config(store) is None
+
+
+def test_deadline_work_is_resumed_by_the_next_run(store):
+    venue = RecordingVenue("Test Club", ["Mark Normand"], delay=0.2)
+    service = ComedyBotService([venue], FlakyEmailService(), state_store=store)
+    service.check_all_venues(deadline=time.monotonic() + 0.3)
+    later = get_next_days(3)[1:]
+    assert service.pending_work == {"test_club": later}
+    assert store.get(RunCheckpoint.KEY)["pending"] == {"test_club": later}
+
+    venue.delay = 0.0
+    resumed = ComedyBotService([venue], FlakyEmailService(), state_store=store)
+    results = resumed.check_all_venues()
+
+    assert resumed.resumed_run
+    assert venue.requested[-1] == later
+    assert set(results["Test Club"]) == set(later)
+    assert resumed.pending_work == {}
+    assert store.get(RunCheckpoint.KEY) is None
+
+
+@pytest.mark.parametrize("failure", ["error", "circuit open"])
+def test_resumed_run_keeps_the_dates_of_failed_venues(store, failure):
+    dates = get_next_days(3)
+    RunCheckpoint(store).save({"test_club": dates})
+    if failure == "error":
+        venue = BrokenVenue("Test Club", ["Mark Normand"])
+    else:
+        venue = RecordingVenue("Test Club", ["Mark Normand"])
+        store.put(
+            CircuitBreaker.KEY_PREFIX + "test_club",
+            {
+                "state": CircuitBreaker.OPEN,
+                "failures": 3,
+                "trips": 1,
+                "retry_at": time.time() + 600,
+            },
+        )
+
+    service = ComedyBotService([venue], FlakyEmailService(), state_store=store)
+    service.check_all_venues()
+
+    assert service.degraded_venues["Test Club"] == (
+        "venue is down" if failure == "error" else "circuit open"
+    )
+    assert service.pending_work == {"test_club": dates}
+    saved = store.get(RunCheckpoint.KEY)
+    assert saved["pending"] == {"test_club": dates}
+    assert saved["resumes"] == 1
@@ -0,0 +1,124 @@
+import pytest
+import requests
+
+from chalicelib.circuit_breaker import CircuitBreaker, CircuitOpenError
+from chalicelib.state_store import SQLiteStateStore
+from chalicelib.utils import DeadlineExceeded
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_breaker(store=None, clock=None):
+    return CircuitBreaker(
+        "test_club",
+        store,
+        failure_threshold=3,
+        cooldown_seconds=60,
+        max_cooldown_seconds=600,
+        clock=clock or Clock(),
+    )
+
+
+def fail(error=None):
+    def fn():
+        raise error or requests.ConnectionError("refused")
+
+    return fn
+
+
+def trip(breaker):
+    for _ in range(breaker.failure_threshold):
+        with pytest.raises(requests.ConnectionError):
+            breaker.call(fail())
+
+
+def test_threshold_failures_open_the_circuit():
+    breaker = make_breaker()
+    for _ in range(2):
+        with pytest.raises(requests.ConnectionError):
+            breaker.call(fail())
+    assert breaker.state == CircuitBreaker.CLOSED
+
+    with pytest.raises(requests.ConnectionError):
+        breaker.call(fail())
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.call(lambda: "shows")
+
+
+def test_cooldown_half_opens_and_a_probe_closes():
+    clock = Clock()
+    breaker = make_breaker(clock=clock)
+    trip(breaker)
+
+    clock.now += 60
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.call(lambda: "shows") == "shows"
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_failed_probe_reopens_for_longer():
+    clock = Clock()
+    breaker = make_breaker(clock=clock)
+    trip(breaker)
+
+    clock.now += 60
+    with pytest.raises(requests.ConnectionError):
+        breaker.call(fail())
+    assert breaker.state == CircuitBreaker.OPEN
+
+    # The second cooldown is twice the first
+    clock.now += 60
+    assert breaker.state == CircuitBreaker.OPEN
+    clock.now += 60
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+
+
+def test_state_persists_through_the_store():
+    store = SQLiteStateStore(":memory:")
+    clock = Clock()
+    trip(make_breaker(store, clock))
+
+    breaker = make_breaker(store, clock)
+    breaker.load()
+    assert breaker.state == CircuitBreaker.OPEN
+
+    clock.now += 60
+    breaker.call(lambda: "shows")
+    assert store.get(CircuitBreaker.KEY_PREFIX + "test_club") is None
+
+
+@pytest.mark.parametrize(
+    "error",
+    [
+        DeadlineExceeded("Deadline reached before requesting https://example.com/"),
+        requests.HTTPError(response=type("Response", (), {"status_code": 404})()),
+    ],
+)
+def test_errors_that_are_not_the_venues_do_not_trip(error):
+    store = SQLiteStateStore(":memory:")
+    breaker = make_breaker(store)
+    for _ in range(5):
+        with pytest.raises(type(error)):
+            breaker.call(fail(error))
+
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert store.get(CircuitBreaker.KEY_PREFIX + "test_club") is None
+
+
+def test_deadline_during_a_probe_lets_the_next_call_probe():
+    clock = Clock()
+    breaker = make_breaker(clock=clock)
+    trip(breaker)
+
+    clock.now += 60
+    with pytest.raises(DeadlineExceeded):
+        breaker.call(fail(DeadlineExceeded("Deadline reached")))
+    assert breaker.call(lambda: "shows") == "shows"
+    assert breaker.state == CircuitBreaker.CLOSED
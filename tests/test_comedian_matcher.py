@@ -0,0 +1,63 @@
+import pytest
+
+from chalicelib.comedian_matcher import ComedianMatcher, normalize_name
+
+
+@pytest.mark.parametrize(
+    "name, key",
+    [
+        ("  Chris  D'Elia ", "chris delia"),
+        ("Chris D’Elia", "chris delia"),
+        ("Beyoncé Knowles", "beyonce knowles"),
+        ("SAM MORRIL", "sam morril"),
+        ("Jean-Paul Sartre", "jean paul sartre"),
+        ("", ""),
+    ],
+)
+def test_normalize_name(name, key):
+    assert normalize_name(name) == key
+
+
+def test_exact_matches_report_the_favorite_as_configured():
+    matcher = ComedianMatcher(["Mark Normand", "Chris D'Elia"])
+
+    assert matcher.match("mark normand") == "Mark Normand"
+    assert matcher.match("CHRIS DELIA") == "Chris D'Elia"
+    assert matcher.match("Mark Norman") is None
+
+
+def test_aliases_resolve_to_the_canonical_favorite():
+    matcher = ComedianMatcher(
+        ["Mark Normand"],
+        aliases={"Marky N": "mark  normand", "Someone Else": "Not A Favorite"},
+    )
+
+    assert matcher.match("marky n") == "Mark Normand"
+    assert matcher.match("Someone Else") is None
+
+
+@pytest.mark.parametrize(
+    "cutoff, name, expected",
+    [
+        (None, "Mark Normandd", None),
+        (0.9, "Mark Normandd", "Mark Normand"),
+        (0.9, "Mark Nromand", "Mark Normand"),
+        (0.95, "Mark Nromand", None),
+        # Names whose lengths differ too much are not compared at all
+        (0.5, "Mark Norm", None),
+        (0.75, "Mike Norman", "Mark Normand"),
+        (0.8, "Mike Norman", None),
+        (0.9, "Sam Morril", "Sam Morrill"),
+    ],
+)
+def test_fuzzy_threshold(cutoff, name, expected):
+    matcher = ComedianMatcher(["Mark Normand", "Sam Morrill"], fuzzy_cutoff=cutoff)
+
+    assert matcher.match(name) == expected
+
+
+def test_fuzzy_answers_are_cached():
+    matcher = ComedianMatcher(["Mark Normand"], fuzzy_cutoff=0.9)
+
+    assert matcher.match("Mark Normandd") == "Mark Normand"
+    assert matcher._fuzzy_cache == {"mark normandd": "Mark Normand"}
@@ -0,0 +1,106 @@
+import json
+
+from chalicelib.email_service import EmailService
+from benchmarks.fake_aws import InMemorySESClient
+
+
+class RecordingSESClient(InMemorySESClient):
+    """In-memory SES that also keeps each bulk call's destinations."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.bulk_calls = []
+
+    def send_bulk_templated_email(self, **kwargs):
+        self.bulk_calls.append(kwargs["Destinations"])
+        return super().send_bulk_templated_email(**kwargs)
+
+
+DIGEST = {"Comedy Cellar": {"2025-06-06": {"9:30 PM - MacDougal St": ["Mark Normand"]}}}
+
+
+def digest_messages(email, count):
+    return [
+        {
+            "to": f"sub-{i}@example.com",
+            "html": email.format_digest_sections_html(DIGEST),
+            "text": email.format_digest_sections_text(DIGEST),
+        }
+        for i in range(count)
+    ]
+
+
+def test_batches_fit_a_send_rate_below_the_batch_size():
+    ses = RecordingSESClient(max_send_rate=14)
+    email = EmailService(ses_client=ses)
+
+    statuses = email.send_bulk_digests(digest_messages(email, 20), "bot@example.com")
+
+    assert [s["Status"] for s in statuses] == ["Success"] * 20
+    assert [len(call) for call in ses.bulk_calls] == [14, 6]
+    assert len(ses.sent) == 20
+
+
+def test_layout_is_in_the_template_not_the_destination_data():
+    ses = RecordingSESClient()
+    email = EmailService(ses_client=ses)
+
+    email.send_bulk_digests(digest_messages(email, 1), "bot@example.com")
+
+    template = ses.get_template(TemplateName=email.digest_template_name())["Template"]
+    assert "<style>" in template["HtmlPart"]
+    data = ses.bulk_calls[0][0]["ReplacementTemplateData"]
+    assert "<style>" not in data and "Sent by" not in data
+    assert "Mark Normand" in json.loads(data)["sections"]
+
+    sent = ses.sent[0]
+    assert sent["subject"] == "Comedy Alert - Your Favorite Comedians!"
+    assert sent["html"] == email.format_digest_html(DIGEST)
+    assert sent["text"] == email.format_digest_text(DIGEST)
+
+
+def test_failed_batch_reports_each_message():
+    class FailingSESClient(InMemorySESClient):
+        def send_bulk_templated_email(self, **kwargs):
+            raise RuntimeError("throttled")
+
+    email = EmailService(ses_client=FailingSESClient())
+    statuses = email.send_bulk_digests(digest_messages(email, 3), "bot@example.com")
+    assert [s["Status"] for s in statuses] == ["Failed"] * 3
+
+
+def test_template_renders_escaped_sections_once():
+    ses = RecordingSESClient()
+    email = EmailService(ses_client=ses)
+    digest = {
+        "Bits & <Pieces>": {
+            "2025-06-06": {"9:30 PM - <b>Late</b>": ["<script>alert(1)</script>"]}
+        }
+    }
+    messages = [
+        {
+            "to": "sub@example.com",
+            "html": email.format_digest_sections_html(digest),
+            "text": email.format_digest_sections_text(digest),
+        }
+    ]
+
+    email.send_bulk_digests(messages, "bot@example.com")
+
+    html = ses.sent[0]["html"]
+    assert html == email.format_digest_html(digest)
+    # The sections are inserted unescaped by the template, so every name in
+    # them must already be escaped, and escaped exactly once
+    assert "<script>" not in html and "<b>Late</b>" not in html
+    assert "&lt;script&gt;alert(1)&lt;/script&gt;" in html
+    assert "Bits &amp; &lt;Pieces&gt;" in html
+    assert "&amp;lt;" not in html
+    assert "<script>alert(1)</script>" in ses.sent[0]["text"]
+
+
+def test_alert_styles_are_unchanged_by_the_digest_styles():
+    email = EmailService(ses_client=object())
+    alert = email.format_comedy_alert_html(DIGEST["Comedy Cellar"], "Comedy Cellar")
+
+    assert ".venue-title" not in alert
+    assert ".venue-title" in EmailService.DIGEST_TEMPLATE["HtmlPart"]
@@ -0,0 +1,35 @@
+from chalicelib.extraction_cache import ExtractionCache, S3CacheBackend
+from benchmarks.fake_aws import InMemoryS3Client
+
+
+class CountingS3Client(InMemoryS3Client):
+    def __init__(self):
+        super().__init__()
+        self.list_calls = 0
+
+    def list_objects_v2(self, **kwargs):
+        self.list_calls += 1
+        return super().list_objects_v2(**kwargs)
+
+
+def test_writes_do_not_list_the_bucket():
+    s3 = CountingS3Client()
+    cache = ExtractionCache(S3CacheBackend("bucket", s3_client=s3), max_entries=2)
+
+    for i in range(5):
+        cache.put(f"key-{i}", [i])
+
+    assert s3.list_calls == 0
+    assert cache.get("key-0") == [0]
+
+
+def test_evict_applies_the_limit_once_per_batch():
+    s3 = CountingS3Client()
+    cache = ExtractionCache(S3CacheBackend("bucket", s3_client=s3), max_entries=2)
+    for i in range(5):
+        cache.put(f"key-{i}", [i])
+
+    assert cache.evict() == 3
+    assert cache.evict() == 0
+    assert s3.list_calls == 1
+    assert cache.stats["evictions"] == 3
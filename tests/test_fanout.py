@@ -0,0 +1,67 @@
+import json
+
+import pytest
+
+from benchmarks.fake_aws import InMemoryDynamoDBClient, InMemorySQSClient
+from chalicelib.bot_service import ComedyBotService
+from chalicelib.config import Config
+from chalicelib.fanout import FanOutCoordinator
+from chalicelib.state_store import DynamoDBStateStore, SQLiteStateStore
+from tests.conftest import FlakyEmailService, StaticVenue
+
+
+def make_coordinator(monkeypatch):
+    monkeypatch.setattr(Config, "FAVORITE_COMEDIANS", ["Mark Normand"])
+    monkeypatch.setattr(Config, "LOOKAHEAD_DAYS", 2)
+    store = DynamoDBStateStore("state", dynamodb_client=InMemoryDynamoDBClient())
+    email = FlakyEmailService()
+    service = ComedyBotService(
+        [StaticVenue("Test Club", ["Mark Normand"])], email, state_store=store
+    )
+    sqs = InMemorySQSClient()
+    return FanOutCoordinator(service, store, sqs_client=sqs), sqs, email
+
+
+def receive_all(coordinator, sqs):
+    response = sqs.receive_message(QueueUrl=coordinator.queue_url, MaxNumberOfMessages=10)
+    return [json.loads(message["Body"]) for message in response.get("Messages", [])]
+
+
+def test_redelivered_aggregate_sends_once(monkeypatch):
+    coordinator, sqs, email = make_coordinator(monkeypatch)
+    coordinator.dispatch()
+
+    messages = receive_all(coordinator, sqs)
+    for message in messages:
+        if message["type"] == "work":
+            coordinator.handle_message(message)
+    (aggregate,) = [m for m in messages if m["type"] == "aggregate"]
+
+    coordinator.handle_message(aggregate)
+    coordinator.handle_message(aggregate)
+
+    assert email.sent == ["Test Club Comedy Alert - Your Favorite Comedians!"]
+    assert coordinator.store.get(coordinator.KEY_PREFIX + aggregate["run_id"]) is None
+
+
+@pytest.mark.parametrize(
+    "store",
+    [
+        DynamoDBStateStore("state", dynamodb_client=InMemoryDynamoDBClient()),
+        SQLiteStateStore(":memory:"),
+    ],
+    ids=["dynamodb", "sqlite"],
+)
+def test_pop_returns_the_value_once(store):
+    store.put("claim", {"n": 1})
+    assert store.pop("claim") == {"n": 1}
+    assert store.pop("claim") is None
+
+
+def test_fanout_mode_refuses_an_unshared_store(monkeypatch):
+    monkeypatch.setattr(Config, "FANOUT_MODE", True)
+    monkeypatch.setattr(Config, "STATE_STORE_BACKEND", "sqlite")
+    service = ComedyBotService([], FlakyEmailService())
+
+    with pytest.raises(ValueError):
+        FanOutCoordinator.from_config(service, SQLiteStateStore(":memory:"))
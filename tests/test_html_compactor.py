@@ -0,0 +1,53 @@
+import pytest
+
+from chalicelib.html_compactor import HtmlCompactor
+from chalicelib.venues import TheStandBot
+from tests.test_the_stand import SHOW_DAY, card_html
+
+FRAGMENTS = [
+    "<p><b>John</b> <i>Doe</i></p>",
+    '<div class="card">\n  <span>Mark</span>\n  <span>Normand</span>\n</div>',
+    "<ul>\n <li><a href='/shows/a'>Sam Morril</a> &amp; <em>Friends</em></li>\n <li>Late</li>\n</ul>",
+    '<section> <h3>Oct 17</h3> <p>7:30 PM <!-- doors --> <img src="x.png"> Main Room</p> </section>',
+]
+
+
+def text(html):
+    """The page's words, split at blocks and whitespace but not between inline tags."""
+    return " ".join(HtmlCompactor(text_mode=True).compact(html).html.split())
+
+
+@pytest.mark.parametrize("html", FRAGMENTS)
+def test_compaction_keeps_the_text(html):
+    compacted = HtmlCompactor().compact(html).html
+
+    assert text(compacted) == text(html)
+    assert len(compacted) <= len(html)
+
+
+def test_whitespace_between_inline_elements_is_kept():
+    compacted = HtmlCompactor().compact("<div> <p><b>John</b> <i>Doe</i></p> </div>").html
+
+    assert compacted == "<div><p><b>John</b> <i>Doe</i></p></div>"
+
+
+def test_compacted_cards_read_the_same(monkeypatch):
+    monkeypatch.setattr("chalicelib.config.Config.EXTRACTION_CACHE_BACKEND", "none")
+    stand = TheStandBot(http_client=object())
+    html = (
+        "<main>\n"
+        + card_html("a", ["Mark Normand", "Sam Morril"]).replace("</span><span", "</span> <span")
+        + "\n"
+        + card_html("b", ["Jessica Kirson"])
+        + "\n</main>"
+    )
+
+    def cards(page):
+        return [
+            " ".join(card.get_text().split())
+            for card in stand._find_show_cards(stand._extract_main_content(page))
+        ]
+
+    assert cards(HtmlCompactor().compact(html).html) == cards(html)
+    assert cards(html)[0].endswith("Mark Normand Sam Morril")
+    assert SHOW_DAY.strftime("%b") in cards(html)[1]
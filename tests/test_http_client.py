@@ -0,0 +1,109 @@
+import time
+
+import pytest
+import requests
+
+from chalicelib.http_client import HttpClient
+from chalicelib.utils import DeadlineExceeded
+
+
+class FakeResponse:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class FakeSession:
+    """Returns the queued outcomes in turn; exceptions are raised."""
+
+    def __init__(self, outcomes):
+        self.outcomes = list(outcomes)
+        self.headers = {}
+        self.calls = []
+
+    def request(self, method, url, **kwargs):
+        self.calls.append(kwargs)
+        outcome = self.outcomes.pop(0) if len(self.outcomes) > 1 else self.outcomes[0]
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+def make_client(outcomes, **kwargs):
+    session = FakeSession(outcomes)
+    kwargs.setdefault("backoff_base", 0.0)
+    return HttpClient(session=session, **kwargs), session
+
+
+def test_retries_until_success():
+    client, session = make_client([FakeResponse(503), FakeResponse(200)])
+
+    response = client.get("https://example.com/")
+
+    assert response.status_code == 200
+    assert len(session.calls) == 2
+    assert client.stats.summary()["example.com"]["retries"] == 1
+
+
+def test_timeouts_are_cut_to_the_deadline():
+    client, session = make_client([FakeResponse(200)], connect_timeout=3.05, read_timeout=10)
+
+    client.get("https://example.com/", deadline=time.monotonic() + 1)
+
+    connect, read = session.calls[0]["timeout"]
+    assert connect <= 1 and read <= 1
+
+
+def test_no_request_after_the_deadline():
+    client, session = make_client([FakeResponse(200)])
+
+    with pytest.raises(DeadlineExceeded):
+        client.get("https://example.com/", deadline=time.monotonic() - 1)
+    assert session.calls == []
+
+
+def test_timeout_cut_by_the_deadline_is_a_deadline_error():
+    class SlowSession(FakeSession):
+        def request(self, method, url, **kwargs):
+            time.sleep(kwargs["timeout"][1])
+            raise requests.ReadTimeout("read timed out")
+
+    client = HttpClient(session=SlowSession([]), backoff_base=0.0)
+
+    with pytest.raises(DeadlineExceeded):
+        client.get("https://example.com/", deadline=time.monotonic() + 0.05)
+
+
+def test_retry_after_past_the_deadline_returns_the_response():
+    client, session = make_client([FakeResponse(503, {"Retry-After": "5"})])
+
+    started = time.monotonic()
+    response = client.get("https://example.com/", deadline=time.monotonic() + 1)
+
+    assert response.status_code == 503
+    assert len(session.calls) == 1
+    assert time.monotonic() - started < 1
+
+
+def test_backoff_past_the_deadline_raises_the_error():
+    client, session = make_client(
+        [requests.ConnectionError("refused")], backoff_base=10, backoff_max=10
+    )
+    client._backoff = lambda attempt: 5.0
+
+    with pytest.raises(requests.ConnectionError):
+        client.get("https://example.com/", deadline=time.monotonic() + 1)
+    assert len(session.calls) == 1
+
+
+def test_reset_clears_stats():
+    client, _ = make_client([FakeResponse(200)])
+    client.get("https://example.com/")
+
+    client.stats.reset()
+
+    assert client.stats.summary() == {}
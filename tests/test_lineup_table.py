@@ -0,0 +1,61 @@
+from datetime import time
+
+import pytest
+
+from chalicelib.venues import LineupTable, Show
+
+
+def make_shows():
+    return [
+        Show(
+            "8:00 PM MacDougal Street",
+            ["Mark Normand", "Sam Morril"],
+            "2025-10-17",
+            venue="Comedy Cellar",
+            room="MacDougal Street",
+            show_url="/a",
+        ),
+        Show("10:30 PM Village Underground", ["Jessica Kirson"], "2025-10-17", venue="Comedy Cellar"),
+        Show("7:30 PM", ["mark  normand"], "2025-10-18", venue="The Stand NYC"),
+        Show("Late show", ["Atsuko Okatsuka"], "2025-10-20", venue="The Stand NYC"),
+    ]
+
+
+def test_bytes_round_trip():
+    shows = make_shows()
+    table = LineupTable.from_bytes(LineupTable(shows).to_bytes())
+
+    assert table.shows() == shows
+    assert table.show(0).time == time(20, 0)
+    assert table.show(3).time is None
+    assert table.rows_with_comedians(["Mark Normand"]) == [0, 2]
+
+
+def test_from_bytes_rejects_other_data():
+    with pytest.raises(ValueError):
+        LineupTable.from_bytes(b"not a table")
+
+
+@pytest.mark.parametrize("serialized", [False, True], ids=["built", "loaded"])
+def test_filters_match_a_scan(serialized):
+    shows = make_shows()
+    table = LineupTable(shows)
+    if serialized:
+        table = LineupTable.from_bytes(table.to_bytes())
+
+    assert table.filter(dates=["2025-10-17"]) == [s for s in shows if s.date == "2025-10-17"]
+    assert table.filter(start="2025-10-18", end="2025-10-19") == [shows[2]]
+    assert table.filter(comedians=["MARK NORMAND"]) == [shows[0], shows[2]]
+    assert table.filter(start="2025-10-18", comedians=["Mark Normand"]) == [shows[2]]
+    assert table.filter() == shows
+    assert table.shows_by_date(["2025-10-20", "2025-10-21"]) == {
+        "2025-10-20": [shows[3]],
+        "2025-10-21": [],
+    }
+    assert table.performer_names() == [
+        "Mark Normand",
+        "Sam Morril",
+        "Jessica Kirson",
+        "mark  normand",
+        "Atsuko Okatsuka",
+    ]
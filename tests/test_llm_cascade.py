@@ -0,0 +1,97 @@
+import json
+
+from benchmarks.fake_aws import StubBedrockClient
+from chalicelib.extraction_cache import ExtractionCache, SQLiteCacheBackend
+from chalicelib.llm_extractor import LLMExtractor
+
+CHEAP = "cheap-model"
+MID = "mid-model"
+DEFAULT = "default-model"
+
+VALID = {
+    "date": "2025-10-17",
+    "time": "8:30 PM",
+    "venue_location": "",
+    "comedians": ["Mark Normand"],
+    "show_url": "/shows/show-0",
+}
+# A 24-hour time fails the show schema
+INVALID = dict(VALID, time="20:30")
+
+
+def make_extractor(responses_by_model, cascade=(CHEAP,), cache=None):
+    bedrock = StubBedrockClient(
+        responses_by_model={
+            model_id: [json.dumps(shows)] for model_id, shows in responses_by_model.items()
+        }
+    )
+    extractor = LLMExtractor(
+        model_id=DEFAULT,
+        bedrock_client=bedrock,
+        cache=cache,
+        streaming=False,
+        cascade_model_ids=cascade,
+    )
+    return extractor, bedrock
+
+
+def test_valid_cheap_response_is_served():
+    extractor, bedrock = make_extractor({CHEAP: [VALID], DEFAULT: []})
+
+    assert extractor.extract_shows("<div/>", "The Stand") == [VALID]
+    assert [call["modelId"] for call in bedrock.calls] == [CHEAP]
+    assert extractor.tier_stats[CHEAP]["served"] == 1
+
+
+def test_invalid_cheap_response_falls_through_to_the_next_model():
+    extractor, bedrock = make_extractor(
+        {CHEAP: [INVALID], MID: [VALID], DEFAULT: []}, cascade=(CHEAP, MID)
+    )
+
+    assert extractor.extract_shows("<div/>", "The Stand") == [VALID]
+    assert [call["modelId"] for call in bedrock.calls] == [CHEAP, MID]
+    assert extractor.tier_stats[CHEAP]["escalated"] == 1
+    assert extractor.tier_stats[MID]["served"] == 1
+    assert extractor.tier_stats[DEFAULT]["requests"] == 0
+
+
+def test_all_invalid_falls_back_to_the_default_model():
+    placeholder = dict(VALID, comedians=["Mark Normand", "& More!"])
+    extractor, bedrock = make_extractor(
+        {CHEAP: [INVALID], MID: [INVALID], DEFAULT: [placeholder, INVALID]},
+        cascade=(CHEAP, MID),
+    )
+
+    # The default model's shows are used, repaired where possible and
+    # dropped where not
+    assert extractor.extract_shows("<div/>", "The Stand") == [VALID]
+    assert [call["modelId"] for call in bedrock.calls] == [CHEAP, MID, DEFAULT]
+    assert extractor.tier_stats[DEFAULT]["served"] == 1
+
+
+def test_cache_key_includes_the_model_ids():
+    cache = ExtractionCache(SQLiteCacheBackend(":memory:"))
+    first, _ = make_extractor({CHEAP: [VALID], DEFAULT: [VALID]}, cache=cache)
+    first.extract_shows("<div/>", "The Stand")
+
+    same, same_bedrock = make_extractor({CHEAP: [VALID], DEFAULT: [VALID]}, cache=cache)
+    same.extract_shows("<div/>", "The Stand")
+    assert same_bedrock.calls == []
+
+    other, other_bedrock = make_extractor({DEFAULT: [VALID]}, cascade=(), cache=cache)
+    other.extract_shows("<div/>", "The Stand")
+    assert [call["modelId"] for call in other_bedrock.calls] == [DEFAULT]
+    assert cache.stats["writes"] == 2
+
+
+def test_empty_cheap_response_escalates_and_is_not_cached():
+    cache = ExtractionCache(SQLiteCacheBackend(":memory:"))
+    extractor, bedrock = make_extractor({CHEAP: [], DEFAULT: [VALID]}, cache=cache)
+
+    assert extractor.extract_shows("<div>Mark Normand</div>", "The Stand") == [VALID]
+    assert [call["modelId"] for call in bedrock.calls] == [CHEAP, DEFAULT]
+    assert extractor.tier_stats[CHEAP]["escalated"] == 1
+
+    again, again_bedrock = make_extractor({CHEAP: [], DEFAULT: []}, cache=cache)
+    assert again.extract_shows("<div>Mark Normand</div>", "The Stand") == [VALID]
+    assert again_bedrock.calls == []
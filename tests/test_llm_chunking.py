@@ -0,0 +1,101 @@
+import json
+
+from benchmarks.fake_aws import StubBedrockClient
+from chalicelib.llm_extractor import LLMExtractor
+
+
+def show(index, comedians, date="2025-10-17", time="8:30 PM"):
+    return {
+        "date": date,
+        "time": time,
+        "venue_location": "",
+        "comedians": comedians,
+        "show_url": f"/shows/show-{index}",
+    }
+
+
+def make_extractor(responses):
+    """An extractor whose stub answers each chunk by the marker in its HTML."""
+
+    def handler(request):
+        prompt = json.dumps(request)
+        marker = next(marker for marker in responses if marker in prompt)
+        return json.dumps(responses[marker])
+
+    bedrock = StubBedrockClient(handler=handler)
+    extractor = LLMExtractor(bedrock_client=bedrock, streaming=False, cascade_model_ids=())
+    return extractor, bedrock
+
+
+def test_shows_are_merged_in_chunk_order():
+    extractor, bedrock = make_extractor(
+        {
+            "chunk-a": [show(0, ["Mark Normand"]), show(1, ["Sam Morril"])],
+            "chunk-b": [show(2, ["Jessica Kirson"], time="10:30 PM")],
+        }
+    )
+
+    shows = extractor.extract_shows_chunked(
+        ["<div>chunk-a</div>", "<div>chunk-b</div>"], "The Stand"
+    )
+
+    assert [s["show_url"] for s in shows] == ["/shows/show-0", "/shows/show-1", "/shows/show-2"]
+    assert len(bedrock.calls) == 2
+
+
+def test_duplicates_across_chunks_are_dropped():
+    extractor, _ = make_extractor(
+        {
+            "chunk-a": [show(0, ["Mark Normand"]), show(1, ["Sam Morril"])],
+            "chunk-b": [show(1, ["Sam Morril"]), show(2, ["Jessica Kirson"])],
+        }
+    )
+
+    shows = extractor.extract_shows_chunked(
+        ["<div>chunk-a</div>", "<div>chunk-b</div>"], "The Stand"
+    )
+
+    assert [s["show_url"] for s in shows] == ["/shows/show-0", "/shows/show-1", "/shows/show-2"]
+    assert shows[1]["comedians"] == ["Sam Morril"]
+
+
+def test_show_split_across_a_chunk_boundary_keeps_its_whole_lineup():
+    # The card's first half ends one chunk and its second half starts the
+    # next, so each chunk sees part of the lineup
+    extractor, _ = make_extractor(
+        {
+            "chunk-a": [show(0, ["Mark Normand"]), show(1, ["Sam Morril", "Joe List"])],
+            "chunk-b": [show(1, ["Joe List", "Jessica Kirson"]), show(2, ["Gary Vider"])],
+        }
+    )
+
+    shows = extractor.extract_shows_chunked(
+        ["<div>chunk-a</div>", "<div>chunk-b</div>"], "The Stand"
+    )
+
+    assert [s["show_url"] for s in shows] == ["/shows/show-0", "/shows/show-1", "/shows/show-2"]
+    assert shows[1]["comedians"] == ["Sam Morril", "Joe List", "Jessica Kirson"]
+
+
+def test_same_time_with_different_urls_are_separate_shows():
+    extractor, _ = make_extractor(
+        {"chunk-a": [show(0, ["Mark Normand"])], "chunk-b": [show(1, ["Sam Morril"])]}
+    )
+
+    shows = extractor.extract_shows_chunked(
+        ["<div>chunk-a</div>", "<div>chunk-b</div>"], "The Stand"
+    )
+
+    assert len(shows) == 2
+
+
+def test_a_failed_chunk_only_loses_its_own_shows():
+    extractor, _ = make_extractor(
+        {"chunk-a": [show(0, ["Mark Normand"])], "chunk-b": "not json"}
+    )
+
+    shows = extractor.extract_shows_chunked(
+        ["<div>chunk-a</div>", "<div>chunk-b</div>"], "The Stand"
+    )
+
+    assert [s["show_url"] for s in shows] == ["/shows/show-0"]
@@ -0,0 +1,80 @@
+import json
+import os
+
+import pytest
+
+from benchmarks.fake_aws import StubBedrockClient
+from chalicelib.extraction_cache import ExtractionCache, SQLiteCacheBackend
+from chalicelib.json_stream import JsonArrayStreamParser
+from chalicelib.llm_extractor import LLMExtractor
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "..", "benchmarks", "fixtures")
+
+SHOWS = [
+    {
+        "date": f"2025-10-{17 + i}",
+        "time": "8:30 PM",
+        "venue_location": "",
+        "comedians": ["Mark Normand", "Sam Morril"],
+        "show_url": f"/shows/show-{i}",
+    }
+    for i in range(3)
+]
+RESPONSE = "```json\n" + json.dumps(SHOWS, indent=2) + "\n```"
+
+
+def make_extractor(bedrock):
+    cache = ExtractionCache(SQLiteCacheBackend(":memory:"))
+    return LLMExtractor(
+        bedrock_client=bedrock, cache=cache, streaming=True, cascade_model_ids=()
+    )
+
+
+def test_complete_stream_is_parsed_and_cached():
+    bedrock = StubBedrockClient([RESPONSE], chunk_size=7)
+    extractor = make_extractor(bedrock)
+
+    assert extractor.extract_shows("<div>cards</div>", "The Stand") == SHOWS
+    assert extractor.cache.stats["writes"] == 1
+
+
+@pytest.mark.parametrize("chunk_size", [1, 5, 64])
+def test_truncated_stream_keeps_complete_shows(chunk_size):
+    # Cut the response off inside the third show
+    cut = RESPONSE.index("/shows/show-2")
+    bedrock = StubBedrockClient([RESPONSE], chunk_size=chunk_size, max_output_chars=cut)
+    extractor = make_extractor(bedrock)
+
+    assert extractor.extract_shows("<div>cards</div>", "The Stand") == SHOWS[:2]
+    # A truncated response is not cached, so the next load asks again
+    assert extractor.cache.stats["writes"] == 0
+    extractor.extract_shows("<div>cards</div>", "The Stand")
+    assert len(bedrock.calls) == 2
+
+
+def test_truncated_recorded_stream():
+    with open(os.path.join(FIXTURES, "bedrock_stand_stream.json")) as f:
+        events = json.load(f)
+    with open(os.path.join(FIXTURES, "bedrock_stand_response.json")) as f:
+        expected = json.load(f)
+    text = "".join(e["delta"]["text"] for e in events if e["type"] == "content_block_delta")
+    # Stop partway through the fifth show
+    cut = text.index(expected[4]["show_url"])
+    bedrock = StubBedrockClient(stream_events=events, max_output_chars=cut)
+    extractor = make_extractor(bedrock)
+
+    shows = list(extractor.iter_shows("<div>cards</div>", "The Stand"))
+
+    assert [show["show_url"] for show in shows] == [s["show_url"] for s in expected[:4]]
+    stats = extractor.tier_stats[extractor.model_id]
+    assert stats["served"] == 1 and stats["output_tokens"] > 0
+
+
+def test_parser_handles_braces_in_strings_across_chunks():
+    text = '{"shows": [{"title": "Open } Mic [late]", "n": 1}, {"title": "x\\"}", "n": 2}]}'
+    parser = JsonArrayStreamParser()
+    shows = []
+    for i in range(0, len(text), 3):
+        shows.extend(parser.feed(text[i : i + 3]))
+    assert shows == [{"title": "Open } Mic [late]", "n": 1}, {"title": 'x"}', "n": 2}]
+    assert parser.done
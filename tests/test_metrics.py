@@ -0,0 +1,66 @@
+import pytest
+
+from chalicelib.config import Config
+from chalicelib.metrics import MemorySink, Metrics
+
+
+@pytest.fixture
+def collector(monkeypatch):
+    monkeypatch.setattr(Config, "METRICS_SINK", "memory")
+    collector = Metrics.from_config()
+    assert isinstance(collector.sink, MemorySink)
+    return collector
+
+
+def test_documents_follow_the_emf_shape(collector):
+    collector.count("Matches", 3, Venue="cellar")
+    collector.count("Matches", 2, Venue="cellar")
+    with collector.span("Fetch", Venue="cellar"):
+        pass
+    collector.count("EmailsSent")
+    collector.flush()
+
+    documents = {doc.get("Venue"): doc for doc in collector.sink.documents}
+    assert set(documents) == {"cellar", None}
+
+    venue = documents["cellar"]
+    assert venue["Service"] == "comedy-show-bots"
+    assert venue["Matches"] == [3, 2]
+    assert len(venue["FetchTime"]) == 1
+    assert isinstance(venue["_aws"]["Timestamp"], int)
+    (directive,) = venue["_aws"]["CloudWatchMetrics"]
+    assert directive["Namespace"] == Config.METRICS_NAMESPACE
+    assert directive["Dimensions"] == [["Service", "Venue"]]
+    assert directive["Metrics"] == [
+        {"Name": "Matches", "Unit": "Count"},
+        {"Name": "FetchTime", "Unit": "Milliseconds"},
+    ]
+
+    (service_directive,) = documents[None]["_aws"]["CloudWatchMetrics"]
+    assert service_directive["Dimensions"] == [["Service"]]
+    assert documents[None]["EmailsSent"] == [1]
+
+
+def test_flush_splits_documents_at_the_emf_limits(collector):
+    for i in range(Metrics.MAX_METRICS + 1):
+        collector.count(f"Metric{i}")
+    for _ in range(Metrics.MAX_VALUES + 1):
+        collector.record("Latency", 1.0, "Milliseconds", Venue="stand")
+    collector.flush()
+
+    for document in collector.sink.documents:
+        definitions = document["_aws"]["CloudWatchMetrics"][0]["Metrics"]
+        assert len(definitions) <= Metrics.MAX_METRICS
+        assert all(len(document[d["Name"]]) <= Metrics.MAX_VALUES for d in definitions)
+    assert collector.sink.total("Latency", Venue="stand") == Metrics.MAX_VALUES + 1
+    assert len(collector.sink.documents) == 4
+
+
+def test_span_counts_errors_and_still_times(collector):
+    with pytest.raises(RuntimeError):
+        with collector.span("Send"):
+            raise RuntimeError("boom")
+    collector.flush()
+
+    assert collector.sink.values("Errors", Stage="Send") == [1]
+    assert len(collector.sink.values("SendTime")) == 1
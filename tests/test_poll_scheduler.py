@@ -0,0 +1,89 @@
+from datetime import date, datetime, timedelta
+
+from chalicelib.poll_scheduler import PollScheduler
+from chalicelib.state_store import SQLiteStateStore
+
+
+START = datetime(2025, 10, 17, 9).timestamp()
+
+
+class Clock:
+    def __init__(self):
+        self.now = START
+
+    def __call__(self):
+        return self.now
+
+
+def days(count):
+    today = date.fromtimestamp(START)
+    return [(today + timedelta(days=i)).isoformat() for i in range(count)]
+
+
+def make_scheduler():
+    clock = Clock()
+    return PollScheduler(SQLiteStateStore(":memory:"), tick_seconds=3600, clock=clock), clock
+
+
+def simulate(scheduler, clock, budget, per_date, hours):
+    """Poll every hour; return each poll's time, cost and checked dates."""
+    fetches = []
+    for _ in range(hours):
+        today = date.fromtimestamp(clock.now)
+        dates = [(today + timedelta(days=i)).isoformat() for i in range(21)]
+        due = scheduler.due_dates("venue", dates, budget=budget, per_date=per_date)
+        if due:
+            cost = len(due) if per_date else 1
+            scheduler.record("venue", {d: False for d in due}, cost)
+            scheduler.commit()
+            fetches.append((clock.now, cost, due))
+        clock.now += 3600
+    return fetches
+
+
+def test_hourly_polls_stay_within_the_daily_baseline():
+    scheduler, clock = make_scheduler()
+    fetches = simulate(scheduler, clock, budget=21, per_date=True, hours=72)
+
+    for at, _, _ in fetches:
+        window = [
+            (cost, due) for t, cost, due in fetches
+            if at <= t < at + PollScheduler.BUDGET_WINDOW
+        ]
+        assert sum(cost for cost, _ in window) <= 21
+    # Once the first full check has aged out, tonight is checked more than once a day
+    last_day = [due for t, _, due in fetches if t >= clock.now - 24 * 3600]
+    tonight = date.fromtimestamp(clock.now).isoformat()
+    assert sum(tonight in due for due in last_day) > 1
+
+
+def test_calendar_venue_costs_one_fetch_per_check():
+    scheduler, clock = make_scheduler()
+    fetches = simulate(scheduler, clock, budget=1, per_date=False, hours=48)
+    assert [cost for _, cost, _ in fetches] == [1, 1]
+
+
+def test_daily_run_skips_dates_the_poller_just_checked():
+    scheduler, clock = make_scheduler()
+    dates = days(21)
+    scheduler.record("venue", {dates[0]: True, dates[1]: False}, 2)
+    scheduler.commit()
+
+    clock.now += 600
+    due = scheduler.due_dates("venue", dates, budget=21)
+    assert dates[0] not in due and dates[1] not in due
+    assert len(due) == 19
+
+
+def test_most_overdue_dates_go_first_when_over_budget():
+    scheduler, clock = make_scheduler()
+    dates = days(3)
+    scheduler.record("venue", {d: False for d in dates}, 0)
+    scheduler.commit()
+
+    clock.now += 3 * 24 * 3600
+    # All three are due; the nearest has the shortest interval, so the most overdue
+    assert scheduler.due_dates("venue", dates, budget=1) == [dates[0]]
+    scheduler.record("venue", {}, 1)
+    scheduler.commit()
+    assert scheduler.due_dates("venue", dates, budget=1) == []
@@ -0,0 +1,59 @@
+from benchmarks.fake_aws import StubBedrockClient
+from chalicelib import llm_extractor
+from chalicelib.llm_extractor import LLMExtractor
+
+MODEL = "default-model"
+
+
+def make_extractor(prompt_caching=True):
+    bedrock = StubBedrockClient()
+    extractor = LLMExtractor(
+        model_id=MODEL,
+        bedrock_client=bedrock,
+        streaming=False,
+        cascade_model_ids=(),
+        prompt_caching=prompt_caching,
+    )
+    return extractor, bedrock
+
+
+def test_system_prefix_is_identical_across_requests():
+    extractor, bedrock = make_extractor()
+    extractor.extract_shows("<div>Mark Normand</div>", "The Stand")
+    extractor.extract_shows("<section>Sam Morril, Jessica Kirson</section>", "Comedy Cellar")
+
+    first, second = (call["body"] for call in bedrock.calls)
+    assert first["system"] == second["system"]
+    assert first["messages"] != second["messages"]
+    assert first["system"][0]["text"].encode("utf-8") == (
+        llm_extractor.EXTRACTION_INSTRUCTIONS.encode("utf-8")
+    )
+
+
+def test_instructions_below_the_minimum_are_not_cached():
+    extractor, _ = make_extractor()
+    extractor.extract_shows("<div>Mark Normand</div>", "The Stand")
+    extractor.extract_shows("<div>Sam Morril</div>", "The Stand")
+
+    stats = extractor.tier_stats[MODEL]
+    assert stats["cache_creation_input_tokens"] == 0
+    assert stats["cache_read_input_tokens"] == 0
+
+
+def test_instructions_above_the_minimum_are_read_from_the_cache(monkeypatch):
+    long_instructions = llm_extractor.EXTRACTION_INSTRUCTIONS + "\n" + "Be precise. " * 400
+    monkeypatch.setattr(llm_extractor, "EXTRACTION_INSTRUCTIONS", long_instructions)
+    extractor, _ = make_extractor()
+    extractor.extract_shows("<div>Mark Normand</div>", "The Stand")
+    written = extractor.tier_stats[MODEL]["cache_creation_input_tokens"]
+    extractor.extract_shows("<div>Sam Morril</div>", "The Stand")
+
+    stats = extractor.tier_stats[MODEL]
+    assert written >= 1024
+    assert stats["cache_creation_input_tokens"] == written
+    assert stats["cache_read_input_tokens"] == written
+
+
+def test_prompt_caching_is_off_by_default():
+    extractor = LLMExtractor(model_id=MODEL, bedrock_client=StubBedrockClient())
+    assert all("cache_control" not in block for block in extractor._system_blocks())
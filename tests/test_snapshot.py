@@ -0,0 +1,113 @@
+import json
+import random
+import string
+import time
+from datetime import date, timedelta
+
+from benchmarks.fake_aws import InMemoryDynamoDBClient
+from chalicelib.snapshot import LineupSnapshot
+from chalicelib.state_store import DynamoDBStateStore
+
+# DynamoDB's item size limit
+ITEM_LIMIT = 400 * 1024
+
+
+def entries(count, seed):
+    """Matched shows with random comedian names, which compress poorly."""
+    rng = random.Random(seed)
+    today = date.today()
+    by_date = {}
+    for index in range(count):
+        show_date = (today + timedelta(days=index % 30)).isoformat()
+        names = ["".join(rng.choices(string.ascii_letters, k=24)) for _ in range(8)]
+        by_date.setdefault(show_date, []).append(
+            {
+                "venue": "Test Club",
+                "date": show_date,
+                "time": "20:00",
+                "label": f"8:00 PM Show {index}",
+                "room": None,
+                "url": f"https://example.com/shows/{index}",
+                "favorites": [names[0]],
+                "comedians": names,
+            }
+        )
+    return by_date
+
+
+def items(client):
+    return client._tables["state"]
+
+
+def test_large_snapshot_is_split_under_the_item_limit():
+    client = InMemoryDynamoDBClient()
+    store = DynamoDBStateStore("state", dynamodb_client=client)
+    writer = LineupSnapshot(store, part_chars=50_000)
+    staged = entries(2000, seed=0)
+    writer.stage("test_club", staged)
+    writer.commit()
+
+    sizes = [len(item["pk"]["S"]) + len(item["value"]["S"]) for item in items(client).values()]
+    assert len(sizes) > 4
+    assert max(sizes) < ITEM_LIMIT
+
+    body, etag = LineupSnapshot(store).document("json")
+    assert len(json.loads(body)["shows"]) == 2000
+    assert etag == LineupSnapshot._etag(body)
+    assert LineupSnapshot(store).document("ics")[0].startswith("BEGIN:VCALENDAR")
+
+
+def test_commit_keeps_only_the_previous_version():
+    client = InMemoryDynamoDBClient()
+    store = DynamoDBStateStore("state", dynamodb_client=client)
+    writer = LineupSnapshot(store, part_chars=10_000)
+    versions = []
+    for seed in range(3):
+        writer.stage("test_club", entries(200, seed=seed))
+        writer.commit()
+        versions.append(store.get(LineupSnapshot.KEY)["version"])
+
+    stored = {key.split(":")[2] for key in items(client) if key != LineupSnapshot.KEY}
+    assert stored == set(versions[1:])
+
+
+def test_reader_picks_up_a_new_version_after_refresh():
+    store = DynamoDBStateStore("state", dynamodb_client=InMemoryDynamoDBClient())
+    now = [time.time()]
+    reader = LineupSnapshot(store, refresh_seconds=60, clock=lambda: now[0])
+    writer = LineupSnapshot(store)
+    assert reader.document("json") is None
+
+    writer.stage("test_club", entries(10, seed=0))
+    writer.commit()
+    now[0] += 60
+    first = reader.document("json")
+    assert len(json.loads(first[0])["shows"]) == 10
+
+    writer.stage("other_club", entries(5, seed=1))
+    writer.commit()
+    # Still served from memory until the interval passes
+    assert reader.document("json") == first
+    now[0] += 60
+    body, etag = reader.document("json")
+    assert len(json.loads(body)["shows"]) == 15
+    assert etag != first[1]
+
+
+def test_unchanged_shows_keep_the_etag():
+    store = DynamoDBStateStore("state", dynamodb_client=InMemoryDynamoDBClient())
+    # Noon today, so an hour later is still the same day
+    now = [time.mktime(date.today().timetuple()) + 12 * 3600]
+    writer = LineupSnapshot(store, clock=lambda: now[0])
+    staged = entries(10, seed=0)
+    writer.stage("test_club", staged)
+    writer.commit()
+    before = {kind: LineupSnapshot(store).document(kind) for kind in ("json", "ics")}
+
+    now[0] += 3600
+    writer.stage("test_club", staged)
+    writer.commit()
+    after = {kind: LineupSnapshot(store).document(kind) for kind in ("json", "ics")}
+
+    assert after == before
+    assert LineupSnapshot.etag_matches(before["json"][1], after["json"][1])
@@ -0,0 +1,84 @@
+import random
+
+from chalicelib.comedian_matcher import ComedianMatcher, normalize_name
+from chalicelib.subscribers import Subscriber, SubscriberRegistry
+from chalicelib.venues import Show
+from tests.conftest import StaticVenue
+
+COMEDIANS = [
+    "Mark Normand", "Sam Morril", "Joe List", "Jessica Kirson", "Gary Vider",
+    "Dave Attell", "Atsuko Okatsuka", "Ms. Pat", "Luis J. Gomez", "Yamaneika Saunders",
+]
+ALIASES = {"Dave Attel": "Dave Attell", "Luis Gomez": "Luis J. Gomez"}
+
+
+def random_registry(rng, count):
+    subscribers = []
+    for index in range(count):
+        favorites = rng.sample(COMEDIANS, rng.randint(1, 4))
+        # Some subscribers spell their favorites differently
+        favorites = [name.lower() if rng.random() < 0.3 else name for name in favorites]
+        subscribers.append(Subscriber(f"sub-{index}", f"sub-{index}@example.com", favorites))
+    return SubscriberRegistry(subscribers, aliases=ALIASES)
+
+
+def random_lineups(rng):
+    """Shows by date, some with misspelled favorites that only aliases match."""
+    return {
+        date: [
+            Show(f"{hour}:00 PM", rng.sample(COMEDIANS + list(ALIASES), 4), date)
+            for hour in (7, 9, 11)
+        ]
+        for date in ("2025-10-17", "2025-10-18")
+    }
+
+
+def matches(venue, lineups, matcher):
+    """Results for the lineups, found the way the bot finds them."""
+    results = {}
+    for date, shows in lineups.items():
+        found = venue.find_favorite_comedians(shows, matcher)
+        if found:
+            results.setdefault(venue.name, {})[date] = found
+    return results
+
+
+def normalized(results):
+    return {
+        venue_name: {
+            date: {show: [normalize_name(name) for name in names] for show, names in shows.items()}
+            for date, shows in venue_results.items()
+        }
+        for venue_name, venue_results in results.items()
+    }
+
+
+def test_index_lookups_match_a_linear_scan():
+    rng = random.Random(0)
+    venue = StaticVenue("Test Club", [])
+    matched = 0
+    for _ in range(50):
+        registry = random_registry(rng, count=rng.randint(1, 20))
+        lineups = random_lineups(rng)
+        digests = registry.build_digests(matches(venue, lineups, registry.matcher))
+
+        # Scan every lineup against each subscriber's own favorites
+        for subscriber_id, subscriber in registry.subscribers.items():
+            own = ComedianMatcher(subscriber.favorite_comedians, aliases=ALIASES)
+            expected = normalized(matches(venue, lineups, own))
+            assert normalized(digests.get(subscriber_id, {})) == expected
+            matched += bool(expected)
+    assert matched > 100
+
+
+def test_subscribers_for_uses_normalized_names():
+    registry = SubscriberRegistry(
+        [
+            Subscriber("a", "a@example.com", ["Mark Normand"]),
+            Subscriber("b", "b@example.com", ["mark  normand", "Sam Morril"]),
+        ]
+    )
+
+    assert registry.subscribers_for("MARK NORMAND") == {"a", "b"}
+    assert registry.subscribers_for("Sam Morril") == {"b"}
+    assert registry.subscribers_for("Joe List") == set()
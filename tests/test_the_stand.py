@@ -0,0 +1,104 @@
+from datetime import date, timedelta
+
+import pytest
+
+from benchmarks.replay import ReplaySession
+from chalicelib.html_parser import parse_html
+from chalicelib.http_client import HttpClient
+from chalicelib.venues import TheStandBot
+
+SHOW_DAY = date.today() + timedelta(days=3)
+
+
+def card_html(slug, comedians, tag="a"):
+    names = "".join(f'<span class="comedian">{name}</span>' for name in comedians)
+    href = f' href="/shows/{slug}"' if tag == "a" else ""
+    return (
+        f"<{tag}{href}><h3>{SHOW_DAY:%b} {SHOW_DAY.day}</h3>"
+        f"<p>7:30 PM</p><p class=\"room\">Main Room</p>{names}</{tag}>"
+    )
+
+
+@pytest.fixture
+def stand(monkeypatch):
+    monkeypatch.setattr("chalicelib.config.Config.EXTRACTION_CACHE_BACKEND", "none")
+    return TheStandBot(http_client=HttpClient(session=ReplaySession({})))
+
+
+def test_sibling_anchor_cards_are_parsed(stand):
+    html = (
+        '<main><div class="grid">'
+        + card_html("a", ["Mark Normand", "& More!"])
+        + card_html("b", ["Sam Morril"])
+        + "</div></main>"
+    )
+
+    cards = stand._find_show_cards(stand._extract_main_content(html))
+    shows = [stand._parse_card(card) for card in cards]
+
+    assert [card.name for card in cards] == ["a", "a"]
+    assert shows == [
+        {
+            "date": SHOW_DAY.isoformat(),
+            "time": "7:30 PM",
+            "venue_location": "Main Room",
+            "comedians": ["Mark Normand"],
+            "show_url": "/shows/a",
+        },
+        {
+            "date": SHOW_DAY.isoformat(),
+            "time": "7:30 PM",
+            "venue_location": "Main Room",
+            "comedians": ["Sam Morril"],
+            "show_url": "/shows/b",
+        },
+    ]
+
+
+def test_card_without_a_show_link_has_no_url(stand):
+    card = parse_html(card_html("a", ["Mark Normand"], tag="div")).find("div")
+
+    assert stand._parse_card(card)["show_url"] == ""
+
+
+def test_sibling_anchor_page_loads_without_the_llm(stand):
+    html = (
+        '<html><body><main><div class="grid">'
+        + card_html("a", ["Mark Normand"])
+        + card_html("b", ["Sam Morril"])
+        + "</div></main></body></html>"
+    )
+    stand.http = HttpClient(session=ReplaySession({stand.shows_url: html}))
+
+    shows = stand.fetch_lineup_range([SHOW_DAY.isoformat()])[SHOW_DAY.isoformat()]
+
+    assert [show.comedians for show in shows] == [("Mark Normand",), ("Sam Morril",)]
+    assert stand.extraction_stats == {"cards": 2, "structural": 2, "llm": 0}
+
+
+def test_calendar_is_reused_until_its_ttl(stand):
+    loads = []
+
+    def load(deadline=None):
+        loads.append(deadline)
+        stand._cache = [
+            {
+                "date": SHOW_DAY.isoformat(),
+                "time": "7:30 PM",
+                "venue_location": "",
+                "comedians": ["Mark Normand"],
+                "show_url": f"/shows/{len(loads)}",
+            }
+        ]
+
+    stand._load_and_cache_shows = load
+    day = SHOW_DAY.isoformat()
+
+    first = stand.fetch_lineup_range([day])
+    assert stand.fetch_lineup(day) == first[day]
+    assert len(loads) == 1
+
+    stand._loaded_at -= TheStandBot.CALENDAR_TTL_SECONDS + 1
+    reloaded = stand.fetch_lineup_range([day])
+    assert len(loads) == 2
+    assert reloaded[day][0].show_url == "/shows/2"
@@ -0,0 +1,45 @@
+import threading
+import time
+
+from chalicelib.utils import get_next_days
+from tests.conftest import StaticVenue
+
+
+class SlowVenue(StaticVenue):
+    """Takes ``delay`` seconds per date and records the most dates fetched at once."""
+
+    def __init__(self, max_concurrency, delay):
+        super().__init__("Slow Club", ["Mark Normand"])
+        self.max_concurrency = max_concurrency
+        self.delay = delay
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def fetch_lineup(self, date, deadline=None):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(self.delay)
+        with self.lock:
+            self.active -= 1
+        return super().fetch_lineup(date, deadline)
+
+
+def test_dates_are_fetched_up_to_max_concurrency_at_once():
+    venue = SlowVenue(max_concurrency=2, delay=0.05)
+    dates = get_next_days(6)
+
+    shows_by_date = venue.fetch_lineup_range(dates)
+
+    assert list(shows_by_date) == dates
+    assert venue.peak == 2
+
+
+def test_deadline_leaves_the_later_dates():
+    venue = SlowVenue(max_concurrency=1, delay=0.1)
+    dates = get_next_days(5)
+
+    shows_by_date = venue.fetch_lineup_range(dates, deadline=time.monotonic() + 0.25)
+
+    assert list(shows_by_date) == dates[:2]